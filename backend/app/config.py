@@ -22,10 +22,55 @@ class Settings(BaseSettings):
     DEBUG: bool = False
     
     # ═══════════════════════════════════════════════════════════════════════
-    # RUTA DE DATOS - Archivo CSV con los sismos
+    # RUTA DE DATOS - Archivo CSV con los sismos, o un directorio con una
+    # partición por año o mes (CSV o Parquet) y su _manifiesto.json
     # ═══════════════════════════════════════════════════════════════════════
     DATA_PATH: str = str(Path(__file__).parent.parent / "data" / "sismos.csv")
     
+    # Nomenclátor de municipios (municipio, departamento, latitud, longitud, poblacion).
+    # El incluido cubre los 87 municipios de Santander, algunos de Boyacá y Norte de
+    # Santander y las capitales del resto, con poblaciones aproximadas; para cobertura
+    # nacional se reemplaza por la DIVIPOLA del DANE con las mismas columnas.
+    MUNICIPIOS_PATH: str = str(Path(__file__).parent.parent / "data" / "municipios.csv")
+    
+    # Polígonos municipales (GeoJSON, opcional) para asignar municipio y departamento
+    # por ubicación; sin el archivo se extraen del texto "Ubicacion" del catálogo
+    LIMITES_MUNICIPALES_PATH: str = str(Path(__file__).parent.parent / "data" / "municipios.geojson")
+    
+    # ═══════════════════════════════════════════════════════════════════════
+    # BACKEND DEL CATÁLOGO
+    # "memoria": DataFrame compacto (por defecto, catálogos que caben en RAM)
+    # "sqlite": base embebida con índices, para catálogos de millones de eventos
+    # ═══════════════════════════════════════════════════════════════════════
+    CATALOGO_BACKEND: str = os.getenv("CATALOGO_BACKEND", "memoria")
+    CATALOGO_SQLITE_PATH: str = os.getenv(
+        "CATALOGO_SQLITE_PATH", str(Path(__file__).parent.parent / "data" / "catalogo.sqlite3")
+    )
+    
+    # Filas por bloque al leer el catálogo: acota el pico de memoria de la ingesta
+    INGESTA_LOTE_FILAS: int = int(os.getenv("INGESTA_LOTE_FILAS", "50000"))
+    
+    # Hilos para lecturas del catálogo (y conexiones del pool SQLite)
+    LECTURAS_WORKERS: int = int(os.getenv("LECTURAS_WORKERS", "4"))
+    
+    # ═══════════════════════════════════════════════════════════════════════
+    # CÓMPUTO PARALELO - Pool de procesos para simulaciones estocásticas
+    # ═══════════════════════════════════════════════════════════════════════
+    PROCESS_POOL_WORKERS: int = int(os.getenv("PROCESS_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+    
+    # ═══════════════════════════════════════════════════════════════════════
+    # EJECUTOR DEL SIMULADOR - Trabajos pesados fuera del event loop
+    # (0 workers = hilos en el mismo proceso, útil en desarrollo). Cada
+    # trabajo usa un solo núcleo (sus lotes ETAS corren en serie), así que
+    # hay tantos workers como núcleos del pool de procesos
+    # ═══════════════════════════════════════════════════════════════════════
+    SIMULADOR_WORKERS: int = int(os.getenv("SIMULADOR_WORKERS", str(min(4, os.cpu_count() or 1))))
+    SIMULADOR_MAX_COLA: int = int(os.getenv("SIMULADOR_MAX_COLA", "16"))
+    SIMULADOR_TIMEOUT_S: float = float(os.getenv("SIMULADOR_TIMEOUT_S", "30"))
+    
+    # Token para las rutas de administración (vacío = rutas deshabilitadas)
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
+    
     # ArcGIS Dashboard URL
     ARCGIS_DASHBOARD_URL: str = "https://udes.maps.arcgis.com/apps/dashboards/2d52631707104b1c9239a9eac929b022"
     
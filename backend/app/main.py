@@ -6,12 +6,41 @@
 # Versión: 1.0.0
 # ═══════════════════════════════════════════════════════════════════════════
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.config import settings, colors, get_cors_origins, get_cors_origin_regex
-from app.routers import sismos_router, simulador_router, export_router
+from app.routers import sismos_router, simulador_router, export_router, analitica_router, admin_router
+from app.services.catalog_store import catalog_store
+from app.services.fitting_service import fitting_service
+from app.services.relacionados_service import relacionados_service
+from app.services.intensidades_service import intensidades_historicas_service
+from app.utils.process_pool import cerrar_process_pool
+from app.utils.ejecutor import ejecutor_simulador, EjecutorSaturado, TiempoAgotado
+from app.utils.single_flight import lecturas_sismos
+from app.utils.json_utils import FastJSONResponse
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# CICLO DE VIDA
+# ═══════════════════════════════════════════════════════════════════════════
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Tareas de fondo al iniciar y liberación de recursos al apagar"""
+    # El ajuste de parámetros nunca corre dentro de una petición
+    fitting_service.iniciar_en_segundo_plano()
+    relacionados_service.iniciar_en_segundo_plano()
+    intensidades_historicas_service.iniciar_en_segundo_plano()
+    ejecutor_simulador.iniciar()
+    yield
+    ejecutor_simulador.cerrar()
+    lecturas_sismos.cerrar()
+    catalog_store.cerrar()
+    cerrar_process_pool()
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -19,6 +48,8 @@ from app.routers import sismos_router, simulador_router, export_router
 # ═══════════════════════════════════════════════════════════════════════════
 
 app = FastAPI(
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
     title=settings.APP_NAME,
     description=f"""
 ## 🌋 {settings.APP_DESCRIPTION}
@@ -57,6 +88,14 @@ Colombia, con énfasis especial en el **Nido Sísmico de Bucaramanga**.
         {
             "name": "Exportación",
             "description": "Exportación de datos en formatos GIS"
+        },
+        {
+            "name": "Analítica",
+            "description": "Análisis estadístico del catálogo sísmico"
+        },
+        {
+            "name": "Administración",
+            "description": "Mantenimiento del catálogo (recarga de datos)"
         }
     ]
 )
@@ -73,6 +112,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Bounds", "X-Width", "X-Height", "X-Encoding"],
 )
 
 
@@ -83,6 +123,8 @@ app.add_middleware(
 app.include_router(sismos_router, prefix="/api")
 app.include_router(simulador_router, prefix="/api")
 app.include_router(export_router, prefix="/api")
+app.include_router(analitica_router, prefix="/api")
+app.include_router(admin_router, prefix="/api")
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -157,6 +199,25 @@ async def obtener_config_arcgis():
 # MANEJO DE ERRORES
 # ═══════════════════════════════════════════════════════════════════════════
 
+@app.exception_handler(EjecutorSaturado)
+async def ejecutor_saturado_handler(request, exc):
+    """Contrapresión: el cliente debe reintentar más tarde"""
+    return JSONResponse(
+        status_code=429,
+        content={"success": False, "error": "Simulador ocupado, intente de nuevo", "detail": str(exc)},
+        headers={"Retry-After": "2"}
+    )
+
+
+@app.exception_handler(TiempoAgotado)
+async def tiempo_agotado_handler(request, exc):
+    """La simulación no terminó dentro del tiempo máximo"""
+    return JSONResponse(
+        status_code=504,
+        content={"success": False, "error": "Tiempo de simulación agotado", "detail": str(exc)}
+    )
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Manejador global de excepciones"""
@@ -25,6 +25,15 @@ from .schemas import (
     ZonaImpacto,
     CiudadAfectada,
     PrediccionReplica,
+    Sitio,
+    SitiosInput,
+    
+    # Simulador ETAS
+    ETASInput,
+    ETASOutput,
+    BandaPronostico,
+    ProbabilidadMagnitud,
+    ReplicaSintetica,
     
     # Respuestas
     APIResponse,
@@ -48,6 +57,13 @@ __all__ = [
     "ZonaImpacto",
     "CiudadAfectada",
     "PrediccionReplica",
+    "Sitio",
+    "SitiosInput",
+    "ETASInput",
+    "ETASOutput",
+    "BandaPronostico",
+    "ProbabilidadMagnitud",
+    "ReplicaSintetica",
     "APIResponse",
     "PaginatedResponse",
     "ErrorResponse",
@@ -3,7 +3,7 @@
 # ═══════════════════════════════════════════════════════════════════════════
 
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 from datetime import datetime
 from enum import Enum
 
@@ -143,6 +143,10 @@ class SimuladorInput(BaseModel):
         ge=0, le=300,
         description="Profundidad en km"
     )
+    usar_parametros_ajustados: bool = Field(
+        default=False,
+        description="Usar parámetros Omori-Utsu ajustados al catálogo (si están disponibles)"
+    )
 
 
 class ZonaImpacto(BaseModel):
@@ -199,6 +203,109 @@ class SimuladorOutput(BaseModel):
     replicas_prediccion: List[PrediccionReplica]
     max_replica_magnitud: float
     total_replicas_14_dias: float
+    parametros_ajustados: bool = False
+
+
+class Sitio(BaseModel):
+    """Instalación o punto de interés para el cálculo de intensidad"""
+    id: Optional[Union[int, str]] = None
+    nombre: Optional[str] = None
+    latitud: float = Field(..., ge=-90, le=90)
+    longitud: float = Field(..., ge=-180, le=180)
+
+
+class SitiosInput(BaseModel):
+    """Escenario sísmico y lista de sitios a evaluar"""
+    escenario: SimuladorInput
+    sitios: List[Sitio] = Field(..., min_length=1, max_length=200000)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# MODELOS DEL SIMULADOR ETAS
+# ═══════════════════════════════════════════════════════════════════════════
+
+class ETASInput(SimuladorInput):
+    """Parámetros de entrada del simulador estocástico ETAS"""
+    dias: int = Field(
+        default=30,
+        ge=1, le=365,
+        description="Ventana de pronóstico en días"
+    )
+    realizaciones: int = Field(
+        default=1000,
+        ge=10, le=20000,
+        description="Número de catálogos sintéticos independientes"
+    )
+    magnitud_minima: float = Field(
+        default=3.0,
+        ge=2.5, le=6.0,
+        description="Magnitud mínima de las réplicas contabilizadas"
+    )
+    semilla: Optional[int] = Field(
+        default=None,
+        ge=0,
+        description="Semilla del generador aleatorio (reproducibilidad)"
+    )
+
+
+class BandaPronostico(BaseModel):
+    """Banda de pronóstico de réplicas para un día"""
+    dia: int
+    media: float
+    p05: float
+    p50: float
+    p95: float
+    acumulado_media: float
+    acumulado_p05: float
+    acumulado_p50: float
+    acumulado_p95: float
+
+
+class ProbabilidadMagnitud(BaseModel):
+    """Probabilidad de al menos una réplica de magnitud igual o superior"""
+    magnitud: float
+    probabilidad_pct: float
+
+
+class ReplicaSintetica(BaseModel):
+    """Evento de un catálogo sintético ETAS"""
+    tiempo_dias: float
+    latitud: float
+    longitud: float
+    profundidad: float
+    magnitud: float
+    generacion: int
+
+
+class ETASOutput(BaseModel):
+    """Resumen de las realizaciones ETAS"""
+    epicentro: Dict[str, float]
+    magnitud: float
+    profundidad: float
+    tipo_profundidad: TipoProfundidad
+    dias: int
+    realizaciones: int
+    semilla: int
+    magnitud_minima: float
+    
+    # Parámetros del modelo
+    parametros: Dict[str, float]
+    razon_ramificacion: float
+    parametros_ajustados: bool = False
+    
+    # Total de réplicas en la ventana
+    total_media: float
+    total_p05: float
+    total_p50: float
+    total_p95: float
+    
+    # Pronóstico
+    bandas: List[BandaPronostico]
+    probabilidades: List[ProbabilidadMagnitud]
+    catalogo_ejemplo: List[ReplicaSintetica]
+    
+    truncado: bool = False
+    tiempo_calculo_ms: float
 
 
 # ═══════════════════════════════════════════════════════════════════════════
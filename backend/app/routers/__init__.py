@@ -5,9 +5,13 @@
 from .sismos import router as sismos_router
 from .simulador import router as simulador_router
 from .export import router as export_router
+from .analitica import router as analitica_router
+from .admin import router as admin_router
 
 __all__ = [
     "sismos_router",
     "simulador_router",
     "export_router",
+    "analitica_router",
+    "admin_router",
 ]
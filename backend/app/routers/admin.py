@@ -0,0 +1,63 @@
+# ═══════════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Router de Administración
+# ═══════════════════════════════════════════════════════════════════════════════
+
+import secrets
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+
+from app.config import settings
+from app.services.catalog_store import catalog_store
+from app.services.fitting_service import fitting_service
+from app.services.relacionados_service import relacionados_service
+from app.services.intensidades_service import intensidades_historicas_service
+
+router = APIRouter(prefix="/admin", tags=["Administración"])
+
+
+def _verificar_token(token: Optional[str]) -> None:
+    """Exige X-Admin-Token igual a ADMIN_TOKEN; sin ADMIN_TOKEN configurado las rutas quedan cerradas"""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Administración deshabilitada: configure ADMIN_TOKEN")
+    if not secrets.compare_digest(token or "", settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Token de administración inválido")
+
+
+@router.post("/recargar", summary="Recargar el catálogo desde el CSV")
+async def recargar_catalogo(x_admin_token: Optional[str] = Header(None)):
+    """
+    Vuelve a leer las particiones del catálogo que cambiaron (el CSV, si es
+    un solo archivo). Los eventos sin cambios conservan su id
+    y versión; los nuevos, modificados y eliminados quedan disponibles para
+    los clientes que sincronizan con `?since=`.
+    """
+    _verificar_token(x_admin_token)
+    try:
+        resumen = await run_in_threadpool(catalog_store.recargar)
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    # Reajustar los parámetros de réplicas, reindexar y recalcular intensidades para la nueva versión
+    fitting_service.iniciar_en_segundo_plano()
+    relacionados_service.iniciar_en_segundo_plano()
+    intensidades_historicas_service.iniciar_en_segundo_plano()
+    return resumen
+
+
+@router.get("/catalogo/memoria", summary="Memoria del catálogo por columna")
+async def memoria_catalogo(x_admin_token: Optional[str] = Header(None)):
+    """Bytes por columna del catálogo compacto, con su tipo y el tamaño sin compactar"""
+    _verificar_token(x_admin_token)
+    return catalog_store.memoria()
+
+
+@router.get("/catalogo/particiones", summary="Manifiesto de particiones del catálogo")
+async def particiones_catalogo(x_admin_token: Optional[str] = Header(None)):
+    """
+    Particiones cargadas (un archivo por año o mes si DATA_PATH es un
+    directorio) con su fuente, registros, rango de fechas en segundos epoch,
+    rango de magnitud y caja geográfica
+    """
+    _verificar_token(x_admin_token)
+    return await run_in_threadpool(catalog_store.particiones)
@@ -0,0 +1,267 @@
+# ═══════════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Router de Analítica Sísmica
+# ═══════════════════════════════════════════════════════════════════════════════
+
+from datetime import date
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+
+from app.services.gutenberg_richter_service import gutenberg_richter_service
+from app.services.desagrupamiento_service import desagrupamiento_service
+from app.services.intensidades_service import intensidades_historicas_service, INTENSIDAD_SENTIDA
+from app.services.amenaza_service import amenaza_service
+from app.services.cumulos_service import cumulos_service, EPS_DEFECTO_KM, MIN_EVENTOS_DEFECTO
+from app.utils.json_utils import FastJSONResponse
+
+router = APIRouter(prefix="/analitica", tags=["Analítica"])
+
+EPS_QUERY = Query(EPS_DEFECTO_KM, gt=0, le=50, description="Radio de vecindad de DBSCAN (km, 3-D)")
+MIN_EVENTOS_QUERY = Query(MIN_EVENTOS_DEFECTO, ge=4, le=1000, description="Vecinos mínimos de un punto núcleo")
+
+DECLUSTERED_AMENAZA_QUERY = Query(True, description="Usar solo los sismos principales (catálogo desagrupado)")
+METODO_DECLUSTERING_QUERY = Query(
+    "gardner_knopoff", pattern="^(gardner_knopoff|reasenberg)$", description="Método de desagrupamiento"
+)
+CELDA_AMENAZA_QUERY = Query(0.2, ge=0.05, le=1.0, description="Lado de las celdas fuente (grados)")
+ANCHO_BANDA_AMENAZA_QUERY = Query(50.0, gt=0, le=200, description="Suavizado gaussiano de la sismicidad (km)")
+SIGMA_AMENAZA_QUERY = Query(0.5, ge=0, le=2, description="Desviación de la intensidad (grados Mercalli)")
+MMAX_QUERY = Query(None, ge=3, le=10, description="Magnitud máxima (por defecto: máxima observada + 0.5)")
+
+
+@router.get("/gutenberg-richter", summary="Magnitud de completitud y valor b")
+async def get_gutenberg_richter(
+    tipo_profundidad: Optional[str] = Query(None, description="Filtrar por tipo de profundidad"),
+    departamento: Optional[str] = Query(None, description="Filtrar por departamento"),
+    municipio: Optional[str] = Query(None, description="Filtrar por municipio"),
+    fecha_inicio: Optional[date] = Query(None, description="Fecha inicial (inclusive)"),
+    fecha_fin: Optional[date] = Query(None, description="Fecha final (inclusive)"),
+    metodo: str = Query("gft", pattern="^(maxc|gft)$", description="Método de Mc: maxc o gft"),
+    bootstrap: int = Query(500, ge=0, le=5000, description="Réplicas bootstrap para intervalos"),
+    semilla: Optional[int] = Query(None, ge=0, description="Semilla del bootstrap"),
+    declustered: bool = Query(False, description="Analizar solo los sismos principales (catálogo desagrupado)"),
+    metodo_declustering: str = Query(
+        "gardner_knopoff", pattern="^(gardner_knopoff|reasenberg)$", description="Método de desagrupamiento"
+    )
+):
+    """
+    Relación frecuencia-magnitud de Gutenberg-Richter.
+    
+    - **Mc**: máxima curvatura (+0.2) o bondad de ajuste (R ≥ 95% / 90%)
+    - **b**: estimador de máxima verosimilitud de Aki-Utsu, con error de Shi & Bolt
+    - **bootstrap**: intervalos del 95% para Mc y b
+    
+    Los resultados se cachean por consulta y versión del catálogo.
+    """
+    filtros = {
+        'tipo_profundidad': tipo_profundidad,
+        'departamento': departamento,
+        'municipio': municipio,
+        'fecha_inicio': fecha_inicio,
+        'fecha_fin': fecha_fin,
+        'desagrupado': metodo_declustering if declustered else None
+    }
+    
+    try:
+        resultado = await run_in_threadpool(gutenberg_richter_service.analizar, filtros, metodo, bootstrap, semilla)
+        return FastJSONResponse(content=resultado)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"Error en gutenberg-richter: {e}")
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@router.get("/declustering", summary="Desagrupamiento del catálogo")
+async def get_declustering(
+    metodo: str = Query(
+        "gardner_knopoff", pattern="^(gardner_knopoff|reasenberg)$", description="Método de desagrupamiento"
+    )
+):
+    """
+    Separa los sismos principales de sus precursores y réplicas.
+    
+    - **gardner_knopoff**: ventanas espacio-temporales que crecen con la magnitud
+      (Gardner & Knopoff, 1974), del mayor al menor evento
+    - **reasenberg**: enlace de eventos por zonas de interacción y tiempos de
+      espera probabilísticos (Reasenberg, 1985)
+    
+    Retorna los conteos y los grupos más numerosos; el catálogo desagrupado
+    se consulta con `declustered=true` en /sismos, /sismos/todos,
+    /sismos/viz/mapa y /export. Se cachea por versión del catálogo.
+    """
+    try:
+        resultado = await run_in_threadpool(desagrupamiento_service.resumen, metodo)
+        return FastJSONResponse(content=resultado)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"Error en declustering: {e}")
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@router.get("/cumulos-3d", summary="Cúmulos 3-D de hipocentros")
+async def get_cumulos_3d(
+    eps_km: float = EPS_QUERY,
+    min_eventos: int = MIN_EVENTOS_QUERY,
+    tipo_profundidad: Optional[str] = Query(None, description="Filtrar por tipo de profundidad"),
+    departamento: Optional[str] = Query(None, description="Filtrar por departamento"),
+    magnitud_min: Optional[float] = Query(None, ge=0, le=10, description="Magnitud mínima"),
+    fecha_inicio: Optional[date] = Query(None, description="Inicio de la ventana de tiempo (inclusive)"),
+    fecha_fin: Optional[date] = Query(None, description="Fin de la ventana de tiempo (inclusive)"),
+    incluir_etiquetas: bool = Query(True, description="Incluir el cúmulo de cada evento (ids / cumulo)")
+):
+    """
+    Agrupamiento por densidad (DBSCAN) de los hipocentros en coordenadas
+    ECEF, con un KD-tree como índice de vecinos.
+    
+    - **cumulos**: los más numerosos, con centroide, volumen y casco convexo
+      3-D (vértices [lon, lat, profundidad] y caras) y su huella GeoJSON
+    - **cumulo_nido**: cúmulo más cercano al Nido de Bucaramanga
+    - **etiquetas**: cúmulo de cada evento (-1 = ruido)
+    
+    Se cachea por filtros, parámetros y versión del catálogo.
+    """
+    filtros = {
+        'tipo_profundidad': tipo_profundidad,
+        'departamento': departamento,
+        'magnitud_min': magnitud_min,
+        'fecha_inicio': fecha_inicio,
+        'fecha_fin': fecha_fin
+    }
+    
+    try:
+        resultado = await run_in_threadpool(
+            cumulos_service.cumulos, filtros, eps_km, min_eventos, incluir_etiquetas
+        )
+        return FastJSONResponse(content=resultado)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"Error en cumulos-3d: {e}")
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@router.get("/cumulos-3d/evolucion", summary="Evolución temporal del Nido Sísmico")
+async def get_evolucion_nido(
+    ventana_anios: int = Query(1, ge=1, le=20, description="Años calendario por ventana"),
+    eps_km: float = EPS_QUERY,
+    min_eventos: int = MIN_EVENTOS_QUERY,
+    magnitud_min: Optional[float] = Query(None, ge=0, le=10, description="Magnitud mínima")
+):
+    """
+    Agrupa cada ventana de tiempo por separado y sigue el cúmulo del nido:
+    eventos, centroide, rango de profundidad, volumen del casco y densidad.
+    """
+    try:
+        resultado = await run_in_threadpool(
+            cumulos_service.evolucion, {'magnitud_min': magnitud_min}, ventana_anios, eps_km, min_eventos
+        )
+        return FastJSONResponse(content=resultado)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"Error en evolucion del nido: {e}")
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@router.get("/ciudades/intensidades", summary="Intensidades históricas por municipio")
+async def get_intensidades_ciudades(
+    orden: str = Query("sentidos", pattern="^(sentidos|intensidad)$", description="Ordenar por eventos sentidos o intensidad máxima")
+):
+    """
+    Resumen por municipio de la sacudida estimada (modelo de atenuación) de
+    todos los sismos del catálogo: eventos percibidos (≥ II), sentidos (≥ III),
+    intensidad máxima con su evento y conteo por nivel de Mercalli.
+    
+    La matriz evento × municipio se precalcula al cargar cada versión del catálogo.
+    """
+    try:
+        resultado = await run_in_threadpool(intensidades_historicas_service.resumen, orden)
+        return FastJSONResponse(content=resultado)
+    except Exception as e:
+        print(f"Error en intensidades por ciudad: {e}")
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@router.get("/ciudades/{ciudad}/intensidades", summary="Historial de sacudidas de un municipio")
+async def get_historial_ciudad(
+    ciudad: str,
+    departamento: Optional[str] = Query(None, description="Departamento (si el nombre se repite)"),
+    intensidad_min: float = Query(INTENSIDAD_SENTIDA, ge=2, le=12, description="Intensidad mínima"),
+    limite: int = Query(500, ge=1, le=10000, description="Eventos a listar (los más recientes)")
+):
+    """
+    Sismos que sacudieron el municipio con intensidad ≥ `intensidad_min`,
+    del más reciente al más antiguo, con el total y el conteo por año.
+    """
+    try:
+        resultado = await run_in_threadpool(
+            intensidades_historicas_service.historial, ciudad, departamento, intensidad_min, limite
+        )
+    except Exception as e:
+        print(f"Error en historial de {ciudad}: {e}")
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+    if resultado is None:
+        raise HTTPException(status_code=404, detail=f"Municipio no encontrado: {ciudad}")
+    return FastJSONResponse(content=resultado)
+
+
+@router.get("/amenaza", summary="Curvas de amenaza sísmica por municipio")
+async def get_amenaza(
+    declustered: bool = DECLUSTERED_AMENAZA_QUERY,
+    metodo_declustering: str = METODO_DECLUSTERING_QUERY,
+    celda_grados: float = CELDA_AMENAZA_QUERY,
+    ancho_banda_km: float = ANCHO_BANDA_AMENAZA_QUERY,
+    sigma: float = SIGMA_AMENAZA_QUERY,
+    mmax: Optional[float] = MMAX_QUERY
+):
+    """
+    Tasa anual de excedencia de cada nivel de Mercalli (II a X) en todos los
+    municipios, con el periodo de retorno, la probabilidad en 50 años y la
+    intensidad de 475 años.
+
+    - **Fuentes**: sismicidad suavizada por capa de profundidad, con la tasa y el valor b sobre Mc
+    - **Atenuación**: el modelo del simulador, con variabilidad normal `sigma`
+
+    Los resultados se cachean por parámetros y versión del catálogo.
+    """
+    try:
+        resultado = await run_in_threadpool(
+            amenaza_service.curvas, metodo_declustering if declustered else None,
+            celda_grados, ancho_banda_km, sigma, mmax
+        )
+        return FastJSONResponse(content=resultado)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"Error en amenaza: {e}")
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@router.get("/amenaza/{ciudad}", summary="Curva de amenaza sísmica de un municipio")
+async def get_amenaza_ciudad(
+    ciudad: str,
+    departamento: Optional[str] = Query(None, description="Departamento (si el nombre se repite)"),
+    declustered: bool = DECLUSTERED_AMENAZA_QUERY,
+    metodo_declustering: str = METODO_DECLUSTERING_QUERY,
+    celda_grados: float = CELDA_AMENAZA_QUERY,
+    ancho_banda_km: float = ANCHO_BANDA_AMENAZA_QUERY,
+    sigma: float = SIGMA_AMENAZA_QUERY,
+    mmax: Optional[float] = MMAX_QUERY
+):
+    """Curva de amenaza del municipio con el modelo de fuentes y recurrencia usado"""
+    try:
+        resultado = await run_in_threadpool(
+            amenaza_service.curva_ciudad, ciudad, departamento,
+            metodo_declustering=metodo_declustering if declustered else None,
+            celda_grados=celda_grados, ancho_banda_km=ancho_banda_km, sigma=sigma, mmax=mmax
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"Error en amenaza de {ciudad}: {e}")
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+    if resultado is None:
+        raise HTTPException(status_code=404, detail=f"Municipio no encontrado: {ciudad}")
+    return FastJSONResponse(content=resultado)
@@ -3,11 +3,15 @@
 # ═══════════════════════════════════════════════════════════════════════════
 
 from fastapi import APIRouter, Query, HTTPException
-from fastapi.responses import Response, JSONResponse
+from fastapi.responses import Response
+from datetime import date
 from typing import Optional
 
 from app.models import FormatoExport, SimuladorInput
-from app.services import export_service, simulador_service
+from app.services import trabajos_simulador
+from app.services.export_service import export_service
+from app.utils.ejecutor import ejecutor_simulador, ErrorEjecutor
+from app.utils.json_utils import FastJSONResponse
 
 router = APIRouter(prefix="/export", tags=["Exportación"])
 
@@ -18,7 +22,17 @@ async def exportar_sismos(
     departamento: Optional[str] = Query(None, description="Filtrar por departamento"),
     tipo_profundidad: Optional[str] = Query(None, description="Filtrar por tipo"),
     magnitud_min: Optional[float] = Query(None, description="Magnitud mínima"),
-    magnitud_max: Optional[float] = Query(None, description="Magnitud máxima")
+    magnitud_max: Optional[float] = Query(None, description="Magnitud máxima"),
+    fecha_inicio: Optional[date] = Query(None, description="Fecha inicial (inclusive)"),
+    fecha_fin: Optional[date] = Query(None, description="Fecha final (inclusive)"),
+    lat_min: Optional[float] = Query(None, ge=-90, le=90, description="Latitud mínima de la caja"),
+    lat_max: Optional[float] = Query(None, ge=-90, le=90, description="Latitud máxima de la caja"),
+    lon_min: Optional[float] = Query(None, ge=-180, le=180, description="Longitud mínima de la caja"),
+    lon_max: Optional[float] = Query(None, ge=-180, le=180, description="Longitud máxima de la caja"),
+    declustered: bool = Query(False, description="Solo sismos principales (catálogo desagrupado)"),
+    metodo_declustering: str = Query(
+        "gardner_knopoff", pattern="^(gardner_knopoff|reasenberg)$", description="Método de desagrupamiento"
+    )
 ):
     """
     Exporta datos sísmicos en diferentes formatos.
@@ -33,7 +47,14 @@ async def exportar_sismos(
         'departamento': departamento,
         'tipo_profundidad': tipo_profundidad,
         'magnitud_min': magnitud_min,
-        'magnitud_max': magnitud_max
+        'magnitud_max': magnitud_max,
+        'fecha_inicio': fecha_inicio,
+        'fecha_fin': fecha_fin,
+        'lat_min': lat_min,
+        'lat_max': lat_max,
+        'lon_min': lon_min,
+        'lon_max': lon_max,
+        'desagrupado': metodo_declustering if declustered else None
     }
     
     try:
@@ -49,7 +70,7 @@ async def exportar_sismos(
         
         elif formato == FormatoExport.GEOJSON:
             content = export_service.exportar_geojson(filtros)
-            return JSONResponse(
+            return FastJSONResponse(
                 content=content,
                 headers={
                     "Content-Disposition": "attachment; filename=siasic_sismos.geojson"
@@ -86,20 +107,15 @@ async def exportar_simulacion_csv(params: SimuladorInput):
     
     try:
         # Ejecutar simulación
-        resultado = simulador_service.simular(params)
+        resultado = await ejecutor_simulador.ejecutar(
+            trabajos_simulador.simular, params, trabajos_simulador.parametros_actuales()
+        )
         
-        # Convertir a dict para exportar
-        resultado_dict = {
-            'epicentro': resultado.epicentro,
-            'magnitud': resultado.magnitud,
-            'profundidad': resultado.profundidad,
-            'tipo_profundidad': resultado.tipo_profundidad.value,
-            'intensidad_epicentro': resultado.intensidad_epicentro,
-            'mercalli': resultado.mercalli,
-            'energia_tnt_toneladas': resultado.energia_tnt_toneladas,
-            'ciudades_afectadas': [c.model_dump() for c in resultado.ciudades_afectadas],
-            'replicas_prediccion': [r.model_dump() for r in resultado.replicas_prediccion]
-        }
+        # Convertir a dict para exportar (un solo volcado, incluye los modelos anidados)
+        resultado_dict = resultado.model_dump(mode='json', include={
+            'epicentro', 'magnitud', 'profundidad', 'tipo_profundidad', 'intensidad_epicentro',
+            'mercalli', 'energia_tnt_toneladas', 'ciudades_afectadas', 'replicas_prediccion'
+        })
         
         content = export_service.exportar_simulacion_csv(resultado_dict)
         
@@ -111,6 +127,8 @@ async def exportar_simulacion_csv(params: SimuladorInput):
             }
         )
         
+    except ErrorEjecutor:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error en exportación: {str(e)}")
 
@@ -2,11 +2,20 @@
 # SIASIC-Santander Backend - Router del Simulador
 # ═══════════════════════════════════════════════════════════════════════════
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, File, Form, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
 from typing import List
 
-from app.models import SimuladorInput, SimuladorOutput
-from app.services import simulador_service
+from app.models import SimuladorInput, SimuladorOutput, ETASInput, ETASOutput, SitiosInput
+from app.services.simulador_service import simulador_service
+from app.services.fitting_service import fitting_service
+from app.services.shakemap_service import shakemap_service
+from app.services.sitios_service import sitios_service, MEDIA_TYPES, MAX_SITIOS
+from app.services.etas_service import etas_service
+from app.services import trabajos_simulador
+from app.utils.ejecutor import ejecutor_simulador, ErrorEjecutor
+from app.utils.json_utils import FastJSONResponse
 
 router = APIRouter(prefix="/simulador", tags=["Simulador"])
 
@@ -24,8 +33,12 @@ async def simular_sismo(params: SimuladorInput):
     """
     
     try:
-        resultado = simulador_service.simular(params)
-        return resultado
+        contenido = await ejecutor_simulador.ejecutar(
+            trabajos_simulador.simular_json, params, trabajos_simulador.parametros_actuales()
+        )
+        return Response(content=contenido, media_type="application/json")
+    except ErrorEjecutor:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error en simulación: {str(e)}")
 
@@ -44,7 +57,10 @@ async def escenario_nido_sismico(magnitud: float = 5.0):
         profundidad=147
     )
     
-    return simulador_service.simular(params)
+    contenido = await ejecutor_simulador.ejecutar(
+        trabajos_simulador.simular_json, params, trabajos_simulador.parametros_actuales()
+    )
+    return Response(content=contenido, media_type="application/json")
 
 
 @router.post("/comparar", summary="Comparar escenarios")
@@ -57,12 +73,175 @@ async def comparar_escenarios(escenarios: List[SimuladorInput]):
     if len(escenarios) < 2:
         raise HTTPException(status_code=400, detail="Mínimo 2 escenarios")
     
-    return simulador_service.comparar_escenarios(escenarios)
+    return await ejecutor_simulador.ejecutar(
+        trabajos_simulador.comparar_escenarios, escenarios, trabajos_simulador.parametros_actuales()
+    )
+
+
+@router.post("/etas", response_model=ETASOutput, summary="Simulación estocástica ETAS")
+async def simular_etas(params: ETASInput):
+    """
+    Genera catálogos sintéticos de réplicas con el modelo ETAS y los resume
+    en bandas de pronóstico (percentiles 5-50-95) por día.
+    
+    **Parámetros adicionales:**
+    - **dias**: Ventana de pronóstico (1 - 365)
+    - **realizaciones**: Número de catálogos sintéticos (10 - 20000)
+    - **magnitud_minima**: Magnitud mínima contabilizada (2.5 - 6.0)
+    - **semilla**: Semilla para resultados reproducibles
+    
+    Los lotes de realizaciones se reparten entre los workers del simulador.
+    """
+    
+    try:
+        contexto, tareas = etas_service.preparar(params)
+        lotes = await ejecutor_simulador.ejecutar_lotes(trabajos_simulador.simular_lote_etas, tareas)
+        return await run_in_threadpool(etas_service.resumir, contexto, lotes)
+    except ErrorEjecutor:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error en simulación ETAS: {str(e)}")
+
+
+def _respuesta_sitios(contenido, formato: str) -> StreamingResponse:
+    """Respuesta en flujo para los resultados por sitio"""
+    headers = {"X-Max-Sitios": str(MAX_SITIOS)}
+    if formato == "csv":
+        headers["Content-Disposition"] = "attachment; filename=intensidad_sitios.csv"
+    return StreamingResponse(contenido, media_type=MEDIA_TYPES[formato], headers=headers)
+
+
+@router.post("/sitios", summary="Intensidad en sitios del usuario (JSON)")
+async def calcular_intensidad_sitios(
+    datos: SitiosInput,
+    formato: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson o csv")
+):
+    """
+    Intensidad simulada, nivel Mercalli y zona de impacto para cada sitio.
+    
+    Los sitios se evalúan por bloques vectorizados y el resultado se envía en
+    flujo (una línea por sitio), sin esperar a procesar toda la lista.
+    """
+    
+    bloques = sitios_service.bloques_desde_json(datos.sitios)
+    return _respuesta_sitios(sitios_service.evaluar(datos.escenario, bloques, formato), formato)
+
+
+@router.post("/sitios/csv", summary="Intensidad en sitios del usuario (CSV)")
+async def calcular_intensidad_sitios_csv(
+    archivo: UploadFile = File(..., description="CSV con columnas latitud, longitud y opcionalmente id, nombre"),
+    latitud: float = Form(6.78, ge=4.0, le=10.0),
+    longitud: float = Form(-73.18, ge=-77.0, le=-70.0),
+    magnitud: float = Form(5.0, ge=2.0, le=8.5),
+    profundidad: float = Form(147, ge=0, le=300),
+    formato: str = Query("csv", pattern="^(ndjson|csv)$", description="ndjson o csv")
+):
+    """
+    Igual que `/sitios`, leyendo los sitios de un CSV subido (se aceptan
+    los alias lat/lon/lng). El archivo se lee por partes; se procesan hasta
+    `X-Max-Sitios` filas.
+    """
+    
+    params = SimuladorInput(latitud=latitud, longitud=longitud, magnitud=magnitud, profundidad=profundidad)
+    
+    try:
+        bloques = sitios_service.bloques_desde_csv(archivo.file)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"CSV inválido: {str(e)}")
+    
+    return _respuesta_sitios(sitios_service.evaluar(params, bloques, formato), formato)
+
+
+@router.get("/shakemap/raster", summary="Raster de intensidades (ShakeMap)")
+async def obtener_shakemap_raster(
+    latitud: float = Query(6.78, ge=4.0, le=10.0),
+    longitud: float = Query(-73.18, ge=-77.0, le=-70.0),
+    magnitud: float = Query(5.0, ge=2.0, le=8.5),
+    profundidad: float = Query(147, ge=0, le=300),
+    resolucion: int = Query(200, ge=32, le=600, description="Celdas por lado"),
+    formato: str = Query("png", pattern="^(png|bin)$", description="png (RGBA Mercalli) o bin (uint8)")
+):
+    """
+    Campo de intensidad Mercalli en una malla regular alrededor del epicentro.
+    
+    - **png**: imagen RGBA coloreada por nivel, para superponer con los límites de `X-Bounds`
+    - **bin**: uint8 fila por fila de norte a sur; intensidad = valor / 20
+    
+    Cabeceras: `X-Bounds` (lat_min,lon_min,lat_max,lon_max), `X-Width`, `X-Height`.
+    """
+    
+    try:
+        malla = shakemap_service.obtener_malla(latitud, longitud, magnitud, profundidad, resolucion)
+        headers = {
+            "X-Bounds": ",".join(str(v) for v in malla['bounds']),
+            "X-Width": str(malla['ancho']),
+            "X-Height": str(malla['alto']),
+            "Cache-Control": "public, max-age=86400"
+        }
+        
+        if formato == "png":
+            return Response(content=shakemap_service.raster_png(malla), media_type="image/png", headers=headers)
+        
+        headers["X-Encoding"] = "uint8; intensidad = valor / 20"
+        return Response(
+            content=shakemap_service.raster_binario(malla),
+            media_type="application/octet-stream",
+            headers=headers
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generando raster: {str(e)}")
+
+
+@router.get("/shakemap/isosistas", summary="Isosistas del escenario (GeoJSON)")
+async def obtener_shakemap_isosistas(
+    latitud: float = Query(6.78, ge=4.0, le=10.0),
+    longitud: float = Query(-73.18, ge=-77.0, le=-70.0),
+    magnitud: float = Query(5.0, ge=2.0, le=8.5),
+    profundidad: float = Query(147, ge=0, le=300),
+    resolucion: int = Query(200, ge=32, le=600, description="Celdas por lado")
+):
+    """Isosistas por nivel entero de Mercalli extraídas del raster con marching squares."""
+    
+    try:
+        malla = shakemap_service.obtener_malla(latitud, longitud, magnitud, profundidad, resolucion)
+        return FastJSONResponse(
+            content=shakemap_service.isosistas(malla),
+            headers={"Cache-Control": "public, max-age=86400"}
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generando isosistas: {str(e)}")
+
+
+@router.get("/parametros-ajustados", summary="Parámetros Omori-Utsu ajustados")
+async def obtener_parametros_ajustados():
+    """
+    Parámetros (K, c, p) estimados por máxima verosimilitud sobre el catálogo,
+    por tipo de profundidad. El ajuste se ejecuta en segundo plano al iniciar;
+    mientras no termine, el estado es "en_curso".
+    """
+    return fitting_service.estado()
+
+
+@router.get("/ejecutor/metricas", summary="Métricas del ejecutor del simulador")
+async def obtener_metricas_ejecutor():
+    """
+    Ocupación del pool de simulación: trabajos en curso y en cola, rechazos
+    por saturación (429), tiempos agotados (504) y tiempos recientes de
+    espera y ejecución.
+    """
+    return ejecutor_simulador.metricas()
 
 
 @router.get("/ciudades", summary="Ciudades disponibles")
 async def obtener_ciudades():
-    """Lista de ciudades incluidas en el análisis de impacto."""
+    """
+    Municipios del nomenclátor (`data/municipios.csv`) usados en el análisis
+    de impacto. La simulación solo reporta los que caen dentro del radio de percepción.
+    
+    El nomenclátor incluido cubre Santander completo; fuera de Santander lista
+    solo algunos municipios, por lo que la población afectada de escenarios
+    cercanos a Boyacá o Norte de Santander queda subestimada.
+    """
     return simulador_service.obtener_ciudades()
 
 
@@ -2,24 +2,105 @@
 # SIASIC-Santander Backend - Router de Sismos
 # ═══════════════════════════════════════════════════════════════════════════════
 
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import JSONResponse
-from typing import List, Optional
+from datetime import date
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from app.services.sismos_service import sismos_service
-from app.utils.json_utils import clean_for_json, clean_sismo_record
+from app.config import Constants
+from app.services.sismos_service import sismos_service, CAMPOS_MAPA
+from app.services.relacionados_service import relacionados_service, RADIO_DEFECTO_KM, VENTANA_DEFECTO_DIAS
+from app.services.mapa_calor_service import mapa_calor_service
+from app.services.perfil_service import perfil_service, COLUMNAS_BINARIO
+from app.utils.json_utils import FastJSONResponse, render_json
+from app.utils.single_flight import lecturas_sismos
 
 # IMPORTANTE: Solo "/sismos" porque main.py ya agrega "/api"
 router = APIRouter(prefix="/sismos", tags=["Sismos"])
 
 
+async def _respuesta_compartida(clave: Tuple, calcular: Callable[[], Any]) -> Response:
+    """
+    Calcula y serializa la respuesta en el pool de lecturas. Peticiones idénticas
+    simultáneas (misma clave y versión del dataset) comparten un solo cálculo.
+    """
+    contenido = await lecturas_sismos.ejecutar(
+        (sismos_service.version,) + clave, lambda: render_json(calcular())
+    )
+    return Response(content=contenido, media_type="application/json")
+
+
+def _filtros_desagrupado(declustered: bool, metodo: str) -> Optional[Dict[str, Any]]:
+    """Filtro del catálogo desagrupado (solo sismos principales), o None"""
+    return {'desagrupado': metodo} if declustered else None
+
+
+def _campos(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Proyección normalizada de `fields=`, o 400 si pide columnas inexistentes"""
+    try:
+        return sismos_service.normalizar_campos(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+CAMPOS_QUERY = Query(
+    None, description="Columnas a incluir separadas por coma (ej. id,latitud,longitud,magnitud)"
+)
+SINCE_QUERY = Query(
+    None, ge=0, description="Solo cambios posteriores a esta versión del catálogo (sincronización incremental)"
+)
+EPOCH_QUERY = Query(None, description="Epoch recibido junto con la versión en la sincronización anterior")
+DECLUSTERED_QUERY = Query(
+    False, description="Solo sismos principales (catálogo desagrupado, sin precursores ni réplicas)"
+)
+METODO_DECLUSTERING_QUERY = Query(
+    "gardner_knopoff", pattern="^(gardner_knopoff|reasenberg)$", description="Método de desagrupamiento"
+)
+RADIO_QUERY = Query(RADIO_DEFECTO_KM, gt=0, le=500, description="Radio de la vecindad (km)")
+VENTANA_QUERY = Query(VENTANA_DEFECTO_DIAS, gt=0, le=3650, description="Ventana de tiempo antes y después (días)")
+
+
 @router.get("/todos")
-async def get_todos_sismos():
-    """Retorna todos los sismos"""
+async def get_todos_sismos(
+    request: Request,
+    stream: bool = Query(False, description="Enviar como NDJSON por lotes"),
+    fields: Optional[str] = CAMPOS_QUERY,
+    since: Optional[int] = SINCE_QUERY,
+    epoch: Optional[str] = EPOCH_QUERY,
+    declustered: bool = DECLUSTERED_QUERY,
+    metodo_declustering: str = METODO_DECLUSTERING_QUERY
+):
+    """
+    Retorna todos los sismos.
+    
+    Con `?stream=1` o `Accept: application/x-ndjson` la respuesta es NDJSON
+    (un sismo por línea) enviada por lotes, para empezar a mostrar datos
+    antes de recibir todo el catálogo.
+    
+    Con `?since=<version>&epoch=<epoch>` retorna solo los sismos nuevos o
+    modificados y los ids eliminados desde esa versión (ver `get_cambios`);
+    la sincronización siempre es sobre el catálogo completo.
+    
+    Con `?declustered=true` retorna solo los sismos principales según
+    `metodo_declustering` (Gardner-Knopoff o Reasenberg).
+    """
+    campos = _campos(fields)
+    filtros = _filtros_desagrupado(declustered, metodo_declustering)
+    if since is not None:
+        return await _respuesta_compartida(
+            ("cambios", since, epoch, campos), lambda: sismos_service.get_cambios(since, epoch, campos)
+        )
+    if stream or "application/x-ndjson" in request.headers.get("accept", ""):
+        return StreamingResponse(
+            sismos_service.iter_ndjson(campos, filtros=filtros), media_type="application/x-ndjson"
+        )
+    
     try:
-        datos = sismos_service.get_all()
-        datos_limpios = [clean_sismo_record(d) for d in datos]
-        return JSONResponse(content=datos_limpios)
+        return await _respuesta_compartida(
+            ("todos", campos, declustered and metodo_declustering),
+            lambda: sismos_service.get_all(campos, filtros)
+        )
     except Exception as e:
         print(f"Error en /todos: {e}")
         import traceback
@@ -30,13 +111,19 @@ async def get_todos_sismos():
 @router.get("")
 async def get_sismos_paginados(
     page: int = Query(1, ge=1),
-    per_page: int = Query(20, ge=1, le=100)
+    per_page: int = Query(20, ge=1, le=100),
+    fields: Optional[str] = CAMPOS_QUERY,
+    declustered: bool = DECLUSTERED_QUERY,
+    metodo_declustering: str = METODO_DECLUSTERING_QUERY
 ):
-    """Retorna sismos paginados"""
+    """Retorna sismos paginados (con `declustered=true`, solo los sismos principales)"""
+    campos = _campos(fields)
+    filtros = _filtros_desagrupado(declustered, metodo_declustering)
     try:
-        resultado = sismos_service.get_paginated(page, per_page)
-        resultado['data'] = [clean_sismo_record(d) for d in resultado.get('data', [])]
-        return JSONResponse(content=clean_for_json(resultado))
+        return await _respuesta_compartida(
+            ("paginados", page, per_page, campos, declustered and metodo_declustering),
+            lambda: sismos_service.get_paginated(page, per_page, campos, filtros)
+        )
     except Exception as e:
         print(f"Error en paginados: {e}")
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
@@ -46,8 +133,7 @@ async def get_sismos_paginados(
 async def get_estadisticas_generales():
     """Retorna estadísticas generales"""
     try:
-        stats = sismos_service.get_estadisticas_generales()
-        return JSONResponse(content=clean_for_json(stats))
+        return await _respuesta_compartida(("stats_generales",), sismos_service.get_estadisticas_generales)
     except Exception as e:
         print(f"Error en stats: {e}")
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
@@ -57,8 +143,7 @@ async def get_estadisticas_generales():
 async def get_distribucion_mensual():
     """Retorna distribución mensual"""
     try:
-        datos = sismos_service.get_distribucion_mensual()
-        return JSONResponse(content=clean_for_json(datos))
+        return await _respuesta_compartida(("stats_mensual",), sismos_service.get_distribucion_mensual)
     except Exception as e:
         print(f"Error en mensual: {e}")
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
@@ -68,46 +153,238 @@ async def get_distribucion_mensual():
 async def get_distribucion_profundidad():
     """Retorna distribución por profundidad"""
     try:
-        datos = sismos_service.get_distribucion_profundidad()
-        return JSONResponse(content=clean_for_json(datos))
+        return await _respuesta_compartida(("stats_profundidad",), sismos_service.get_distribucion_profundidad)
     except Exception as e:
         print(f"Error en profundidad: {e}")
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 
 @router.get("/viz/mapa")
-async def get_sismos_para_mapa():
-    """Retorna datos para mapa"""
+async def get_sismos_para_mapa(
+    fields: Optional[str] = CAMPOS_QUERY,
+    since: Optional[int] = SINCE_QUERY,
+    epoch: Optional[str] = EPOCH_QUERY,
+    declustered: bool = DECLUSTERED_QUERY,
+    metodo_declustering: str = METODO_DECLUSTERING_QUERY
+):
+    """
+    Retorna datos para mapa (con `since`, solo los cambios desde esa versión;
+    con `declustered=true`, solo los sismos principales)
+    """
+    campos = _campos(fields)
+    filtros = _filtros_desagrupado(declustered, metodo_declustering)
     try:
-        datos = sismos_service.get_para_mapa()
-        datos_limpios = [clean_sismo_record(d) for d in datos]
-        return JSONResponse(content=datos_limpios)
+        if since is not None:
+            campos_mapa = campos or CAMPOS_MAPA
+            return await _respuesta_compartida(
+                ("cambios", since, epoch, campos_mapa),
+                lambda: sismos_service.get_cambios(since, epoch, campos_mapa)
+            )
+        return await _respuesta_compartida(
+            ("viz_mapa", campos, declustered and metodo_declustering),
+            lambda: sismos_service.get_para_mapa(campos, filtros)
+        )
     except Exception as e:
         print(f"Error en mapa: {e}")
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 
 @router.get("/viz/timeline")
-async def get_sismos_timeline():
+async def get_sismos_timeline(fields: Optional[str] = CAMPOS_QUERY):
     """Retorna datos para timeline"""
+    campos = _campos(fields)
     try:
-        datos = sismos_service.get_all()
-        datos_ordenados = sorted(datos, key=lambda x: x.get('fecha_hora', ''), reverse=True)[:100]
-        datos_limpios = [clean_sismo_record(d) for d in datos_ordenados]
-        return JSONResponse(content=datos_limpios)
+        return await _respuesta_compartida(("viz_timeline", campos), lambda: sismos_service.get_timeline(100, campos))
     except Exception as e:
         print(f"Error en timeline: {e}")
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 
+@router.get("/viz/densidad", summary="Mapa de calor de sismicidad (KDE)")
+async def get_densidad_sismicidad(
+    resolucion: int = Query(256, ge=32, le=1024, description="Celdas en el lado mayor de la caja"),
+    ancho_banda_km: float = Query(10.0, gt=0, le=200, description="Desviación del núcleo gaussiano (km)"),
+    ponderacion: str = Query("conteo", pattern="^(conteo|magnitud|energia)$", description="Peso de cada evento"),
+    escala: str = Query("lineal", pattern="^(lineal|log)$", description="Cuantización del raster"),
+    formato: str = Query("png", pattern="^(png|bin)$", description="png (RGBA) o bin (uint8)"),
+    fecha_inicio: Optional[date] = Query(None, description="Fecha inicial (inclusive)"),
+    fecha_fin: Optional[date] = Query(None, description="Fecha final (inclusive)"),
+    profundidad_min: Optional[float] = Query(None, ge=0, le=700, description="Profundidad mínima (km)"),
+    profundidad_max: Optional[float] = Query(None, ge=0, le=700, description="Profundidad máxima (km)"),
+    tipo_profundidad: Optional[str] = Query(None, description="Filtrar por tipo de profundidad"),
+    magnitud_min: Optional[float] = Query(None, ge=0, le=10, description="Magnitud mínima"),
+    lat_min: Optional[float] = Query(None, ge=-90, le=90),
+    lat_max: Optional[float] = Query(None, ge=-90, le=90),
+    lon_min: Optional[float] = Query(None, ge=-180, le=180),
+    lon_max: Optional[float] = Query(None, ge=-180, le=180),
+    declustered: bool = DECLUSTERED_QUERY,
+    metodo_declustering: str = METODO_DECLUSTERING_QUERY
+):
+    """
+    Densidad de sismicidad suavizada con un núcleo gaussiano (KDE por FFT),
+    para mostrar en el mapa en lugar de cada punto.
+    
+    - **ponderacion**: conteo (eventos/km²), magnitud o energía radiada (J/km²)
+    - **escala**: lineal, o log (4 décadas bajo el máximo) para ponderaciones muy sesgadas
+    - **png**: imagen RGBA para superponer con los límites de `X-Bounds`
+    - **bin**: uint8 fila por fila de norte a sur, decodificable con `X-Encoding`
+    
+    Sin caja (lat_min, lat_max, lon_min, lon_max) se usa la extensión de los
+    eventos filtrados. Cabeceras: `X-Bounds` (lat_min,lon_min,lat_max,lon_max),
+    `X-Width`, `X-Height`, `X-Max`, `X-Units` y `X-Events`.
+    """
+    limites = (lat_min, lat_max, lon_min, lon_max)
+    if any(v is not None for v in limites) and any(v is None for v in limites):
+        raise HTTPException(status_code=400, detail="La caja requiere lat_min, lat_max, lon_min y lon_max")
+    caja = limites if lat_min is not None else None
+
+    filtros = {
+        'tipo_profundidad': tipo_profundidad,
+        'fecha_inicio': fecha_inicio,
+        'fecha_fin': fecha_fin,
+        'magnitud_min': magnitud_min,
+        'desagrupado': metodo_declustering if declustered else None
+    }
+    try:
+        malla = await run_in_threadpool(
+            mapa_calor_service.obtener_malla, filtros, caja, resolucion,
+            ancho_banda_km, ponderacion, profundidad_min, profundidad_max
+        )
+        headers = {
+            "X-Bounds": ",".join(str(v) for v in malla['bounds']),
+            "X-Width": str(malla['ancho']),
+            "X-Height": str(malla['alto']),
+            "X-Max": f"{malla['densidad_max']:.6g}",
+            "X-Units": malla['unidades'].replace('²', '2'),
+            "X-Events": str(malla['eventos'])
+        }
+        
+        if formato == "png":
+            contenido = await run_in_threadpool(mapa_calor_service.raster_png, malla, escala)
+            return Response(content=contenido, media_type="image/png", headers=headers)
+        
+        headers["X-Encoding"] = mapa_calor_service.codificacion(malla, escala)
+        return Response(
+            content=mapa_calor_service.raster_binario(malla, escala),
+            media_type="application/octet-stream",
+            headers=headers
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"Error en densidad: {e}")
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@router.get("/viz/perfil", summary="Sección transversal de profundidad")
+async def get_perfil_profundidad(
+    lat1: float = Query(Constants.NIDO_LAT, ge=-90, le=90, description="Latitud del extremo inicial"),
+    lon1: float = Query(Constants.NIDO_LON - 0.6, ge=-180, le=180, description="Longitud del extremo inicial"),
+    lat2: float = Query(Constants.NIDO_LAT, ge=-90, le=90, description="Latitud del extremo final"),
+    lon2: float = Query(Constants.NIDO_LON + 0.6, ge=-180, le=180, description="Longitud del extremo final"),
+    ancho_km: float = Query(40.0, gt=0, le=500, description="Ancho total de la franja (km)"),
+    formato: str = Query("json", pattern="^(json|bin)$", description="json (columnar) o bin (float32)"),
+    fecha_inicio: Optional[date] = Query(None, description="Fecha inicial (inclusive)"),
+    fecha_fin: Optional[date] = Query(None, description="Fecha final (inclusive)"),
+    magnitud_min: Optional[float] = Query(None, ge=0, le=10, description="Magnitud mínima"),
+    profundidad_min: Optional[float] = Query(None, ge=0, le=700, description="Profundidad mínima (km)"),
+    profundidad_max: Optional[float] = Query(None, ge=0, le=700, description="Profundidad máxima (km)"),
+    declustered: bool = DECLUSTERED_QUERY,
+    metodo_declustering: str = METODO_DECLUSTERING_QUERY
+):
+    """
+    Proyecta los hipocentros a menos de `ancho_km / 2` del perfil (círculo
+    máximo entre los dos extremos) sobre él, ordenados por distancia. Por
+    defecto, un perfil oeste-este de ~130 km que cruza el Nido Sísmico.
+    
+    - **json**: columnas id, distancia_km, desplazamiento_km (con signo,
+      positivo a la izquierda), profundidad y magnitud
+    - **bin**: float32 little-endian por fila (distancia_km, profundidad,
+      magnitud; NaN sin magnitud), con `X-Count`, `X-Columns` y `X-Length-Km`
+    """
+    filtros = {
+        'fecha_inicio': fecha_inicio,
+        'fecha_fin': fecha_fin,
+        'magnitud_min': magnitud_min,
+        'desagrupado': metodo_declustering if declustered else None
+    }
+    try:
+        perfil = await run_in_threadpool(
+            perfil_service.perfil, (lat1, lon1), (lat2, lon2), ancho_km, filtros, profundidad_min, profundidad_max
+        )
+        if formato == "json":
+            return FastJSONResponse(content=perfil_service.a_json(perfil))
+        
+        return Response(
+            content=perfil_service.a_binario(perfil),
+            media_type="application/octet-stream",
+            headers={
+                "X-Count": str(perfil['total']),
+                "X-Columns": ",".join(COLUMNAS_BINARIO),
+                "X-Length-Km": str(perfil['longitud_km'])
+            }
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"Error en perfil: {e}")
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@router.get("/relacionados/conteos")
+async def get_conteos_relacionados(radio_km: float = RADIO_QUERY, ventana_dias: float = VENTANA_QUERY):
+    """
+    Modo masivo de la vecindad espacio-temporal: precursores y réplicas de
+    cada sismo dentro de `radio_km` y ±`ventana_dias`
+    """
+    try:
+        return await _respuesta_compartida(
+            ("relacionados_conteos", radio_km, ventana_dias),
+            lambda: relacionados_service.conteos(radio_km, ventana_dias)
+        )
+    except Exception as e:
+        print(f"Error en conteos relacionados: {e}")
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@router.get("/{sismo_id}/relacionados")
+async def get_sismos_relacionados(
+    sismo_id: int,
+    radio_km: float = RADIO_QUERY,
+    ventana_dias: float = VENTANA_QUERY,
+    limite: int = Query(200, ge=1, le=5000, description="Máximo de eventos en la lista")
+):
+    """
+    Sismos a menos de `radio_km` y ±`ventana_dias` del sismo indicado, en
+    orden temporal, con el conteo de precursores y réplicas y el vecino de
+    mayor magnitud (si no hay uno mayor, el sismo es candidato a principal)
+    """
+    try:
+        resultado = await lecturas_sismos.ejecutar(
+            (sismos_service.version, "relacionados", sismo_id, radio_km, ventana_dias, limite),
+            lambda: relacionados_service.relacionados(sismo_id, radio_km, ventana_dias, limite)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"Error en relacionados: {e}")
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+    if resultado is None:
+        raise HTTPException(status_code=404, detail="Sismo no encontrado")
+    return FastJSONResponse(content=resultado)
+
+
 @router.get("/{sismo_id}")
-async def get_sismo_by_id(sismo_id: int):
+async def get_sismo_by_id(sismo_id: int, fields: Optional[str] = CAMPOS_QUERY):
     """Retorna un sismo por ID"""
+    campos = _campos(fields)
     try:
-        sismo = sismos_service.get_by_id(sismo_id)
+        sismo = await lecturas_sismos.ejecutar(
+            (sismos_service.version, "id", sismo_id, campos), lambda: sismos_service.get_by_id(sismo_id, campos)
+        )
         if sismo is None:
             raise HTTPException(status_code=404, detail="Sismo no encontrado")
-        return JSONResponse(content=clean_sismo_record(sismo))
+        return FastJSONResponse(content=sismo)
     except HTTPException:
         raise
     except Exception as e:
@@ -2,15 +2,69 @@
 # SIASIC-Santander Backend - Services Package
 # ═══════════════════════════════════════════════════════════════════════════
 
-from .sismos_service import sismos_service, SismosService
-from .simulador_service import simulador_service, SimuladorService
-from .export_service import export_service, ExportService
-
-__all__ = [
-    "sismos_service",
-    "SismosService",
-    "simulador_service", 
-    "SimuladorService",
-    "export_service",
-    "ExportService",
-]
+# Los servicios se importan al primer acceso (PEP 562): importar un
+# submódulo como app.services.simulador_service ejecuta este paquete, y
+# construir aquí todos los singletons cargaría el catálogo completo en cada
+# proceso (los workers del simulador no lo usan).
+#
+# Un submódulo importado por su ruta queda como atributo del paquete con su
+# mismo nombre, que es el de su singleton; por eso dentro de la aplicación
+# los servicios se importan desde su submódulo.
+
+import importlib
+
+# Nombre exportado -> submódulo que lo define
+_EXPORTACIONES = {
+    "limites_service": "limites_service",
+    "LimitesService": "limites_service",
+    "catalog_store": "catalog_store",
+    "CatalogStore": "catalog_store",
+    "sismos_service": "sismos_service",
+    "SismosService": "sismos_service",
+    "SismosMemoriaService": "sismos_service",
+    "gazetteer_service": "gazetteer_service",
+    "GazetteerService": "gazetteer_service",
+    "simulador_service": "simulador_service",
+    "SimuladorService": "simulador_service",
+    "export_service": "export_service",
+    "ExportService": "export_service",
+    "etas_service": "etas_service",
+    "ETASService": "etas_service",
+    "fitting_service": "fitting_service",
+    "OmoriFittingService": "fitting_service",
+    "gutenberg_richter_service": "gutenberg_richter_service",
+    "GutenbergRichterService": "gutenberg_richter_service",
+    "shakemap_service": "shakemap_service",
+    "ShakeMapService": "shakemap_service",
+    "sitios_service": "sitios_service",
+    "SitiosService": "sitios_service",
+    "relacionados_service": "relacionados_service",
+    "EventosRelacionadosService": "relacionados_service",
+    "desagrupamiento_service": "desagrupamiento_service",
+    "DesagrupamientoService": "desagrupamiento_service",
+    "cumulos_service": "cumulos_service",
+    "CumulosService": "cumulos_service",
+    "mapa_calor_service": "mapa_calor_service",
+    "MapaCalorService": "mapa_calor_service",
+    "perfil_service": "perfil_service",
+    "PerfilService": "perfil_service",
+    "intensidades_historicas_service": "intensidades_service",
+    "IntensidadesHistoricasService": "intensidades_service",
+    "amenaza_service": "amenaza_service",
+    "AmenazaService": "amenaza_service",
+}
+
+__all__ = list(_EXPORTACIONES)
+
+
+def __getattr__(nombre: str):
+    modulo = _EXPORTACIONES.get(nombre)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    valor = getattr(importlib.import_module(f"{__name__}.{modulo}"), nombre)
+    globals()[nombre] = valor
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTACIONES))
@@ -0,0 +1,293 @@
+# ═══════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Amenaza Sísmica Probabilista (PSHA simplificado)
+# ═══════════════════════════════════════════════════════════════════════════
+
+import time
+import numpy as np
+from scipy.special import ndtr
+from typing import Dict, Any, Optional
+
+from app.config import Constants, settings
+from app.services.sismos_service import sismos_service, SismosService
+from app.services.gazetteer_service import gazetteer_service, GazetteerService
+from app.services.simulador_service import simulador_service, SeismicAttenuationModel
+from app.services.gutenberg_richter_service import gutenberg_richter_service, GutenbergRichterService
+from app.utils.cache_utils import LRUCache
+from app.utils.process_pool import map_en_paralelo
+from app.utils.raster_utils import suavizar_en_malla, KM_POR_GRADO
+
+
+DELTA_M = 0.1
+MMAX_MARGEN = 0.5           # Mmax por defecto: mayor magnitud observada + 0.5
+UMBRAL_RELATIVO = 1e-3      # Celdas con menos tasa (relativa a la mayor de su capa) se descartan
+MAX_PARES = 2_000_000       # Fuentes × magnitudes × sitios evaluados a la vez
+ANIOS_EXPOSICION = 50
+PERIODO_DISENO = 475        # 10% de excedencia en 50 años
+
+NIVELES_ROMANOS = ['I', 'II', 'III', 'IV', 'V', 'VI', 'VII', 'VIII', 'IX', 'X', 'XI', 'XII']
+NIVELES = np.arange(2, 11, dtype=float)     # II a X
+
+# Capas de profundidad: las mismas clases del catálogo
+CAPAS_PROFUNDIDAD = [
+    ('Superficial', -np.inf, Constants.DEPTH_SUPERFICIAL_MAX),
+    ('Intermedio', Constants.DEPTH_SUPERFICIAL_MAX, Constants.DEPTH_INTERMEDIO_MAX),
+    ('Nido Sísmico', Constants.DEPTH_INTERMEDIO_MAX, Constants.DEPTH_NIDO_MAX),
+    ('Profundo', Constants.DEPTH_NIDO_MAX, np.inf),
+]
+
+
+def tasas_gutenberg_richter(tasa_mc: float, b: float, mc: float, mmax: float) -> Dict[str, np.ndarray]:
+    """Tasa anual por intervalo de DELTA_M entre Mc y Mmax (Gutenberg-Richter truncada)"""
+    bordes = np.arange(mc, mmax + DELTA_M / 2, DELTA_M)
+    bordes[-1] = mmax
+    beta = b * np.log(10)
+    sobrevivencia = (np.exp(-beta * (bordes - mc)) - np.exp(-beta * (mmax - mc))) / (1 - np.exp(-beta * (mmax - mc)))
+    return {
+        'magnitudes': (bordes[:-1] + bordes[1:]) / 2,
+        'tasas': tasa_mc * -np.diff(sobrevivencia)
+    }
+
+
+def _excedencia_lote(
+    modelo: SeismicAttenuationModel,
+    fuente_lat: np.ndarray,
+    fuente_lon: np.ndarray,
+    fuente_prof: np.ndarray,
+    tasas: np.ndarray,
+    magnitudes: np.ndarray,
+    sitio_lat: np.ndarray,
+    sitio_lon: np.ndarray,
+    sigma: float
+) -> np.ndarray:
+    """
+    Tasa anual de excedencia (sitios × NIVELES) de un grupo de fuentes.
+    tasas[s, m] es la tasa de la magnitud m en la fuente s; la intensidad
+    media sale del modelo de atenuación en bloque fuentes × magnitudes ×
+    sitios y la variabilidad es normal con desviación `sigma`.
+    """
+    n_magnitudes, n_sitios = len(magnitudes), len(sitio_lat)
+    resultado = np.zeros((n_sitios, len(NIVELES)))
+    lote = max(1, MAX_PARES // max(n_magnitudes * n_sitios, 1))
+    for a in range(0, len(fuente_lat), lote):
+        b = a + lote
+        distancia = modelo.haversine_distance(
+            fuente_lat[a:b, None], fuente_lon[a:b, None], sitio_lat[None, :], sitio_lon[None, :]
+        )
+        media = modelo.calculate_intensity_array(
+            magnitudes[None, :, None], distancia[:, None, :], fuente_prof[a:b, None, None]
+        )
+        for k, nivel in enumerate(NIVELES):
+            probabilidad = ndtr((media - nivel) / sigma) if sigma > 0 else (media >= nivel).astype(float)
+            resultado[:, k] += np.einsum('sm,smc->c', tasas[a:b], probabilidad)
+    return resultado
+
+
+class AmenazaService:
+    """
+    Curvas de amenaza por municipio: tasa anual con que se excede cada nivel
+    de Mercalli. Las fuentes son celdas de sismicidad suavizada (Frankel,
+    1995) por capa de profundidad del catálogo desagrupado, con la tasa y el
+    valor b de Gutenberg-Richter sobre Mc. La integración sobre fuentes ×
+    magnitudes × sitios es vectorizada y puede repartirse por grupos de
+    fuentes en el pool de procesos. Cacheado por versión y parámetros.
+    """
+
+    def __init__(
+        self,
+        sismos: SismosService,
+        gazetteer: GazetteerService,
+        modelo: SeismicAttenuationModel,
+        gutenberg_richter: GutenbergRichterService
+    ):
+        self.sismos = sismos
+        self.gazetteer = gazetteer
+        self.modelo = modelo
+        self.gutenberg_richter = gutenberg_richter
+        self._cache = LRUCache(maxsize=16)
+
+    def curvas(
+        self,
+        metodo_declustering: Optional[str] = 'gardner_knopoff',
+        celda_grados: float = 0.2,
+        ancho_banda_km: float = 50.0,
+        sigma: float = 0.5,
+        mmax: Optional[float] = None,
+        paralelo: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Curvas de todos los municipios. Sin `metodo_declustering` se usa el
+        catálogo completo (las réplicas inflan la tasa).
+        """
+        clave = (
+            self.sismos.version, metodo_declustering, float(celda_grados),
+            float(ancho_banda_km), float(sigma), mmax
+        )
+        return self._cache.get_or_compute(clave, lambda: self._calcular(
+            metodo_declustering, celda_grados, ancho_banda_km, sigma, mmax, paralelo
+        ))
+
+    def curva_ciudad(self, ciudad: str, departamento: Optional[str] = None, **parametros: Any) -> Optional[Dict[str, Any]]:
+        """Curva de un municipio con el modelo de fuentes; None si el municipio no existe"""
+        indice = self.gazetteer.buscar(ciudad, departamento)
+        if indice is None:
+            return None
+        resultado = self.curvas(**parametros)
+        return {**{k: v for k, v in resultado.items() if k != 'ciudades'}, **resultado['ciudades'][indice]}
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # MODELO DE FUENTES
+    # ═══════════════════════════════════════════════════════════════════════
+
+    def _fuentes(
+        self, metodo_declustering: Optional[str], celda_grados: float, ancho_banda_km: float, mmax: Optional[float]
+    ) -> Dict[str, Any]:
+        """Celdas fuente (lat, lon, profundidad, fracción de la tasa) y la recurrencia regional"""
+        filtros = {'desagrupado': metodo_declustering} if metodo_declustering else {}
+        gr = self.gutenberg_richter.analizar(filtros, 'gft', 0)
+        mc, b = gr['mc'], gr['b']
+
+        datos = self.sismos.get_arrays(['tiempo_dias', 'latitud', 'longitud', 'profundidad', 'magnitud'], filtros)
+        datos = {col: valores.astype(float) for col, valores in datos.items()}
+        validos = np.isfinite(datos['latitud']) & np.isfinite(datos['longitud']) & np.isfinite(datos['profundidad'])
+        validos &= np.isfinite(datos['tiempo_dias']) & (datos['magnitud'] >= mc - 1e-9)
+        datos = {col: valores[validos] for col, valores in datos.items()}
+
+        n = len(datos['magnitud'])
+        anios = (datos['tiempo_dias'].max() - datos['tiempo_dias'].min()) / 365.25 if n else 0.0
+        if n < 2 or anios <= 0:
+            raise ValueError("El catálogo no tiene eventos fechados suficientes sobre Mc")
+        mmax = float(datos['magnitud'].max()) + MMAX_MARGEN if mmax is None else float(mmax)
+        if mmax <= mc:
+            raise ValueError(f"Mmax ({mmax}) debe superar la magnitud de completitud ({mc})")
+
+        # Malla común: extensión de los epicentros más tres anchos de banda
+        margen = 3 * ancho_banda_km / KM_POR_GRADO
+        lat_min = np.floor((datos['latitud'].min() - margen) / celda_grados) * celda_grados
+        lon_min = np.floor((datos['longitud'].min() - margen) / celda_grados) * celda_grados
+        alto = int(np.ceil((datos['latitud'].max() + margen - lat_min) / celda_grados))
+        ancho = int(np.ceil((datos['longitud'].max() + margen - lon_min) / celda_grados))
+        lat_centros = lat_min + (np.arange(alto) + 0.5) * celda_grados
+        lon_centros = lon_min + (np.arange(ancho) + 0.5) * celda_grados
+
+        fuente_lat, fuente_lon, fuente_prof, fraccion, capas = [], [], [], [], []
+        for nombre, desde, hasta in CAPAS_PROFUNDIDAD:
+            en_capa = (datos['profundidad'] >= desde) & (datos['profundidad'] < hasta)
+            if not en_capa.any():
+                continue
+            masa = suavizar_en_malla(
+                datos['latitud'][en_capa], datos['longitud'][en_capa], None,
+                lat_min, lon_min, alto, ancho, celda_grados, ancho_banda_km
+            )
+            masa[masa < UMBRAL_RELATIVO * masa.max()] = 0.0
+            fila, columna = np.nonzero(masa)
+            profundidad = float(np.median(datos['profundidad'][en_capa]))
+
+            # La capa conserva su parte de la tasa aunque se descarten celdas
+            fuente_lat.append(lat_centros[fila])
+            fuente_lon.append(lon_centros[columna])
+            fuente_prof.append(np.full(len(fila), profundidad))
+            fraccion.append(masa[fila, columna] / masa.sum() * en_capa.sum() / n)
+            capas.append({
+                "capa": nombre,
+                "eventos": int(en_capa.sum()),
+                "profundidad_km": round(profundidad, 1),
+                "fuentes": int(len(fila))
+            })
+
+        return {
+            'lat': np.concatenate(fuente_lat),
+            'lon': np.concatenate(fuente_lon),
+            'prof': np.concatenate(fuente_prof),
+            'fraccion': np.concatenate(fraccion),
+            'tasa_mc': float(n / anios),
+            'recurrencia': {
+                "mc": mc,
+                "b": b,
+                "mmax": round(mmax, 2),
+                "eventos_sobre_mc": n,
+                "anios_catalogo": round(float(anios), 2),
+                "tasa_anual_mc": round(float(n / anios), 3),
+                "capas": capas
+            }
+        }
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # INTEGRACIÓN
+    # ═══════════════════════════════════════════════════════════════════════
+
+    def _calcular(
+        self,
+        metodo_declustering: Optional[str],
+        celda_grados: float,
+        ancho_banda_km: float,
+        sigma: float,
+        mmax: Optional[float],
+        paralelo: bool
+    ) -> Dict[str, Any]:
+        inicio = time.perf_counter()
+        fuentes = self._fuentes(metodo_declustering, celda_grados, ancho_banda_km, mmax)
+        recurrencia = fuentes['recurrencia']
+        gr = tasas_gutenberg_richter(fuentes['tasa_mc'], recurrencia['b'], recurrencia['mc'], recurrencia['mmax'])
+        tasas = fuentes['fraccion'][:, None] * gr['tasas'][None, :]
+
+        sitio_lat, sitio_lon = self.gazetteer.coordenadas(np.arange(len(self.gazetteer)))
+        grupos = max(1, settings.PROCESS_POOL_WORKERS) if paralelo else 1
+        tareas = [
+            (self.modelo, fuentes['lat'][g], fuentes['lon'][g], fuentes['prof'][g], tasas[g],
+             gr['magnitudes'], sitio_lat, sitio_lon, sigma)
+            for g in np.array_split(np.arange(len(tasas)), grupos) if len(g)
+        ]
+        excedencia = np.sum(map_en_paralelo(_excedencia_lote, tareas), axis=0)
+
+        ciudades = [
+            {
+                "ciudad": registro['ciudad'],
+                "departamento": registro['departamento'],
+                "latitud": registro['latitud'],
+                "longitud": registro['longitud'],
+                **self._curva(excedencia[i])
+            }
+            for i, registro in enumerate(self.gazetteer.registros)
+        ]
+        return {
+            "version_dataset": self.sismos.version,
+            "parametros": {
+                "metodo_declustering": metodo_declustering,
+                "celda_grados": celda_grados,
+                "ancho_banda_km": ancho_banda_km,
+                "sigma": sigma
+            },
+            "recurrencia": recurrencia,
+            "fuentes": int(len(tasas)),
+            "grupos": len(tareas),
+            "ciudades": ciudades,
+            "tiempo_calculo_ms": round((time.perf_counter() - inicio) * 1000, 1)
+        }
+
+    @staticmethod
+    def _curva(tasas: np.ndarray) -> Dict[str, Any]:
+        """Puntos de la curva y la intensidad con periodo de retorno de PERIODO_DISENO años"""
+        curva = [
+            {
+                "mercalli": NIVELES_ROMANOS[int(nivel) - 1],
+                "intensidad": int(nivel),
+                "tasa_anual": float(f"{tasa:.4g}"),
+                "periodo_retorno_anios": float(f"{1 / tasa:.4g}") if tasa > 0 else None,
+                f"prob_{ANIOS_EXPOSICION}_anios": round(float(1 - np.exp(-tasa * ANIOS_EXPOSICION)), 4)
+            }
+            for nivel, tasa in zip(NIVELES, tasas)
+        ]
+
+        # Interpolación en log(tasa), que decrece con el nivel
+        objetivo = np.log(1 / PERIODO_DISENO)
+        log_tasas = np.log(np.maximum(tasas, 1e-300))
+        intensidad_diseno = None
+        if log_tasas[0] >= objetivo >= log_tasas[-1]:
+            intensidad_diseno = round(float(np.interp(objetivo, log_tasas[::-1], NIVELES[::-1])), 2)
+        return {"curva": curva, f"intensidad_{PERIODO_DISENO}_anios": intensidad_diseno}
+
+
+# Instancia singleton
+amenaza_service = AmenazaService(
+    sismos_service, gazetteer_service, simulador_service.attenuation_model, gutenberg_richter_service
+)
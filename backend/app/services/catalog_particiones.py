@@ -0,0 +1,208 @@
+# ═══════════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Particiones del Catálogo y Manifiesto
+# ═══════════════════════════════════════════════════════════════════════════════
+
+import json
+import os
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Dict, Any, Tuple
+
+
+# Formatos de partición: CSV, o Parquet si hay un motor instalado (pyarrow o fastparquet)
+EXTENSIONES = ('.csv', '.parquet')
+
+# Manifiesto dentro del directorio de particiones
+ARCHIVO_MANIFIESTO = '_manifiesto.json'
+
+# Recibe el avance de la ingesta: archivo, filas, bytes_leidos, bytes_totales, porcentaje
+ProgresoIngesta = Callable[[Dict[str, Any]], None]
+
+
+def listar_particiones(ruta: str) -> List[Path]:
+    """
+    Archivos del catálogo. DATA_PATH puede ser un archivo (una sola partición)
+    o un directorio con una partición por año o mes ("2023.csv", "2024-01.parquet"):
+    se ordenan por nombre, que es el orden cronológico de esas convenciones.
+    """
+    origen = Path(ruta)
+    if origen.is_file():
+        return [origen]
+    if not origen.is_dir():
+        return []
+    return sorted(
+        (p for p in origen.iterdir()
+         if p.is_file() and p.suffix.lower() in EXTENSIONES and not p.name.startswith(('_', '.'))),
+        key=lambda p: p.name
+    )
+
+
+def fuente_particion(ruta: Path, firma: str = "") -> str:
+    """
+    Tamaño y fecha de modificación: si no cambian, la partición no se vuelve a
+    leer. `firma` identifica datos externos que intervienen en la limpieza
+    (los límites municipales de la unión espacial).
+    """
+    estado = ruta.stat()
+    fuente = f"{estado.st_size}|{estado.st_mtime_ns}"
+    return f"{fuente}|{firma}" if firma else fuente
+
+
+def muestra_particion(ruta: Path, filas: int = 100) -> pd.DataFrame:
+    """Primeras filas crudas de una partición (para conocer sus columnas)"""
+    if ruta.suffix.lower() == '.parquet':
+        return pd.read_parquet(ruta).head(filas)
+    return pd.read_csv(ruta, encoding='utf-8', nrows=filas)
+
+
+class LectorPorBloques:
+    """
+    Lee particiones por bloques de `tamano_bloque` filas: la memoria de la
+    lectura queda acotada a un bloque sin importar el tamaño del archivo.
+    Tras procesar cada bloque llama a `progreso` con el avance en bytes del
+    conjunto de particiones a leer.
+    """
+
+    def __init__(self, rutas: List[Path], tamano_bloque: int, progreso: Optional[ProgresoIngesta] = None):
+        self.tamano_bloque = tamano_bloque
+        self.progreso = progreso
+        self.bytes_totales = sum(r.stat().st_size for r in rutas)
+        self.bytes_leidos = 0
+
+    def bloques(self, ruta: Path) -> Iterator[pd.DataFrame]:
+        base = self.bytes_leidos
+        tamano = ruta.stat().st_size
+        filas = 0
+        if ruta.suffix.lower() == '.parquet':
+            # Parquet se lee entero (particiones de un año o un mes) y se corta
+            df = pd.read_parquet(ruta)
+            for inicio in range(0, len(df), self.tamano_bloque):
+                bloque = df.iloc[inicio:inicio + self.tamano_bloque]
+                filas += len(bloque)
+                yield bloque
+                self._avanzar(ruta, base + tamano * filas // len(df), filas)
+        else:
+            with open(ruta, 'rb') as archivo:
+                for bloque in pd.read_csv(archivo, encoding='utf-8', chunksize=self.tamano_bloque):
+                    filas += len(bloque)
+                    yield bloque
+                    self._avanzar(ruta, base + min(archivo.tell(), tamano), filas)
+        self.bytes_leidos = base + tamano
+
+    def _avanzar(self, ruta: Path, bytes_leidos: int, filas: int) -> None:
+        self.bytes_leidos = bytes_leidos
+        if self.progreso is None:
+            return
+        self.progreso({
+            'archivo': ruta.name,
+            'filas': filas,
+            'bytes_leidos': bytes_leidos,
+            'bytes_totales': self.bytes_totales,
+            'porcentaje': round(100 * bytes_leidos / self.bytes_totales, 1) if self.bytes_totales else 100.0
+        })
+
+
+def registrar_progreso(evento: Dict[str, Any]) -> None:
+    """Hook de progreso por defecto: una línea de log por bloque"""
+    print(f"⏳ Ingesta {evento['archivo']}: {evento['filas']:,} filas ({evento['porcentaje']:.0f}%)")
+
+
+def estadisticas_particion(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Rango de fecha (segundos epoch), magnitud y caja geográfica de una
+    partición ya limpia (limpiar_catalogo). None si no hay valores.
+    """
+    def rango(valores: np.ndarray) -> Tuple[Optional[float], Optional[float]]:
+        valores = valores[~np.isnan(valores)] if valores.dtype.kind == 'f' else valores
+        if len(valores) == 0:
+            return None, None
+        return valores.min().item(), valores.max().item()
+
+    estadisticas: Dict[str, Any] = {'registros': len(df)}
+    if 'fecha_hora' in df.columns:
+        fechas = df['fecha_hora'].dropna().to_numpy(dtype='datetime64[s]').astype(np.int64)
+        estadisticas['fecha_min'], estadisticas['fecha_max'] = rango(fechas)
+    for col, nombre in (('magnitud', 'magnitud'), ('latitud', 'lat'), ('longitud', 'lon')):
+        if col in df.columns:
+            estadisticas[f'{nombre}_min'], estadisticas[f'{nombre}_max'] = rango(
+                df[col].to_numpy(dtype=np.float64)
+            )
+    return estadisticas
+
+
+def combinar_estadisticas(
+    acumuladas: Optional[Dict[str, Any]], bloque: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Estadísticas de una partición leída por bloques, bloque a bloque"""
+    if acumuladas is None:
+        return dict(bloque)
+    combinadas = {'registros': acumuladas['registros'] + bloque['registros']}
+    for clave in acumuladas.keys() - {'registros'}:
+        valores = [v for v in (acumuladas[clave], bloque.get(clave)) if v is not None]
+        combinadas[clave] = (min if clave.endswith('_min') else max)(valores) if valores else None
+    return combinadas
+
+
+def solapa(
+    estadisticas: Dict[str, Any],
+    fechas: Tuple[Optional[int], Optional[int]] = (None, None),
+    magnitudes: Tuple[Optional[float], Optional[float]] = (None, None),
+    caja: Optional[Tuple[float, float, float, float]] = None
+) -> bool:
+    """
+    ¿Puede la partición tener eventos dentro de los límites pedidos? Los
+    límites son inclusivos; None deja el lado abierto. Una partición sin
+    estadísticas de una dimensión filtrada no tiene eventos que la cumplan.
+    """
+    def cruza(clave: str, inferior, superior) -> bool:
+        if inferior is None and superior is None:
+            return True
+        minimo, maximo = estadisticas.get(f'{clave}_min'), estadisticas.get(f'{clave}_max')
+        if minimo is None or maximo is None:
+            return False
+        return (inferior is None or maximo >= inferior) and (superior is None or minimo <= superior)
+
+    if not cruza('fecha', *fechas) or not cruza('magnitud', *magnitudes):
+        return False
+    if caja is not None:
+        lat_min, lat_max, lon_min, lon_max = caja
+        return cruza('lat', lat_min, lat_max) and cruza('lon', lon_min, lon_max)
+    return True
+
+
+class ManifiestoParticiones:
+    """
+    Estadísticas por partición (fuente, registros, rango de fechas y magnitud,
+    caja geográfica). En modo directorio se guarda en `_manifiesto.json`, así
+    otras herramientas pueden elegir particiones sin abrirlas; con un solo
+    archivo vive solo en memoria.
+    """
+
+    def __init__(self, ruta: str):
+        origen = Path(ruta)
+        self.archivo: Optional[Path] = origen / ARCHIVO_MANIFIESTO if origen.is_dir() else None
+        self.entradas: Dict[str, Dict[str, Any]] = {}
+        if self.archivo is not None and self.archivo.exists():
+            try:
+                self.entradas = json.loads(self.archivo.read_text(encoding='utf-8')).get('particiones', {})
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Manifiesto ilegible, se reconstruye: {e}")
+
+    def registrar(self, ruta: Path, fuente: str, estadisticas: Dict[str, Any]) -> Dict[str, Any]:
+        self.entradas[ruta.name] = {'fuente': fuente, **estadisticas}
+        return self.entradas[ruta.name]
+
+    def conservar(self, nombres: List[str]) -> None:
+        """Descarta las entradas de particiones que ya no existen"""
+        self.entradas = {n: self.entradas[n] for n in nombres if n in self.entradas}
+
+    def guardar(self) -> None:
+        """Escritura atómica (archivo temporal + reemplazo)"""
+        if self.archivo is None:
+            return
+        temporal = self.archivo.with_suffix('.tmp')
+        temporal.write_text(
+            json.dumps({'particiones': self.entradas}, ensure_ascii=False, indent=2), encoding='utf-8'
+        )
+        os.replace(temporal, self.archivo)
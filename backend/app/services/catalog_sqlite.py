@@ -0,0 +1,430 @@
+# ═══════════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Catálogo en SQLite (catálogos más grandes que la RAM)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+import json
+import threading
+import uuid
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from typing import List, Optional, Dict, Any
+
+from app.services.catalog_particiones import (
+    LectorPorBloques, ManifiestoParticiones, ProgresoIngesta, fuente_particion, listar_particiones, muestra_particion
+)
+from app.services.catalog_store import limpiar_catalogo, huellas
+from app.services.limites_service import LimitesService
+from app.utils.sqlite_pool import PoolConexiones, abrir_conexion
+
+
+# _orden = (posición de la partición << 32) | fila dentro de la partición
+MASCARA_FILA = (1 << 32) - 1
+
+# Índices de las consultas habituales (rango de fechas, magnitud, profundidad)
+INDICES = {
+    'ix_sismos_fecha': 'fecha_hora',
+    'ix_sismos_magnitud': 'magnitud',
+    'ix_sismos_profundidad': 'profundidad',
+    'ix_sismos_version': '_version',
+    'ix_sismos_orden': '_orden',
+}
+
+
+def _tipo_sql(col: str, serie: pd.Series) -> str:
+    if col == 'fecha_hora' or serie.dtype.kind in 'biu':
+        return 'INTEGER'
+    if serie.dtype.kind == 'f':
+        return 'REAL'
+    return 'TEXT'
+
+
+class SQLiteCatalogStore:
+    """
+    Catálogo en una base SQLite local, para catálogos que no caben en memoria.
+
+    El CSV se ingiere por bloques con upsert por clave natural: los eventos sin
+    cambios conservan id y versión, los modificados toman la versión nueva y los
+    que desaparecen pasan a la tabla de tombstones. La base persiste entre
+    reinicios y solo se vuelve a ingerir si el CSV cambió.
+
+    La fecha se guarda en segundos epoch, con índices en fecha, magnitud y
+    profundidad y un R-tree sobre la ubicación. Las consultas usan un pool de
+    conexiones de solo lectura del tamaño de los hilos lectores.
+    """
+
+    def __init__(
+        self, ruta: str, ruta_db: str, tamano_pool: int,
+        tamano_bloque: int = 50_000, progreso: Optional[ProgresoIngesta] = None,
+        limites: Optional[LimitesService] = None
+    ):
+        self.ruta = ruta
+        self.ruta_db = ruta_db
+        self.tamano_bloque = tamano_bloque
+        self.progreso = progreso
+        self.limites = limites
+        Path(ruta_db).parent.mkdir(parents=True, exist_ok=True)
+        self.pool = PoolConexiones(ruta_db, tamano_pool)
+
+        self._version: int = 0
+        self._epoch: str = ""
+        self._columnas: List[str] = []
+        self._tipos: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.cargar()
+
+    @property
+    def version(self) -> int:
+        """Versión del dataset cargado (aumenta con cada carga que cambia el CSV)"""
+        return self._version
+
+    @property
+    def epoch(self) -> str:
+        return self._epoch
+
+    @property
+    def columnas(self) -> List[str]:
+        """Columnas públicas, en el orden del catálogo en memoria"""
+        return list(self._columnas)
+
+    @property
+    def tipos(self) -> Dict[str, str]:
+        """Tipo SQL de cada columna pública (BOOLEAN para las guardadas como 0/1)"""
+        return dict(self._tipos)
+
+    @property
+    def columnas_booleanas(self) -> List[str]:
+        """Columnas guardadas como 0/1 que la API entrega como true/false"""
+        return [c for c, t in self._tipos.items() if t == 'BOOLEAN']
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # CARGA
+    # ═══════════════════════════════════════════════════════════════════════
+
+    def cargar(self, forzar: bool = False) -> Optional[Dict[str, int]]:
+        """
+        Ingiere las particiones que cambiaron desde la última ingesta (todas si
+        `forzar`). Retorna el resumen de cambios (None si falló; la base queda
+        como estaba).
+        """
+        with self._lock:
+            conexion = abrir_conexion(self.ruta_db)
+            try:
+                self._crear_meta(conexion)
+                self._leer_meta(conexion)
+
+                particiones = listar_particiones(self.ruta)
+                if not particiones:
+                    print(f"⚠️ Archivo no encontrado: {self.ruta}")
+                    return None
+
+                previas = json.loads(self._meta(conexion, 'particiones') or '{}')
+                firma = self.limites.firma if self.limites is not None else ""
+                fuentes = {p.name: fuente_particion(p, firma) for p in particiones}
+                pendientes = [
+                    p for p in particiones
+                    if forzar or previas.get(p.name, {}).get('fuente') != fuentes[p.name]
+                ]
+                retiradas = [n for n in previas if n not in fuentes]
+                if not pendientes and not retiradas:
+                    print(f"✅ Catálogo SQLite al día: {self._contar(conexion)} registros (versión {self._version})")
+                    return {'nuevos': 0, 'modificados': 0, 'eliminados': 0}
+
+                cambios = self._ingerir(conexion, particiones, pendientes, retiradas, previas, fuentes)
+                leidas = cambios.pop('leidas')
+                print(f"✅ Catálogo SQLite cargado: {self._contar(conexion)} registros (versión {self._version})")
+                print(f"   - Particiones: {len(particiones)} ({leidas} leídas)")
+                print(f"   - Nuevos: {cambios['nuevos']}, modificados: {cambios['modificados']}, "
+                      f"eliminados: {cambios['eliminados']}")
+                return cambios
+
+            except Exception as e:
+                print(f"❌ Error cargando datos en SQLite: {e}")
+                import traceback
+                traceback.print_exc()
+                return None
+            finally:
+                conexion.close()
+
+    def recargar(self) -> Dict[str, Any]:
+        """Vuelve a ingerir las particiones que cambiaron; los ids y versiones de los eventos sin cambios se conservan"""
+        cambios = self.cargar()
+        if cambios is None:
+            raise RuntimeError("No se pudo recargar el catálogo; se conserva la versión anterior")
+        return {'epoch': self._epoch, 'version': self._version, **cambios}
+
+    def _ingerir(
+        self, conexion, particiones: List[Path], pendientes: List[Path], retiradas: List[str],
+        previas: Dict[str, Dict[str, Any]], fuentes: Dict[str, str]
+    ) -> Dict[str, int]:
+        """
+        Upsert por bloques de las particiones pendientes dentro de una
+        transacción: los lectores ven la carga anterior hasta el commit. Cada
+        fila guarda el código de su partición, así las filas de las particiones
+        que no cambiaron no se tocan.
+        """
+        version = self._version + 1
+        conexion.execute("BEGIN IMMEDIATE")
+        try:
+            # El esquema sale de las primeras filas; si se reconstruye, se ingiere todo
+            muestra = limpiar_catalogo(muestra_particion((pendientes or particiones)[0]), self.limites)
+            if self._preparar_esquema(conexion, muestra):
+                previas, pendientes, retiradas = {}, list(particiones), []
+            max_id_previo = conexion.execute("SELECT COALESCE(MAX(id), 0) FROM sismos").fetchone()[0]
+            # Los ids nuevos siguen al mayor vigente o eliminado, como en el catálogo en memoria
+            siguiente_id = max(
+                max_id_previo, conexion.execute("SELECT COALESCE(MAX(id), 0) FROM eliminados").fetchone()[0]
+            ) + 1
+
+            # Código estable por partición; el orden del catálogo es el de los nombres
+            codigos = {n: d['codigo'] for n, d in previas.items()}
+            siguiente = max(codigos.values(), default=0) + 1
+            for ruta in particiones:
+                if ruta.name not in codigos:
+                    codigos[ruta.name] = siguiente
+                    siguiente += 1
+            posiciones = {ruta.name: i for i, ruta in enumerate(particiones)}
+
+            # Una partición intercalada desplaza el _orden de las que siguen
+            for nombre, posicion in posiciones.items():
+                previa = previas.get(nombre)
+                if previa is not None and previa.get('posicion') != posicion:
+                    conexion.execute(
+                        "UPDATE sismos SET _orden = (_orden & ?) | (? << 32) WHERE _particion = ?",
+                        (MASCARA_FILA, posicion, codigos[nombre])
+                    )
+
+            lector = LectorPorBloques(pendientes, self.tamano_bloque, self.progreso)
+            for ruta in pendientes:
+                fila = 0
+                for bloque in lector.bloques(ruta):
+                    df = limpiar_catalogo(bloque, self.limites)
+                    siguiente_id = self._upsert(
+                        conexion, df, version, codigos[ruta.name], (posiciones[ruta.name] << 32) + fila, siguiente_id
+                    )
+                    fila += len(df)
+
+            # Lo que no llegó de las particiones releídas o retiradas se elimina y queda como tombstone
+            afectadas = [codigos[r.name] for r in pendientes] + [codigos[n] for n in retiradas]
+            marcas = ", ".join("?" * len(afectadas))
+            conexion.execute(
+                f"INSERT INTO eliminados (id, version) SELECT id, ? FROM sismos "
+                f"WHERE _particion IN ({marcas}) AND _carga != ?", (version, *afectadas, version)
+            )
+            eliminados = conexion.execute(
+                f"DELETE FROM sismos WHERE _particion IN ({marcas}) AND _carga != ?", (*afectadas, version)
+            ).rowcount
+            conexion.execute(
+                "DELETE FROM sismos_rtree WHERE id IN (SELECT id FROM eliminados WHERE version = ?)", (version,)
+            )
+            conexion.execute(
+                "INSERT OR REPLACE INTO sismos_rtree "
+                "SELECT id, latitud, latitud, longitud, longitud FROM sismos WHERE _version = ?", (version,)
+            )
+
+            nuevos = conexion.execute("SELECT COUNT(*) FROM sismos WHERE id > ?", (max_id_previo,)).fetchone()[0]
+            cambiados = conexion.execute("SELECT COUNT(*) FROM sismos WHERE _version = ?", (version,)).fetchone()[0]
+
+            registro = {
+                ruta.name: {'fuente': fuentes[ruta.name], 'codigo': codigos[ruta.name], 'posicion': posiciones[ruta.name]}
+                for ruta in particiones
+            }
+            self._guardar_meta(conexion, 'version', str(version))
+            self._guardar_meta(conexion, 'particiones', json.dumps(registro))
+            conexion.execute("COMMIT")
+        except Exception:
+            conexion.execute("ROLLBACK")
+            self._leer_meta(conexion)
+            raise
+
+        conexion.execute("PRAGMA optimize")
+        self._leer_meta(conexion)
+        self._actualizar_manifiesto(conexion)
+        return {'nuevos': nuevos, 'modificados': cambiados - nuevos, 'eliminados': eliminados,
+                'leidas': len(pendientes)}
+
+    def _preparar_esquema(self, conexion, df: pd.DataFrame) -> bool:
+        """
+        Crea las tablas a partir de las primeras filas; si el CSV cambió de
+        columnas (o la base es de una versión sin particiones), se reconstruyen.
+        Retorna True si las tablas se crearon de nuevo.
+        """
+        columnas = list(df.columns)
+        tipos = {
+            col: 'BOOLEAN' if df[col].dtype.kind == 'b' else _tipo_sql(col, df[col])
+            for col in columnas
+        }
+        existentes = {fila[1] for fila in conexion.execute("PRAGMA table_info(sismos)")}
+        if self._columnas == columnas and self._tipos == tipos and '_particion' in existentes:
+            return False
+
+        if self._columnas:
+            print("⚠️ El esquema del catálogo cambió: se reconstruye la base SQLite")
+        for tabla in ('sismos', 'sismos_rtree', 'eliminados'):
+            conexion.execute(f"DROP TABLE IF EXISTS {tabla}")
+        conexion.execute("DELETE FROM meta WHERE clave IN ('fuente', 'particiones')")
+        definicion = ",\n".join(
+            f'"{col}" {"INTEGER" if tipos[col] == "BOOLEAN" else tipos[col]}' for col in columnas if col != 'id'
+        )
+        conexion.execute(f"""
+            CREATE TABLE sismos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                {definicion},
+                _clave INTEGER NOT NULL UNIQUE,
+                _huella INTEGER NOT NULL,
+                _version INTEGER NOT NULL,
+                _carga INTEGER NOT NULL,
+                _particion INTEGER NOT NULL,
+                _orden INTEGER NOT NULL
+            )
+        """)
+        for nombre, col in INDICES.items():
+            conexion.execute(f'CREATE INDEX {nombre} ON sismos ("{col}")')
+        conexion.execute("CREATE VIRTUAL TABLE sismos_rtree USING rtree(id, lat_min, lat_max, lon_min, lon_max)")
+        conexion.execute("CREATE TABLE eliminados (id INTEGER NOT NULL, version INTEGER NOT NULL)")
+        conexion.execute("CREATE INDEX ix_eliminados_version ON eliminados (version)")
+
+        # Un esquema nuevo invalida las versiones que tengan los clientes
+        self._guardar_meta(conexion, 'columnas', json.dumps(tipos))
+        self._guardar_meta(conexion, 'epoch', uuid.uuid4().hex[:12])
+        self._columnas = columnas
+        self._tipos = tipos
+        return True
+
+    def _upsert(
+        self, conexion, df: pd.DataFrame, version: int, particion: int, orden: int, siguiente_id: int
+    ) -> int:
+        """
+        Inserta el bloque o actualiza los eventos existentes. Un evento cuyo
+        contenido no cambió conserva su versión; duplicados de la misma clave
+        dentro de una carga se guardan una sola vez (el primero). Los eventos
+        nuevos reciben ids consecutivos desde `siguiente_id` (AUTOINCREMENT
+        gastaría un id por cada conflicto del upsert); retorna el siguiente
+        libre.
+        """
+        contenido = [c for c in df.columns if c != 'id']
+        clave, huella = (h.view(np.int64) for h in huellas(df))
+
+        existentes = [fila[0] for fila in conexion.execute(
+            "SELECT _clave FROM sismos WHERE _clave IN (SELECT value FROM json_each(?))", (json.dumps(clave.tolist()),)
+        )]
+        nuevos = ~np.isin(clave, existentes) & ~pd.Series(clave).duplicated().to_numpy()
+        ids = np.full(len(df), None, dtype=object)
+        ids[nuevos] = range(siguiente_id, siguiente_id + int(nuevos.sum()))
+
+        valores = [ids.tolist()]
+        for col in contenido:
+            if col == 'fecha_hora':
+                segundos = df[col].to_numpy(dtype='datetime64[s]').astype(np.int64)
+                valores.append([None if nulo else int(s) for s, nulo in zip(segundos, df[col].isna().to_numpy())])
+            elif df[col].dtype.kind == 'b':
+                valores.append(df[col].astype(int).tolist())
+            else:
+                valores.append(df[col].tolist())
+        valores += [clave.tolist(), huella.tolist(), [version] * len(df), [version] * len(df),
+                    [particion] * len(df), list(range(orden, orden + len(df)))]
+
+        nombres = (
+            ['id'] + [f'"{c}"' for c in contenido] + ['_clave', '_huella', '_version', '_carga', '_particion', '_orden']
+        )
+        actualizar = ", ".join(f"{n} = excluded.{n}" for n in nombres if n not in ('id', '_clave', '_version'))
+        conexion.executemany(f"""
+            INSERT INTO sismos ({", ".join(nombres)}) VALUES ({", ".join("?" * len(nombres))})
+            ON CONFLICT (_clave) DO UPDATE SET
+                _version = CASE WHEN sismos._huella != excluded._huella THEN excluded._version ELSE sismos._version END,
+                {actualizar}
+            WHERE sismos._carga != excluded._carga
+        """, zip(*valores))
+        return siguiente_id + int(nuevos.sum())
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # METADATOS
+    # ═══════════════════════════════════════════════════════════════════════
+
+    def _crear_meta(self, conexion) -> None:
+        conexion.execute("CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT)")
+
+    def _meta(self, conexion, clave: str) -> Optional[str]:
+        fila = conexion.execute("SELECT valor FROM meta WHERE clave = ?", (clave,)).fetchone()
+        return fila[0] if fila else None
+
+    def _guardar_meta(self, conexion, clave: str, valor: str) -> None:
+        conexion.execute("INSERT OR REPLACE INTO meta (clave, valor) VALUES (?, ?)", (clave, valor))
+
+    def _leer_meta(self, conexion) -> None:
+        self._version = int(self._meta(conexion, 'version') or 0)
+        self._epoch = self._meta(conexion, 'epoch') or ""
+        tipos = self._meta(conexion, 'columnas')
+        self._tipos = json.loads(tipos) if tipos else {}
+        self._columnas = list(self._tipos)
+
+    def _actualizar_manifiesto(self, conexion) -> None:
+        """Estadísticas por partición calculadas en la base (manifiesto del directorio de datos)"""
+        manifiesto = ManifiestoParticiones(self.ruta)
+        registro = json.loads(self._meta(conexion, 'particiones') or '{}')
+        for nombre, estadisticas in self._estadisticas_particiones(conexion).items():
+            manifiesto.entradas[nombre] = {'fuente': registro[nombre]['fuente'], **estadisticas}
+        manifiesto.conservar(list(registro))
+        manifiesto.guardar()
+
+    def _estadisticas_particiones(self, conexion) -> Dict[str, Dict[str, Any]]:
+        if not self._columnas:
+            return {}
+        nombres = {
+            d['codigo']: n for n, d in json.loads(self._meta(conexion, 'particiones') or '{}').items()
+        }
+        filas = conexion.execute("""
+            SELECT _particion, COUNT(*), MIN(fecha_hora), MAX(fecha_hora), MIN(magnitud), MAX(magnitud),
+                   MIN(latitud), MAX(latitud), MIN(longitud), MAX(longitud)
+            FROM sismos GROUP BY _particion
+        """).fetchall()
+        claves = ('registros', 'fecha_min', 'fecha_max', 'magnitud_min', 'magnitud_max',
+                  'lat_min', 'lat_max', 'lon_min', 'lon_max')
+        return {nombres[fila[0]]: dict(zip(claves, fila[1:])) for fila in filas if fila[0] in nombres}
+
+    def _contar(self, conexion) -> int:
+        if not self._columnas:
+            return 0
+        return conexion.execute("SELECT COUNT(*) FROM sismos").fetchone()[0]
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # LECTURA
+    # ═══════════════════════════════════════════════════════════════════════
+
+    def eliminados_desde(self, desde: int) -> List[int]:
+        """Ids eliminados después de la versión `desde`"""
+        if not self._columnas:
+            return []
+        with self.pool.conexion() as conexion:
+            filas = conexion.execute("SELECT id FROM eliminados WHERE version > ? ORDER BY rowid", (desde,))
+            return [fila[0] for fila in filas]
+
+    def particiones(self) -> List[Dict[str, Any]]:
+        """Filas y estadísticas de cada partición ingerida, en el orden del catálogo"""
+        with self.pool.conexion() as conexion:
+            registro = json.loads(self._meta(conexion, 'particiones') or '{}')
+            estadisticas = self._estadisticas_particiones(conexion)
+        orden = sorted(registro, key=lambda n: registro[n]['posicion'])
+        return [
+            {'nombre': n, 'fuente': registro[n]['fuente'], **estadisticas.get(n, {'registros': 0})}
+            for n in orden
+        ]
+
+    def memoria(self) -> Dict[str, Any]:
+        """Bytes en disco por tabla e índice (dbstat)"""
+        with self.pool.conexion() as conexion:
+            registros = self._contar(conexion)
+            objetos = conexion.execute(
+                "SELECT name, SUM(pgsize) FROM dbstat GROUP BY name ORDER BY SUM(pgsize) DESC"
+            ).fetchall()
+        total = int(sum(b for _, b in objetos))
+        return {
+            'backend': 'sqlite',
+            'archivo': self.ruta_db,
+            'registros': registros,
+            'total_bytes': total,
+            'tablas': [{'nombre': nombre, 'bytes': int(b)} for nombre, b in objetos]
+        }
+
+    def cerrar(self) -> None:
+        self.pool.cerrar()
@@ -0,0 +1,612 @@
+# ═══════════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Almacén del Catálogo (columnas compactas)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+import threading
+import uuid
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from typing import List, Optional, Dict, Any, Tuple
+
+from pandas.api.types import union_categoricals
+
+from app.config import settings
+from app.services.limites_service import LimitesService, limites_service
+from app.services.catalog_particiones import (
+    LectorPorBloques, ManifiestoParticiones, ProgresoIngesta, combinar_estadisticas, estadisticas_particion,
+    fuente_particion, listar_particiones, registrar_progreso
+)
+
+
+# Columnas del CSV original → nombres internos (sismos_2024_simple.csv)
+MAPEO_COLUMNAS = {
+    'FechaHora': 'fecha_hora',
+    'Lat': 'latitud',
+    'Lon': 'longitud',
+    'ProfKm': 'profundidad',
+    'Mag': 'magnitud',
+    'TipoMag': 'tipo_magnitud',
+    'Ubicacion': 'ubicacion',
+    'Estado': 'estado',
+    'Fases': 'fases',
+    'RMS': 'rms',
+    'GAP': 'gap'
+}
+
+COLUMNAS_TEXTO = ['municipio', 'departamento', 'tipo_magnitud', 'estado', 'ubicacion']
+COLUMNAS_NUMERICAS = ['latitud', 'longitud', 'profundidad', 'magnitud', 'fases', 'rms', 'gap']
+
+# Texto de baja cardinalidad: se guarda como códigos de categoría
+COLUMNAS_CATEGORICAS = ['tipo_magnitud', 'estado', 'ubicacion', 'municipio', 'departamento', 'tipo_profundidad']
+
+# Columnas que identifican un evento entre recargas del CSV
+CLAVE_NATURAL = ['fecha_hora', 'latitud', 'longitud']
+
+# Marca de fecha faltante en la columna int64 (coincide con NaT de NumPy)
+SIN_FECHA = np.iinfo(np.int64).min
+
+MAX_DECIMALES = 6
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# LIMPIEZA (compartida por los backends del catálogo)
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _extraer_municipio(ubicacion: str) -> str:
+    """Extrae el municipio de la ubicación"""
+    try:
+        if ' - ' in ubicacion:
+            return ubicacion.split(' - ')[0].strip()
+        return ubicacion.split(',')[0].strip()
+    except:
+        return "N/A"
+
+
+def _extraer_departamento(ubicacion: str) -> str:
+    """Extrae el departamento de la ubicación"""
+    try:
+        if ' - ' in ubicacion:
+            parte = ubicacion.split(' - ')[1]
+            if ',' in parte:
+                return parte.split(',')[0].strip()
+            return parte.strip()
+        return "N/A"
+    except:
+        return "N/A"
+
+
+def _clasificar_profundidad(prof: float) -> str:
+    """Clasifica el sismo según profundidad"""
+    try:
+        if pd.isna(prof) or prof < 0:
+            return "N/A"
+        if prof < 70:
+            return "Superficial"
+        if prof < 140:
+            return "Intermedio"
+        if prof <= 180:
+            return "Nido Sísmico"
+        return "Profundo"
+    except:
+        return "N/A"
+
+
+def limpiar_catalogo(df: pd.DataFrame, limites: Optional[LimitesService] = None) -> pd.DataFrame:
+    """
+    Filas crudas del CSV → columnas internas limpias y derivadas. Trabaja fila
+    a fila, así que sirve igual para el archivo completo o para un bloque.
+
+    Con límites municipales disponibles, municipio y departamento salen de la
+    unión espacial (punto en polígono) y es_santander exige el departamento
+    Santander; si no, se extraen del texto de "Ubicacion" como siempre.
+    """
+    df = df.rename(columns=MAPEO_COLUMNAS)
+
+    for col in COLUMNAS_NUMERICAS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+
+    espacial = (
+        limites is not None and limites.disponible
+        and 'latitud' in df.columns and 'longitud' in df.columns
+    )
+    if espacial:
+        df['municipio'], df['departamento'] = limites.asignar(
+            df['latitud'].to_numpy(dtype=float), df['longitud'].to_numpy(dtype=float)
+        )
+    elif 'ubicacion' in df.columns:
+        # Municipio y departamento desde "Ubicacion" ("Los Santos - Santander, Colombia"),
+        # una vez por texto distinto: las ubicaciones se repiten mucho
+        ubicacion = df['ubicacion']
+        distintas = ubicacion.dropna().unique()
+        df['municipio'] = ubicacion.map(dict(zip(distintas, map(_extraer_municipio, distintas)))).fillna("N/A")
+        df['departamento'] = ubicacion.map(dict(zip(distintas, map(_extraer_departamento, distintas)))).fillna("N/A")
+    else:
+        df['municipio'] = "N/A"
+        df['departamento'] = "N/A"
+
+    for col in COLUMNAS_TEXTO:
+        if col in df.columns:
+            df[col] = df[col].fillna('N/A').astype(str)
+            df[col] = df[col].replace('nan', 'N/A')
+            df[col] = df[col].replace('', 'N/A')
+
+    # Agregar ID (lo asigna cada backend, estable entre recargas)
+    df['id'] = 0
+
+    if 'fecha_hora' in df.columns:
+        df['fecha_hora'] = pd.to_datetime(df['fecha_hora'], errors='coerce')
+
+    df['tipo_profundidad'] = df['profundidad'].apply(_clasificar_profundidad)
+    if espacial:
+        df['es_santander'] = df['departamento'].str.casefold() == 'santander'
+    else:
+        df['es_santander'] = df['departamento'].str.lower().str.contains('santander', na=False)
+    df['es_nido'] = df['tipo_profundidad'] == 'Nido Sísmico'
+    return df
+
+
+def huellas(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hash de la clave natural y del contenido (sin id) de cada fila limpia.
+    Enteros y fechas se normalizan (float64, segundos) para que el hash no
+    dependa del bloque en que se leyó la fila: un bloque sin nulos infiere
+    int64 donde otro infiere float64.
+    """
+    normal = {}
+    for col in df.columns:
+        if col == 'id':
+            continue
+        serie = df[col]
+        if serie.dtype.kind == 'M':
+            segundos = serie.to_numpy(dtype='datetime64[s]').astype(np.int64)
+            normal[col] = np.where(serie.isna().to_numpy(), SIN_FECHA, segundos)
+        elif serie.dtype.kind in 'iu':
+            normal[col] = serie.to_numpy(dtype=np.float64)
+        else:
+            normal[col] = serie
+    normal = pd.DataFrame(normal, index=df.index)
+    clave = pd.util.hash_pandas_object(normal[[c for c in CLAVE_NATURAL if c in normal.columns]], index=False)
+    return clave.to_numpy(), pd.util.hash_pandas_object(normal, index=False).to_numpy()
+
+
+class CatalogStore:
+    """
+    Única copia en memoria del catálogo, compartida por todos los servicios.
+
+    Columnas compactas: coordenadas y medidas en float32 (si conservan los
+    decimales del CSV), fecha en segundos epoch int64, texto de baja cardinalidad
+    como categorías y enteros reducidos al tipo más pequeño. `decodificar` y
+    `a_registros` devuelven los valores originales (float64, ISO 8601, str).
+
+    Cada carga construye un DataFrame nuevo y lo publica al final: los lectores
+    toman `df` una vez y trabajan sobre esa instantánea. Las particiones se
+    leen por bloques que se compactan al llegar, así el pico de memoria es
+    el catálogo compacto más un bloque, no varias copias del CSV.
+    """
+
+    def __init__(
+        self, ruta: str, tamano_bloque: int = 50_000, progreso: Optional[ProgresoIngesta] = None,
+        limites: Optional[LimitesService] = None
+    ):
+        self.ruta = ruta
+        self.tamano_bloque = tamano_bloque
+        self.progreso = progreso
+        self.limites = limites
+        # DataFrame y segmentos (filas de cada partición) se publican juntos
+        self._datos: Tuple[Optional[pd.DataFrame], List[Dict[str, Any]]] = (None, [])
+        self._version: int = 0
+        # Identifica esta instancia del catálogo: las versiones de otra
+        # instancia (p. ej. antes de reiniciar el servidor) no son comparables
+        self._epoch: str = uuid.uuid4().hex[:12]
+        # Tombstones: (id, versión en que desapareció del catálogo)
+        self._eliminados: List[Tuple[int, int]] = []
+        self._decimales: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.cargar()
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """Instantánea actual del catálogo (columnas compactas)"""
+        df = self._datos[0]
+        return df if df is not None else pd.DataFrame()
+
+    @property
+    def version(self) -> int:
+        """Versión del dataset cargado (aumenta con cada carga que trae cambios)"""
+        return self._version
+
+    @property
+    def epoch(self) -> str:
+        return self._epoch
+
+    @property
+    def columnas(self) -> List[str]:
+        """Columnas públicas (las que empiezan por '_' son internas)"""
+        return [c for c in self.df.columns if not c.startswith('_')]
+
+    def segmentos(self, df: pd.DataFrame) -> Optional[List[Dict[str, Any]]]:
+        """
+        Filas [inicio, fin) y estadísticas de cada partición dentro de `df`.
+        None si `df` ya no es la instantánea actual (hubo una recarga).
+        """
+        actual, segmentos = self._datos
+        return segmentos if df is actual else None
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # CARGA
+    # ═══════════════════════════════════════════════════════════════════════
+
+    def cargar(self) -> Optional[Dict[str, int]]:
+        """
+        Lee las particiones que cambiaron desde la carga anterior (todas la
+        primera vez); las demás se reutilizan tal como están en memoria. Si
+        falla se conserva la carga anterior. Retorna el resumen de cambios
+        respecto a ella (None si falló).
+        """
+        with self._lock:
+            try:
+                particiones = listar_particiones(self.ruta)
+                if not particiones:
+                    print(f"⚠️ Archivo no encontrado: {self.ruta}")
+                    return None
+
+                anterior, segmentos_previos = self._datos
+                previos = {s['nombre']: s for s in segmentos_previos}
+                manifiesto = ManifiestoParticiones(self.ruta)
+                version = self._version + 1
+                siguiente_id = int(max(
+                    anterior['id'].max() if anterior is not None and len(anterior) else 0,
+                    max((i for i, _ in self._eliminados), default=0)
+                )) + 1
+
+                firma = self.limites.firma if self.limites is not None else ""
+                fuentes = {r.name: fuente_particion(r, firma) for r in particiones}
+                pendientes = [
+                    r for r in particiones if r.name not in previos or previos[r.name]['fuente'] != fuentes[r.name]
+                ]
+                lector = LectorPorBloques(pendientes, self.tamano_bloque, self.progreso)
+
+                partes: List[pd.DataFrame] = []
+                segmentos: List[Dict[str, Any]] = []
+                cambios = {'nuevos': 0, 'modificados': 0, 'eliminados': 0}
+                for ruta in particiones:
+                    previo = previos.pop(ruta.name, None)
+                    if ruta not in pendientes:
+                        partes.append(self._expandir(anterior.iloc[previo['inicio']:previo['fin']]))
+                        segmentos.append(dict(previo))
+                        continue
+
+                    # Partición nueva o modificada: se lee por bloques y se versiona contra su carga anterior
+                    df, estadisticas, bytes_origen = self._leer_particion(ruta, lector)
+                    if df is None:
+                        print(f"⚠️ {ruta.name} no tiene registros")
+                        if previo is not None:
+                            previos[ruta.name] = previo
+                        continue
+                    estadisticas = manifiesto.registrar(ruta, fuentes[ruta.name], estadisticas)
+                    previa = anterior.iloc[previo['inicio']:previo['fin']] if previo is not None else None
+                    df, resumen = self._versionar_registros(df, previa, version, siguiente_id)
+                    siguiente_id += resumen['nuevos']
+                    for clave in cambios:
+                        cambios[clave] += resumen[clave]
+                    partes.append(df)
+                    segmentos.append({'nombre': ruta.name, 'bytes_origen': bytes_origen, **estadisticas})
+                leidas = len(pendientes)
+
+                # Particiones que desaparecieron: todos sus eventos pasan a tombstones
+                for previo in previos.values():
+                    ids = anterior['id'].to_numpy()[previo['inicio']:previo['fin']]
+                    self._eliminados.extend((int(i), version) for i in ids)
+                    cambios['eliminados'] += len(ids)
+
+                manifiesto.conservar([p.name for p in particiones])
+                manifiesto.guardar()
+
+                if anterior is not None and leidas == 0 and not previos:
+                    print(f"✅ Catálogo al día: {len(anterior)} registros (versión {self._version})")
+                    return cambios
+
+                inicio = 0
+                for segmento, parte in zip(segmentos, partes):
+                    segmento['inicio'], segmento['fin'] = inicio, inicio + len(parte)
+                    inicio += len(parte)
+
+                # Cada paso suelta la copia anterior: el pico es el catálogo intermedio más el compacto
+                df = self._unir(partes)
+                partes.clear()
+                df, decimales = self._compactar(df)
+                self._decimales = decimales
+                self._datos = (df, segmentos)
+                self._version = version
+
+                bytes_origen = sum(s['bytes_origen'] for s in segmentos)
+                print(f"✅ Datos cargados: {len(df)} registros (versión {version})")
+                print(f"   - Particiones: {len(segmentos)} ({leidas} leídas)")
+                print(f"   - Sismos en Santander: {df['es_santander'].sum()}")
+                print(f"   - Sismos del Nido: {df['es_nido'].sum()}")
+                print(f"   - Memoria: {bytes_origen / 1e6:.1f} MB → {self.memoria()['total_bytes'] / 1e6:.1f} MB")
+                return cambios
+
+            except Exception as e:
+                print(f"❌ Error cargando datos: {e}")
+                import traceback
+                traceback.print_exc()
+                return None
+
+    def recargar(self) -> Dict[str, Any]:
+        """Vuelve a leer las particiones que cambiaron; los ids y versiones de los eventos sin cambios se conservan"""
+        cambios = self.cargar()
+        if cambios is None:
+            raise RuntimeError("No se pudo recargar el catálogo; se conserva la versión anterior")
+        return {'epoch': self._epoch, 'version': self._version, **cambios}
+
+    def _leer_particion(
+        self, ruta: Path, lector: LectorPorBloques
+    ) -> Tuple[Optional[pd.DataFrame], Dict[str, Any], int]:
+        """
+        Partición → DataFrame con las columnas internas, limpiado y reducido
+        bloque a bloque (texto como categorías, fecha en segundos, huellas de
+        cada fila). Retorna también sus estadísticas y los bytes que habría
+        ocupado sin compactar. None si la partición no trae filas.
+        """
+        partes: List[pd.DataFrame] = []
+        estadisticas: Optional[Dict[str, Any]] = None
+        bytes_origen = 0
+        for bloque in lector.bloques(ruta):
+            if not partes:
+                print(f"📂 {ruta.name}: columnas originales {list(bloque.columns)}")
+            df = limpiar_catalogo(bloque, self.limites)
+            del bloque
+            bytes_origen += int(df.memory_usage(deep=True).sum())
+            estadisticas = combinar_estadisticas(estadisticas, estadisticas_particion(df))
+            df['_clave'], df['_huella'] = huellas(df)
+            df['fecha_hora'] = self._a_segundos(df['fecha_hora'])
+            for col in COLUMNAS_CATEGORICAS:
+                if col in df.columns:
+                    df[col] = df[col].astype('category')
+            partes.append(df)
+
+        if not partes:
+            return None, {}, 0
+        return self._unir(partes), estadisticas, bytes_origen
+
+    def _versionar_registros(
+        self, df: pd.DataFrame, anterior: Optional[pd.DataFrame], version: int, siguiente_id: int
+    ) -> Tuple[pd.DataFrame, Dict[str, int]]:
+        """
+        Asigna a cada evento un id estable y la versión en que cambió por última
+        vez, comparando con la carga anterior de la misma partición por clave
+        natural (fecha, lat, lon) y huella del contenido (ver `huellas`). Los
+        eventos que desaparecen pasan a tombstones. Los ids nuevos empiezan en
+        `siguiente_id`.
+        """
+        # Eventos repetidos con la misma clave se distinguen por su orden de aparición
+        clave = df['_clave'].to_numpy()
+        ocurrencia = pd.Series(clave).groupby(clave).cumcount().to_numpy(dtype=np.uint64)
+        df['_clave'] = clave ^ (ocurrencia * np.uint64(0x9E3779B97F4A7C15))
+
+        if anterior is None or anterior.empty or '_clave' not in anterior.columns:
+            df['id'] = np.arange(siguiente_id, siguiente_id + len(df))
+            df['_version'] = version
+            return df, {'nuevos': len(df), 'modificados': 0, 'eliminados': 0}
+
+        posiciones = pd.Index(anterior['_clave']).get_indexer(df['_clave'])
+        existe = posiciones >= 0
+        previas = posiciones[existe]
+
+        ids = np.zeros(len(df), dtype=np.int64)
+        ids[existe] = anterior['id'].to_numpy()[previas]
+        ids[~existe] = np.arange(siguiente_id, siguiente_id + int((~existe).sum()))
+        df['id'] = ids
+
+        versiones = np.full(len(df), version, dtype=np.int64)
+        sin_cambios = np.zeros(len(df), dtype=bool)
+        sin_cambios[existe] = df['_huella'].to_numpy()[existe] == anterior['_huella'].to_numpy()[previas]
+        versiones[sin_cambios] = anterior['_version'].to_numpy()[posiciones[sin_cambios]]
+        df['_version'] = versiones
+
+        vigentes = np.zeros(len(anterior), dtype=bool)
+        vigentes[previas] = True
+        eliminados = anterior['id'].to_numpy()[~vigentes]
+        self._eliminados.extend((int(i), version) for i in eliminados)
+
+        return df, {
+            'nuevos': int((~existe).sum()),
+            'modificados': int(existe.sum() - sin_cambios.sum()),
+            'eliminados': len(eliminados)
+        }
+
+    @staticmethod
+    def _a_segundos(fechas: pd.Series) -> np.ndarray:
+        """Fechas → segundos epoch int64 (SIN_FECHA si falta)"""
+        valores = fechas.to_numpy(dtype='datetime64[s]').astype(np.int64)
+        return np.where(fechas.isna().to_numpy(), SIN_FECHA, valores)
+
+    def _expandir(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Segmento compacto de una carga anterior → floats con sus valores
+        originales, para recompactarlo junto a las particiones recién leídas
+        (los decimales del conjunto pueden cambiar).
+        """
+        return df.assign(**{
+            col: self.decodificar(df, col) for col in df.columns if df[col].dtype.kind == 'f'
+        })
+
+    @staticmethod
+    def _unir(partes: List[pd.DataFrame]) -> pd.DataFrame:
+        """Concatena las particiones; las categorías se unen sin pasar por objetos str"""
+        if len(partes) == 1:
+            return partes[0].reset_index(drop=True)
+        categoricas = [c for c in COLUMNAS_CATEGORICAS if c in partes[0].columns]
+        df = pd.concat([p.drop(columns=categoricas) for p in partes], ignore_index=True)
+        for col in categoricas:
+            df[col] = union_categoricals(
+                [p[col].astype('category') for p in partes], sort_categories=True, ignore_order=True
+            )
+        return df[list(partes[0].columns)]
+
+    def _compactar(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, int]]:
+        """
+        Tipos compactos por columna. Un float pasa a float32 solo si, redondeado
+        a los decimales que trae el CSV, recupera exactamente el valor original.
+        """
+        compacto = {}
+        decimales: Dict[str, int] = {}
+
+        for col in df.columns:
+            serie = df[col]
+            if col == 'fecha_hora':
+                compacto[col] = self._a_segundos(serie) if serie.dtype.kind == 'M' else serie.to_numpy(np.int64)
+            elif col in COLUMNAS_CATEGORICAS:
+                compacto[col] = serie.astype('category')
+            elif col.startswith('_') and col != '_version':
+                compacto[col] = serie.to_numpy()
+            elif serie.dtype.kind in 'iu':
+                compacto[col] = pd.to_numeric(serie, downcast='integer')
+            elif serie.dtype.kind == 'f':
+                valores = serie.to_numpy(dtype=np.float64)
+                d = self._contar_decimales(valores)
+                reducido = valores.astype(np.float32)
+                if d is not None and np.array_equal(np.round(reducido.astype(np.float64), d), valores):
+                    compacto[col] = reducido
+                    decimales[col] = d
+                else:
+                    compacto[col] = valores
+            else:
+                compacto[col] = serie
+
+        return pd.DataFrame(compacto), decimales
+
+    @staticmethod
+    def _contar_decimales(valores: np.ndarray) -> Optional[int]:
+        """Menor número de decimales que representa exactamente todos los valores"""
+        for d in range(MAX_DECIMALES + 1):
+            if np.array_equal(np.round(valores, d), valores):
+                return d
+        return None
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # LECTURA
+    # ═══════════════════════════════════════════════════════════════════════
+
+    def decodificar(self, df: pd.DataFrame, col: str) -> np.ndarray:
+        """
+        Columna con sus valores originales: float64 con los decimales del CSV,
+        fecha como datetime64[s] (NaT si falta), texto como objetos str.
+        """
+        valores = df[col].to_numpy()
+        if col == 'fecha_hora':
+            return valores.view('datetime64[s]')
+        if col in self._decimales and valores.dtype == np.float32:
+            return np.round(valores.astype(np.float64), self._decimales[col])
+        return valores
+
+    def fechas(self, df: pd.DataFrame) -> pd.Series:
+        """Fechas como Series datetime (para agrupar por mes, ordenar, etc.)"""
+        return pd.Series(self.decodificar(df, 'fecha_hora'), index=df.index)
+
+    @staticmethod
+    def a_epoch(fecha: Any) -> int:
+        """Fecha/Timestamp → segundos epoch, en la misma escala que la columna fecha_hora"""
+        return int(np.datetime64(pd.Timestamp(fecha).to_datetime64(), 's').astype(np.int64))
+
+    @classmethod
+    def rango_fechas(cls, filtros: Dict[str, Any]) -> Tuple[Optional[int], Optional[int]]:
+        """
+        fecha_inicio / fecha_fin de los filtros como segundos epoch inclusivos.
+        Una fecha final sin hora cubre el día completo; None deja el lado abierto.
+        """
+        inicio = fin = None
+        if filtros.get('fecha_inicio') is not None:
+            inicio = cls.a_epoch(filtros['fecha_inicio'])
+        if filtros.get('fecha_fin') is not None:
+            limite = pd.Timestamp(filtros['fecha_fin'])
+            if limite == limite.normalize():
+                fin = cls.a_epoch(limite + pd.Timedelta(days=1)) - 1
+            else:
+                fin = cls.a_epoch(limite)
+        return inicio, fin
+
+    def mascara_texto(self, df: pd.DataFrame, col: str, valor: str) -> np.ndarray:
+        """Igualdad sin distinguir mayúsculas, evaluada una vez por categoría"""
+        serie = df[col]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            coincide = np.asarray(serie.cat.categories.str.lower() == str(valor).lower())
+            codigos = serie.cat.codes.to_numpy()
+            return np.where(codigos >= 0, coincide[codigos], False)
+        return (serie.str.lower() == str(valor).lower()).to_numpy()
+
+    def a_registros(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Filas como diccionarios con tipos nativos de Python (sin columnas
+        internas). La fecha sale en ISO 8601, "" si falta.
+        """
+        columnas = {}
+        for col in df.columns:
+            if col.startswith('_'):
+                continue
+            if col == 'fecha_hora':
+                valores = df[col].to_numpy()
+                fechas = np.datetime_as_string(valores.view('datetime64[s]'), unit='s')
+                columnas[col] = np.where(valores == SIN_FECHA, '', fechas).tolist()
+            else:
+                columnas[col] = self.decodificar(df, col).tolist()
+        return [dict(zip(columnas, fila)) for fila in zip(*columnas.values())]
+
+    def eliminados_desde(self, desde: int) -> List[int]:
+        """Ids eliminados después de la versión `desde`"""
+        return [i for i, v in self._eliminados if v > desde]
+
+    def memoria(self) -> Dict[str, Any]:
+        """Bytes por columna del catálogo compacto y del DataFrame original"""
+        df, segmentos = self._datos
+        df = df if df is not None else pd.DataFrame()
+        uso = df.memory_usage(deep=True, index=False)
+        total = int(uso.sum())
+        bytes_origen = sum(s['bytes_origen'] for s in segmentos)
+        return {
+            'backend': 'memoria',
+            'registros': len(df),
+            'total_bytes': total,
+            'bytes_sin_compactar': bytes_origen,
+            'reduccion': round(bytes_origen / total, 2) if total else None,
+            'columnas': [
+                {
+                    'columna': col,
+                    'dtype': str(df[col].dtype),
+                    'bytes': int(uso[col]),
+                    **({'categorias': len(df[col].cat.categories)} if isinstance(df[col].dtype, pd.CategoricalDtype) else {}),
+                    **({'decimales': self._decimales[col]} if col in self._decimales else {})
+                }
+                for col in df.columns
+            ]
+        }
+
+    def particiones(self) -> List[Dict[str, Any]]:
+        """Manifiesto de la carga actual: filas y estadísticas de cada partición"""
+        return [
+            {k: v for k, v in s.items() if k not in ('inicio', 'fin', 'bytes_origen')}
+            for s in self._datos[1]
+        ]
+
+    def cerrar(self) -> None:
+        """Nada que liberar: el DataFrame vive con el proceso"""
+
+
+def crear_catalog_store():
+    """Backend del catálogo según settings.CATALOGO_BACKEND ("memoria" o "sqlite")"""
+    if settings.CATALOGO_BACKEND == 'sqlite':
+        from app.services.catalog_sqlite import SQLiteCatalogStore
+        return SQLiteCatalogStore(
+            settings.DATA_PATH, settings.CATALOGO_SQLITE_PATH, settings.LECTURAS_WORKERS,
+            settings.INGESTA_LOTE_FILAS, registrar_progreso, limites_service
+        )
+    if settings.CATALOGO_BACKEND != 'memoria':
+        print(f"⚠️ CATALOGO_BACKEND desconocido: {settings.CATALOGO_BACKEND!r}; se usa 'memoria'")
+    return CatalogStore(settings.DATA_PATH, settings.INGESTA_LOTE_FILAS, registrar_progreso, limites_service)
+
+
+# Instancia singleton del catálogo
+catalog_store = crear_catalog_store()
@@ -0,0 +1,250 @@
+# ═══════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Cúmulos 3-D de Hipocentros (Nido de Bucaramanga)
+# ═══════════════════════════════════════════════════════════════════════════
+
+import time
+import numpy as np
+from scipy.spatial import ConvexHull, QhullError
+from typing import Dict, List, Any, Optional, Tuple
+
+from app.config import Constants
+from app.services.sismos_service import sismos_service, SismosService
+from app.utils.cache_utils import LRUCache
+from app.utils.densidad import dbscan, ecef_km, RUIDO
+
+
+EPS_DEFECTO_KM = 5.0
+MIN_EVENTOS_DEFECTO = 10
+
+# El cúmulo del nido es el de centroide más cercano al punto de referencia
+PROFUNDIDAD_NIDO_KM = (Constants.NIDO_DEPTH_MIN + Constants.NIDO_DEPTH_MAX) / 2
+DISTANCIA_MAX_NIDO_KM = 50.0
+
+MAX_CUMULOS = 50        # Cúmulos con casco en la respuesta (los más numerosos)
+DECIMALES = 4
+
+COLUMNAS = ['id', 'tiempo_dias', 'latitud', 'longitud', 'profundidad', 'magnitud']
+
+
+def _casco_3d(xyz: np.ndarray, latitud: np.ndarray, longitud: np.ndarray,
+              profundidad: np.ndarray) -> Tuple[float, Optional[Dict[str, Any]]]:
+    """Volumen (km³) y casco convexo en [lon, lat, profundidad]; (0, None) si es degenerado"""
+    try:
+        casco = ConvexHull(xyz)
+    except (QhullError, ValueError):
+        return 0.0, None
+    # Caras como índices sobre la lista de vértices
+    posicion = np.full(len(xyz), -1, dtype=np.int64)
+    posicion[casco.vertices] = np.arange(len(casco.vertices))
+    vertices = np.column_stack([
+        longitud[casco.vertices], latitud[casco.vertices], profundidad[casco.vertices]
+    ]).round(DECIMALES)
+    return float(casco.volume), {
+        "vertices": vertices.tolist(),
+        "caras": posicion[casco.simplices].tolist()
+    }
+
+
+def _huella(latitud: np.ndarray, longitud: np.ndarray) -> Optional[Dict[str, Any]]:
+    """Proyección en superficie del cúmulo como Polygon GeoJSON (casco convexo 2-D)"""
+    puntos = np.column_stack([longitud, latitud])
+    try:
+        casco = ConvexHull(puntos)
+    except (QhullError, ValueError):
+        return None
+    anillo = puntos[np.append(casco.vertices, casco.vertices[0])].round(DECIMALES)
+    return {"type": "Polygon", "coordinates": [anillo.tolist()]}
+
+
+class CumulosService:
+    """
+    Agrupamiento por densidad (DBSCAN) de los hipocentros en coordenadas
+    ECEF, de modo que eps mide distancias reales en 3-D y la profundidad
+    pesa igual que la separación horizontal. Cada cúmulo se describe con
+    su casco convexo (volumen) y su huella en superficie; el del nido es el
+    más cercano a (NIDO_LAT, NIDO_LON, PROFUNDIDAD_NIDO_KM).
+
+    Los eventos sin coordenadas o profundidad no se agrupan. Los resultados
+    se cachean por versión del catálogo, filtros y parámetros.
+    """
+
+    def __init__(self, sismos: SismosService):
+        self.sismos = sismos
+        self._cache = LRUCache(maxsize=32)
+        self._referencia = ecef_km(
+            np.array([Constants.NIDO_LAT]), np.array([Constants.NIDO_LON]), np.array([PROFUNDIDAD_NIDO_KM])
+        )[0]
+
+    def _clave(self, filtros: Dict[str, Any], *parametros: Any) -> Tuple:
+        return (self.sismos.version, tuple(sorted((k, str(v)) for k, v in filtros.items())), *parametros)
+
+    def _hipocentros(self, filtros: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """Columnas de los eventos con latitud, longitud y profundidad"""
+        datos = self.sismos.get_arrays(COLUMNAS, filtros)
+        validos = (
+            np.isfinite(datos['latitud'].astype(float))
+            & np.isfinite(datos['longitud'].astype(float))
+            & np.isfinite(datos['profundidad'].astype(float))
+        )
+        datos = {col: valores[validos] for col, valores in datos.items()}
+        for col in ('latitud', 'longitud', 'profundidad', 'magnitud'):
+            datos[col] = datos[col].astype(float)
+        datos['xyz'] = ecef_km(datos['latitud'], datos['longitud'], datos['profundidad'])
+        return datos
+
+    def _cumulo_nido(self, xyz: np.ndarray, etiquetas: np.ndarray) -> Optional[int]:
+        """Etiqueta del cúmulo cuyo centroide está más cerca del nido (None si ninguno a DISTANCIA_MAX_NIDO_KM)"""
+        agrupados = etiquetas >= 0
+        if not agrupados.any():
+            return None
+        conteos = np.bincount(etiquetas[agrupados])
+        centroides = np.column_stack([
+            np.bincount(etiquetas[agrupados], weights=xyz[agrupados, eje]) / conteos for eje in range(3)
+        ])
+        distancias = np.linalg.norm(centroides - self._referencia, axis=1)
+        cercano = int(np.argmin(distancias))
+        return cercano if distancias[cercano] <= DISTANCIA_MAX_NIDO_KM else None
+
+    @staticmethod
+    def _describir(datos: Dict[str, np.ndarray], seleccion: np.ndarray, con_casco: bool) -> Dict[str, Any]:
+        latitud, longitud = datos['latitud'][seleccion], datos['longitud'][seleccion]
+        profundidad, magnitud = datos['profundidad'][seleccion], datos['magnitud'][seleccion]
+        volumen, casco = _casco_3d(datos['xyz'][seleccion], latitud, longitud, profundidad)
+        descripcion = {
+            "eventos": int(len(latitud)),
+            "centroide": {
+                "latitud": round(float(latitud.mean()), DECIMALES),
+                "longitud": round(float(longitud.mean()), DECIMALES),
+                "profundidad": round(float(profundidad.mean()), 1)
+            },
+            "profundidad_min": float(profundidad.min()),
+            "profundidad_max": float(profundidad.max()),
+            "magnitud_max": float(np.nanmax(magnitud)) if np.isfinite(magnitud).any() else None,
+            "volumen_km3": round(volumen, 1),
+            "eventos_por_km3": round(len(latitud) / volumen, 4) if volumen > 0 else None
+        }
+        if con_casco:
+            descripcion["casco"] = casco
+            descripcion["huella"] = _huella(latitud, longitud)
+        return descripcion
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # CÚMULOS
+    # ═══════════════════════════════════════════════════════════════════════
+
+    def cumulos(
+        self,
+        filtros: Dict[str, Any],
+        eps_km: float = EPS_DEFECTO_KM,
+        min_eventos: int = MIN_EVENTOS_DEFECTO,
+        incluir_etiquetas: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Cúmulos de los eventos filtrados (los filtros de fecha definen la
+        ventana de tiempo) y, opcionalmente, la etiqueta de cada evento
+        como arreglos paralelos `ids` / `cumulo` (-1 = ruido).
+        """
+        clave = self._clave(filtros, float(eps_km), int(min_eventos))
+        resultado = self._cache.get_or_compute(clave, lambda: self._calcular(filtros, eps_km, min_eventos))
+        if incluir_etiquetas:
+            return resultado
+        return {k: v for k, v in resultado.items() if k != 'etiquetas'}
+
+    def _calcular(self, filtros: Dict[str, Any], eps_km: float, min_eventos: int) -> Dict[str, Any]:
+        inicio = time.perf_counter()
+        datos = self._hipocentros(filtros)
+        etiquetas = dbscan(datos['xyz'], eps_km, min_eventos)
+        nido = self._cumulo_nido(datos['xyz'], etiquetas)
+
+        # Las etiquetas van de mayor a menor cúmulo: los primeros MAX_CUMULOS
+        n_cumulos = int(etiquetas.max()) + 1 if len(etiquetas) else 0
+        orden = np.argsort(etiquetas, kind='stable')
+        limites = np.searchsorted(etiquetas[orden], np.arange(n_cumulos + 1))
+        cumulos: List[Dict[str, Any]] = []
+        for k in range(min(n_cumulos, MAX_CUMULOS)):
+            descripcion = self._describir(datos, orden[limites[k]:limites[k + 1]], con_casco=True)
+            cumulos.append({"cumulo": k, "es_nido": k == nido, **descripcion})
+
+        ruido = int((etiquetas == RUIDO).sum())
+        return {
+            "eps_km": eps_km,
+            "min_eventos": min_eventos,
+            "version_dataset": self.sismos.version,
+            "total_sismos": int(len(etiquetas)),
+            "agrupados": int(len(etiquetas)) - ruido,
+            "ruido": ruido,
+            "n_cumulos": n_cumulos,
+            "cumulo_nido": nido,
+            "cumulos": cumulos,
+            "etiquetas": {
+                "ids": datos['id'].tolist(),
+                "cumulo": etiquetas.tolist()
+            },
+            "tiempo_calculo_ms": round((time.perf_counter() - inicio) * 1000, 1)
+        }
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # EVOLUCIÓN DEL NIDO
+    # ═══════════════════════════════════════════════════════════════════════
+
+    def evolucion(
+        self,
+        filtros: Dict[str, Any],
+        ventana_anios: int = 1,
+        eps_km: float = EPS_DEFECTO_KM,
+        min_eventos: int = MIN_EVENTOS_DEFECTO
+    ) -> Dict[str, Any]:
+        """
+        Agrupamiento independiente en ventanas consecutivas de `ventana_anios`
+        años calendario y, por ventana, el cúmulo del nido: eventos, volumen
+        del casco y centroide. El volumen del casco crece con el número de
+        eventos, por lo que se acompaña de la densidad (eventos por km³).
+        """
+        clave = self._clave(filtros, int(ventana_anios), float(eps_km), int(min_eventos))
+        return self._cache.get_or_compute(
+            clave, lambda: self._calcular_evolucion(filtros, ventana_anios, eps_km, min_eventos)
+        )
+
+    def _calcular_evolucion(
+        self, filtros: Dict[str, Any], ventana_anios: int, eps_km: float, min_eventos: int
+    ) -> Dict[str, Any]:
+        inicio = time.perf_counter()
+        datos = self._hipocentros(filtros)
+        con_fecha = np.flatnonzero(np.isfinite(datos['tiempo_dias']))
+        con_fecha = con_fecha[np.argsort(datos['tiempo_dias'][con_fecha], kind='stable')]
+        tiempos = datos['tiempo_dias'][con_fecha]
+
+        ventanas: List[Dict[str, Any]] = []
+        if len(tiempos):
+            anios = np.floor(tiempos[[0, -1]]).astype(np.int64).astype('datetime64[D]').astype('datetime64[Y]').astype(int) + 1970
+            for anio in range(int(anios[0]), int(anios[1]) + 1, ventana_anios):
+                desde = np.datetime64(f"{anio:04d}-01-01", 'D')
+                hasta = np.datetime64(f"{anio + ventana_anios:04d}-01-01", 'D')
+                a, b = np.searchsorted(tiempos, [desde.astype(int), hasta.astype(int)])
+                filas = con_fecha[a:b]
+
+                etiquetas = dbscan(datos['xyz'][filas], eps_km, min_eventos)
+                nido = self._cumulo_nido(datos['xyz'][filas], etiquetas)
+                ventana = {
+                    "inicio": str(desde),
+                    "fin": str(hasta - np.timedelta64(1, 'D')),
+                    "eventos": int(len(filas)),
+                    "n_cumulos": int(etiquetas.max()) + 1 if len(etiquetas) else 0,
+                    "nido": None
+                }
+                if nido is not None:
+                    ventana["nido"] = self._describir(datos, filas[etiquetas == nido], con_casco=False)
+                ventanas.append(ventana)
+
+        return {
+            "ventana_anios": ventana_anios,
+            "eps_km": eps_km,
+            "min_eventos": min_eventos,
+            "version_dataset": self.sismos.version,
+            "ventanas": ventanas,
+            "tiempo_calculo_ms": round((time.perf_counter() - inicio) * 1000, 1)
+        }
+
+
+# Instancia singleton
+cumulos_service = CumulosService(sismos_service)
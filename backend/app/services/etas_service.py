@@ -0,0 +1,355 @@
+# ═══════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Simulador Estocástico ETAS
+# ═══════════════════════════════════════════════════════════════════════════
+
+import time
+import numpy as np
+from typing import Dict, List, Any, Tuple
+
+from app.models import (
+    ETASInput, ETASOutput, TipoProfundidad,
+    BandaPronostico, ProbabilidadMagnitud, ReplicaSintetica
+)
+from app.services.simulador_service import simulador_service
+from app.utils.process_pool import map_en_paralelo
+
+
+# Realizaciones por lote: fijo para que el resultado dependa solo de la semilla,
+# no del número de workers disponibles
+REALIZACIONES_POR_LOTE = 500
+
+# Límites de seguridad por lote
+MAX_GENERACIONES = 50
+MAX_EVENTOS_LOTE = 5_000_000
+MAX_EVENTOS_EJEMPLO = 2000
+
+KM_POR_GRADO = 111.195
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# MODELO ETAS
+# ═══════════════════════════════════════════════════════════════════════════
+
+class ETASModel:
+    """
+    Modelo ETAS (Epidemic-Type Aftershock Sequence).
+    Cada evento dispara réplicas con productividad K·10^(α(M-Mc)), tiempos
+    Omori-Utsu normalizados, magnitudes Gutenberg-Richter truncadas y un
+    núcleo espacial de ley de potencias escalado con la longitud de ruptura.
+    """
+
+    def __init__(self, omori_model):
+        # c y p se toman del modelo Omori-Utsu para mantener ambos modelos consistentes
+        self.omori_model = omori_model
+
+        # Productividad por tipo de profundidad (secuencias intermedias son pobres en réplicas)
+        self.params_by_depth = {
+            'Superficial': {'K': 0.09, 'alpha': 0.9},
+            'Intermedio': {'K': 0.06, 'alpha': 0.9},
+            'Nido Sísmico': {'K': 0.03, 'alpha': 0.9},
+            'Profundo': {'K': 0.03, 'alpha': 0.9}
+        }
+
+        self.b = 1.0        # Gutenberg-Richter
+        self.mc = 2.5       # Magnitud mínima simulada
+        self.m_max = 8.0    # Magnitud máxima regional
+        self.q = 1.5        # Exponente del núcleo espacial
+        self.p_min = 1.05   # p > 1 para que la distribución de tiempos sea normalizable
+
+    def get_params(self, depth_type: str, ajustados: bool = False) -> Dict[str, float]:
+        """Parámetros completos del modelo para un tipo de profundidad"""
+        productividad = self.params_by_depth.get(depth_type, self.params_by_depth['Intermedio'])
+        c, p = self.omori_model.get_params(depth_type, ajustados)
+
+        params = {
+            'K': productividad['K'],
+            'alpha': productividad['alpha'],
+            'c': c,
+            'p': max(p, self.p_min),
+            'b': self.b,
+            'mc': self.mc,
+            'm_max': self.m_max,
+            'q': self.q
+        }
+
+        if self.omori_model.usa_ajustados(depth_type, ajustados):
+            params.update(self._productividad_ajustada(depth_type, params))
+
+        return params
+
+    def _productividad_ajustada(self, depth_type: str, params: Dict[str, float]) -> Dict[str, float]:
+        """
+        Traduce la productividad Omori-Utsu ajustada a ETAS: con α = 1 (igual que
+        calculate_K) un evento de magnitud Mc produce el mismo número total de
+        réplicas en ambos modelos. K se limita para mantener el proceso subcrítico.
+        """
+        c, p, mc = params['c'], params['p'], params['mc']
+        K_mc = self.omori_model.calculate_K(mc, depth_type, ajustados=True) * 10 ** -(mc - 2.0)
+        ajuste = {'K': K_mc * c ** (1 - p) / (p - 1), 'alpha': 1.0}
+
+        n = self.branching_ratio({**params, **ajuste})
+        if n > 0.9:
+            ajuste['K'] *= 0.9 / n
+        return ajuste
+
+    @staticmethod
+    def branching_ratio(params: Dict[str, float]) -> float:
+        """Número medio de hijos directos por evento (debe ser < 1)"""
+        K, alpha, b = params['K'], params['alpha'], params['b']
+        delta = params['m_max'] - params['mc']
+        norm = 1 - 10 ** (-b * delta)
+
+        if abs(b - alpha) < 1e-9:
+            esperanza = b * np.log(10) * delta / norm
+        else:
+            esperanza = b / (b - alpha) * (1 - 10 ** ((alpha - b) * delta)) / norm
+
+        return float(K * esperanza)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# GENERACIÓN VECTORIZADA (se ejecuta en los procesos del pool)
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _longitud_ruptura(magnitud: np.ndarray) -> np.ndarray:
+    """Escala espacial del núcleo (km), media longitud de ruptura de Wells-Coppersmith"""
+    return np.maximum(0.5 * 10 ** (-2.44 + 0.59 * magnitud), 0.1)
+
+
+def simular_lote(
+    params: Dict[str, float],
+    latitud: float,
+    longitud: float,
+    profundidad: float,
+    magnitud: float,
+    dias: int,
+    magnitud_minima: float,
+    realizaciones: int,
+    semilla: np.random.SeedSequence,
+    guardar_ejemplo: bool
+) -> Dict[str, Any]:
+    """
+    Simula un lote de realizaciones generación por generación.
+    Todas las realizaciones del lote avanzan juntas: cada generación es un
+    único muestreo vectorizado sobre todos los padres vivos.
+    """
+    rng = np.random.default_rng(semilla)
+
+    K, alpha, c, p = params['K'], params['alpha'], params['c'], params['p']
+    b, mc, m_max, q = params['b'], params['mc'], params['m_max'], params['q']
+    T = float(dias)
+    norm_gr = 1 - 10 ** (-b * (m_max - mc))
+
+    conteo = np.zeros(realizaciones * dias, dtype=np.int64)
+    max_mag = np.full(realizaciones, -np.inf)
+
+    # Generación 0: el sismo principal de cada realización
+    rid = np.arange(realizaciones)
+    t = np.zeros(realizaciones)
+    m = np.full(realizaciones, magnitud)
+    lat = np.full(realizaciones, latitud)
+    lon = np.full(realizaciones, longitud)
+    prof = np.full(realizaciones, profundidad)
+
+    ejemplo: List[np.ndarray] = []
+    total_eventos = 0
+    truncado = False
+
+    for generacion in range(1, MAX_GENERACIONES + 1):
+        # Número de hijos: Poisson con la fracción de Omori que cae en la ventana
+        fraccion = 1 - (1 + (T - t) / c) ** (1 - p)
+        mu = K * 10 ** (alpha * (m - mc)) * fraccion
+        n_hijos = rng.poisson(mu)
+        n = int(n_hijos.sum())
+        if n == 0:
+            break
+
+        total_eventos += n
+        if total_eventos > MAX_EVENTOS_LOTE:
+            truncado = True
+            break
+
+        padre = np.repeat(np.arange(len(t)), n_hijos)
+
+        # Tiempos: inversa de la CDF de Omori truncada en la ventana
+        u = rng.random(n) * fraccion[padre]
+        t_hijo = t[padre] + c * ((1 - u) ** (1 / (1 - p)) - 1)
+
+        # Magnitudes: Gutenberg-Richter truncada
+        m_hijo = mc - np.log10(1 - rng.random(n) * norm_gr) / b
+
+        # Posición: núcleo de ley de potencias centrado en el padre
+        d = _longitud_ruptura(m[padre])
+        r = d * np.sqrt((1 - rng.random(n)) ** (1 / (1 - q)) - 1)
+        theta = rng.random(n) * 2 * np.pi
+        lat_hijo = lat[padre] + r * np.cos(theta) / KM_POR_GRADO
+        lon_hijo = lon[padre] + r * np.sin(theta) / (KM_POR_GRADO * np.cos(np.radians(lat[padre])))
+        prof_hijo = np.clip(prof[padre] + rng.standard_normal(n) * 0.5 * d, 0, 300)
+        rid_hijo = rid[padre]
+
+        # Acumular conteos diarios y magnitud máxima por realización
+        visibles = m_hijo >= magnitud_minima
+        dia = np.minimum(t_hijo[visibles].astype(np.int64), dias - 1)
+        conteo += np.bincount(rid_hijo[visibles] * dias + dia, minlength=realizaciones * dias)
+        np.maximum.at(max_mag, rid_hijo, m_hijo)
+
+        if guardar_ejemplo:
+            sel = rid_hijo == 0
+            if sel.any():
+                ejemplo.append(np.column_stack([
+                    t_hijo[sel], lat_hijo[sel], lon_hijo[sel], prof_hijo[sel],
+                    m_hijo[sel], np.full(int(sel.sum()), generacion)
+                ]))
+
+        rid, t, m, lat, lon, prof = rid_hijo, t_hijo, m_hijo, lat_hijo, lon_hijo, prof_hijo
+
+    return {
+        'conteo': conteo.reshape(realizaciones, dias).astype(np.int32),
+        'max_mag': max_mag,
+        'ejemplo': np.vstack(ejemplo) if ejemplo else np.empty((0, 6)),
+        'truncado': truncado
+    }
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SERVICIO ETAS
+# ═══════════════════════════════════════════════════════════════════════════
+
+class ETASService:
+    """Servicio de simulación estocástica de secuencias de réplicas"""
+
+    def __init__(self):
+        self.model = ETASModel(simulador_service.omori_model)
+
+    def simular(self, params: ETASInput) -> ETASOutput:
+        """Genera catálogos sintéticos y los resume en bandas de pronóstico"""
+        contexto, tareas = self.preparar(params)
+        return self.resumir(contexto, map_en_paralelo(simular_lote, tareas))
+
+    def preparar(self, params: ETASInput) -> Tuple[Dict[str, Any], List[Tuple]]:
+        """
+        Parámetros del modelo y un lote de `simular_lote` por cada
+        REALIZACIONES_POR_LOTE, con semillas hijas independientes. El
+        contexto se pasa a `resumir` junto con los lotes ya simulados.
+        """
+        inicio = time.perf_counter()
+
+        depth_type = simulador_service.clasificar_profundidad(params.profundidad)
+        ajustados = self.model.omori_model.usa_ajustados(depth_type, params.usar_parametros_ajustados)
+        modelo = self.model.get_params(depth_type, ajustados)
+
+        semilla = params.semilla
+        if semilla is None:
+            semilla = int(np.random.SeedSequence().entropy % (2 ** 63))
+
+        n_lotes = -(-params.realizaciones // REALIZACIONES_POR_LOTE)
+        semillas = np.random.SeedSequence(semilla).spawn(n_lotes)
+        tareas = []
+        for i in range(n_lotes):
+            n = min(REALIZACIONES_POR_LOTE, params.realizaciones - i * REALIZACIONES_POR_LOTE)
+            tareas.append((
+                modelo, params.latitud, params.longitud, params.profundidad, params.magnitud,
+                params.dias, params.magnitud_minima, n, semillas[i], i == 0
+            ))
+
+        contexto = {
+            'params': params, 'depth_type': depth_type, 'ajustados': ajustados,
+            'modelo': modelo, 'semilla': semilla, 'inicio': inicio
+        }
+        return contexto, tareas
+
+    def resumir(self, contexto: Dict[str, Any], lotes: List[Dict[str, Any]]) -> ETASOutput:
+        """Bandas de pronóstico y probabilidades a partir de los lotes simulados, en orden"""
+        params = contexto['params']
+        modelo = contexto['modelo']
+        conteo = np.vstack([l['conteo'] for l in lotes])
+        max_mag = np.concatenate([l['max_mag'] for l in lotes])
+
+        return ETASOutput(
+            epicentro={'lat': params.latitud, 'lon': params.longitud},
+            magnitud=params.magnitud,
+            profundidad=params.profundidad,
+            tipo_profundidad=TipoProfundidad(contexto['depth_type']),
+            dias=params.dias,
+            realizaciones=params.realizaciones,
+            semilla=contexto['semilla'],
+            magnitud_minima=params.magnitud_minima,
+            parametros={k: round(float(v), 4) for k, v in modelo.items()},
+            razon_ramificacion=round(self.model.branching_ratio(modelo), 3),
+            parametros_ajustados=contexto['ajustados'],
+            **self._resumen_total(conteo),
+            bandas=self._bandas(conteo),
+            probabilidades=self._probabilidades(max_mag, params.magnitud_minima, params.magnitud),
+            catalogo_ejemplo=self._catalogo_ejemplo(lotes[0]['ejemplo']),
+            truncado=any(l['truncado'] for l in lotes),
+            tiempo_calculo_ms=round((time.perf_counter() - contexto['inicio']) * 1000, 1)
+        )
+
+    def _resumen_total(self, conteo: np.ndarray) -> Dict[str, float]:
+        """Distribución del total de réplicas en la ventana"""
+        total = conteo.sum(axis=1)
+        p05, p50, p95 = np.percentile(total, [5, 50, 95])
+        return {
+            'total_media': round(float(total.mean()), 2),
+            'total_p05': float(p05),
+            'total_p50': float(p50),
+            'total_p95': float(p95)
+        }
+
+    def _bandas(self, conteo: np.ndarray) -> List[BandaPronostico]:
+        """Percentiles diarios y acumulados sobre todas las realizaciones"""
+        acumulado = np.cumsum(conteo, axis=1)
+        diario_pct = np.percentile(conteo, [5, 50, 95], axis=0)
+        acum_pct = np.percentile(acumulado, [5, 50, 95], axis=0)
+        diario_media = conteo.mean(axis=0)
+        acum_media = acumulado.mean(axis=0)
+
+        return [
+            BandaPronostico(
+                dia=d + 1,
+                media=round(float(diario_media[d]), 2),
+                p05=float(diario_pct[0, d]),
+                p50=float(diario_pct[1, d]),
+                p95=float(diario_pct[2, d]),
+                acumulado_media=round(float(acum_media[d]), 2),
+                acumulado_p05=float(acum_pct[0, d]),
+                acumulado_p50=float(acum_pct[1, d]),
+                acumulado_p95=float(acum_pct[2, d])
+            )
+            for d in range(conteo.shape[1])
+        ]
+
+    def _probabilidades(
+        self, max_mag: np.ndarray, magnitud_minima: float, magnitud: float
+    ) -> List[ProbabilidadMagnitud]:
+        """Probabilidad de al menos una réplica ≥ M, en pasos de 0.5"""
+        umbrales = np.arange(magnitud_minima, max(magnitud, magnitud_minima) + 1e-9, 0.5)
+        return [
+            ProbabilidadMagnitud(
+                magnitud=round(float(u), 1),
+                probabilidad_pct=round(float((max_mag >= u).mean() * 100), 1)
+            )
+            for u in umbrales
+        ]
+
+    def _catalogo_ejemplo(self, eventos: np.ndarray) -> List[ReplicaSintetica]:
+        """Catálogo de la primera realización, ordenado por tiempo"""
+        if len(eventos) == 0:
+            return []
+
+        eventos = eventos[np.argsort(eventos[:, 0])][:MAX_EVENTOS_EJEMPLO]
+        return [
+            ReplicaSintetica(
+                tiempo_dias=round(float(e[0]), 4),
+                latitud=round(float(e[1]), 4),
+                longitud=round(float(e[2]), 4),
+                profundidad=round(float(e[3]), 1),
+                magnitud=round(float(e[4]), 2),
+                generacion=int(e[5])
+            )
+            for e in eventos
+        ]
+
+
+# Instancia singleton
+etas_service = ETASService()
@@ -10,6 +10,9 @@ from datetime import datetime
 from app.services.sismos_service import sismos_service
 
 
+LIMITE_EXPORTACION = 10000
+
+
 class ExportService:
     """Servicio para exportación de datos en diferentes formatos"""
     
@@ -19,13 +22,7 @@ class ExportService:
     def exportar_csv(self, filtros: Dict[str, Any] = None) -> str:
         """Exporta datos a formato CSV"""
         
-        datos = self.sismos.obtener_todos(
-            limit=10000,
-            departamento=filtros.get('departamento') if filtros else None,
-            tipo_profundidad=filtros.get('tipo_profundidad') if filtros else None,
-            magnitud_min=filtros.get('magnitud_min') if filtros else None,
-            magnitud_max=filtros.get('magnitud_max') if filtros else None
-        )
+        datos = self.sismos.get_filtrados(filtros, limite=LIMITE_EXPORTACION)
         
         if not datos:
             return "No hay datos para exportar"
@@ -64,13 +61,7 @@ class ExportService:
     def exportar_geojson(self, filtros: Dict[str, Any] = None) -> Dict:
         """Exporta datos a formato GeoJSON"""
         
-        datos = self.sismos.obtener_todos(
-            limit=10000,
-            departamento=filtros.get('departamento') if filtros else None,
-            tipo_profundidad=filtros.get('tipo_profundidad') if filtros else None,
-            magnitud_min=filtros.get('magnitud_min') if filtros else None,
-            magnitud_max=filtros.get('magnitud_max') if filtros else None
-        )
+        datos = self.sismos.get_filtrados(filtros, limite=LIMITE_EXPORTACION)
         
         features = []
         for sismo in datos:
@@ -113,13 +104,7 @@ class ExportService:
     def exportar_kml(self, filtros: Dict[str, Any] = None) -> str:
         """Exporta datos a formato KML para Google Earth"""
         
-        datos = self.sismos.obtener_todos(
-            limit=10000,
-            departamento=filtros.get('departamento') if filtros else None,
-            tipo_profundidad=filtros.get('tipo_profundidad') if filtros else None,
-            magnitud_min=filtros.get('magnitud_min') if filtros else None,
-            magnitud_max=filtros.get('magnitud_max') if filtros else None
-        )
+        datos = self.sismos.get_filtrados(filtros, limite=LIMITE_EXPORTACION)
         
         # Colores por tipo de profundidad (en formato KML: aabbggrr)
         colores = {
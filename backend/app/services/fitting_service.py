@@ -0,0 +1,282 @@
+# ═══════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Ajuste de Parámetros Omori-Utsu
+# ═══════════════════════════════════════════════════════════════════════════
+
+import threading
+import time
+import numpy as np
+from scipy.optimize import minimize
+from typing import Dict, List, Any, Optional
+
+from app.services.sismos_service import sismos_service, SismosService
+from app.services.simulador_service import simulador_service, OmoriUtsuModel
+
+
+# Selección de secuencias réplica
+MAGNITUD_PRINCIPAL_MIN = 3.5    # Magnitud mínima del sismo principal
+MAGNITUD_REPLICA_MIN = 2.0      # Completitud del catálogo (referencia de calculate_K)
+VENTANA_DIAS = 30.0             # Duración de cada secuencia
+VENTANA_PROFUNDIDAD_KM = 30.0   # Diferencia máxima de profundidad principal-réplica
+
+# Mínimos para considerar confiable un ajuste
+MIN_SECUENCIAS = 3
+MIN_REPLICAS = 20
+
+KM_POR_GRADO = 111.195
+
+
+def _radio_gardner_knopoff(magnitud: np.ndarray) -> np.ndarray:
+    """Ventana espacial de Gardner-Knopoff (km)"""
+    return 10 ** (0.1238 * magnitud + 0.983)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# VEROSIMILITUD OMORI-UTSU APILADA
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _integral_omori(T: np.ndarray, c: float, p: float):
+    """∫₀ᵀ (t+c)^-p dt y sus derivadas respecto a c y p"""
+    X, Y = T + c, c
+    d_c = X ** -p - Y ** -p
+
+    if abs(1 - p) < 1e-4:
+        I = np.log(X / Y)
+        d_p = -(np.log(X) ** 2 - np.log(Y) ** 2) / 2
+    else:
+        q = 1 - p
+        Xq, Yq = X ** q, Y ** q
+        I = (Xq - Yq) / q
+        d_p = (-np.log(X) * Xq + np.log(Y) * Yq) / q + (Xq - Yq) / q ** 2
+
+    return I, d_c, d_p
+
+
+def log_verosimilitud_negativa(
+    theta: np.ndarray,
+    t: np.ndarray,
+    A_evento: np.ndarray,
+    mu_evento: np.ndarray,
+    A_secuencia: np.ndarray,
+    T_secuencia: np.ndarray
+):
+    """
+    -log L y su gradiente para secuencias apiladas sobre un fondo conocido:
+        λ_j(t) = μ_j + k·A_j·(t + c)^-p
+    theta = (log k, log c, p). A_j = 10^(M_j - 1.67) escala la productividad
+    con la magnitud del principal, igual que calculate_K. El término μ_j·T_j
+    no depende de theta y se omite.
+    """
+    k, c = np.exp(theta[:2])
+    p = theta[2]
+
+    r = k * A_evento * (t + c) ** -p
+    lam = mu_evento + r
+
+    I, dI_c, dI_p = _integral_omori(T_secuencia, c, p)
+    kA = k * A_secuencia
+
+    ll = np.sum(np.log(lam)) - np.sum(kA * I)
+
+    grad = np.array([
+        np.sum(r / lam) - np.sum(kA * I),
+        np.sum(-p * c * r / (t + c) / lam) - c * np.sum(kA * dI_c),
+        np.sum(-np.log(t + c) * r / lam) - np.sum(kA * dI_p)
+    ])
+
+    return -ll, -grad
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SERVICIO DE AJUSTE
+# ═══════════════════════════════════════════════════════════════════════════
+
+class OmoriFittingService:
+    """
+    Estima (K, c, p) por tipo de profundidad con máxima verosimilitud sobre
+    las secuencias réplica del catálogo cargado. El ajuste corre en un hilo
+    de fondo al iniciar y se cachea por versión del dataset.
+    """
+
+    def __init__(self, sismos: SismosService, omori_model: OmoriUtsuModel):
+        self.sismos = sismos
+        self.omori_model = omori_model
+        self._cache: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._hilo: Optional[threading.Thread] = None
+
+    def iniciar_en_segundo_plano(self) -> None:
+        """Lanza el ajuste para la versión actual del dataset en un hilo de fondo"""
+        with self._lock:
+            if self.sismos.version in self._cache:
+                return
+            if self._hilo is not None and self._hilo.is_alive():
+                return
+            self._hilo = threading.Thread(target=self._ajustar_version_actual, name="ajuste-omori", daemon=True)
+            self._hilo.start()
+
+    def obtener_resultados(self) -> Optional[Dict[str, Any]]:
+        """Resultados del ajuste para la versión actual (None si aún no existen)"""
+        return self._cache.get(self.sismos.version)
+
+    def estado(self) -> Dict[str, Any]:
+        """Estado del ajuste para la versión actual del dataset"""
+        resultados = self.obtener_resultados()
+        en_curso = self._hilo is not None and self._hilo.is_alive()
+        return {
+            "version_dataset": self.sismos.version,
+            "estado": "listo" if resultados else ("en_curso" if en_curso else "pendiente"),
+            "resultados": resultados
+        }
+
+    def _ajustar_version_actual(self) -> None:
+        """Ajusta todos los tipos de profundidad y publica los parámetros en el modelo"""
+        version = self.sismos.version
+        inicio = time.perf_counter()
+
+        try:
+            resultados = self.ajustar()
+        except Exception as e:
+            print(f"❌ Error ajustando parámetros Omori-Utsu: {e}")
+            return
+
+        self._cache = {version: {
+            "tipos": resultados,
+            "tiempo_calculo_ms": round((time.perf_counter() - inicio) * 1000, 1)
+        }}
+        self.omori_model.params_ajustados = {
+            tipo: {'c': r['c'], 'p': r['p'], 'k_factor': r['k_factor']}
+            for tipo, r in resultados.items() if r['ajustado']
+        }
+        print(f"✅ Parámetros Omori-Utsu ajustados: {list(self.omori_model.params_ajustados)}")
+
+    def ajustar(self) -> Dict[str, Dict[str, Any]]:
+        """Extrae las secuencias réplica y ajusta cada tipo de profundidad"""
+        datos = self.sismos.get_arrays(
+            ['tiempo_dias', 'latitud', 'longitud', 'profundidad', 'magnitud', 'tipo_profundidad']
+        )
+        validos = ~np.isnan(datos['tiempo_dias'])
+        orden = np.argsort(datos['tiempo_dias'][validos], kind='stable')
+        datos = {k: v[validos][orden] for k, v in datos.items()}
+
+        resultados = {}
+        for tipo in self.omori_model.params_by_depth:
+            secuencias = self._extraer_secuencias(datos, tipo)
+            resultados[tipo] = self._ajustar_tipo(tipo, secuencias)
+        return resultados
+
+    def _extraer_secuencias(self, datos: Dict[str, np.ndarray], tipo: str) -> List[Dict[str, Any]]:
+        """
+        Secuencias del tipo de profundidad: cada principal (M ≥ umbral) reclama
+        los eventos posteriores en su ventana espacio-temporal; los principales
+        se procesan de mayor a menor magnitud y cada evento pertenece a una sola secuencia.
+        La tasa de fondo de cada secuencia es la de su misma ventana espacial
+        fuera del intervalo de la secuencia.
+        """
+        t, mag = datos['tiempo_dias'], datos['magnitud']
+        asignado = np.zeros(len(t), dtype=bool)
+        t_ini = t[0] if len(t) else 0.0
+        t_fin = t[-1] if len(t) else 0.0
+
+        candidatos = np.where((datos['tipo_profundidad'] == tipo) & (mag >= MAGNITUD_PRINCIPAL_MIN))[0]
+        candidatos = candidatos[np.argsort(-mag[candidatos], kind='stable')]
+
+        secuencias = []
+        for i in candidatos:
+            if asignado[i]:
+                continue
+
+            T = min(VENTANA_DIAS, t_fin - t[i])
+            if T <= 0:
+                continue
+
+            # Ventana espacial sobre todo el catálogo
+            dist = KM_POR_GRADO * np.hypot(
+                datos['latitud'] - datos['latitud'][i],
+                (datos['longitud'] - datos['longitud'][i]) * np.cos(np.radians(datos['latitud'][i]))
+            )
+            en_ventana = (
+                (dist <= _radio_gardner_knopoff(mag[i]))
+                & (np.abs(datos['profundidad'] - datos['profundidad'][i]) <= VENTANA_PROFUNDIDAD_KM)
+                & (mag >= MAGNITUD_REPLICA_MIN)
+            )
+
+            ini, fin = np.searchsorted(t, [t[i], t[i] + T], side='right')
+            en_secuencia = np.zeros(len(t), dtype=bool)
+            en_secuencia[ini:fin] = True
+
+            replicas = np.where(en_ventana & en_secuencia & (mag < mag[i]) & ~asignado)[0]
+            duracion_fondo = (t_fin - t_ini) - T
+            fondo = np.count_nonzero(en_ventana & ~en_secuencia) / duracion_fondo if duracion_fondo > 0 else 0.0
+
+            asignado[i] = True
+            asignado[replicas] = True
+            secuencias.append({
+                'magnitud': float(mag[i]),
+                'duracion': float(T),
+                'fondo': max(fondo, 1e-6),
+                'tiempos': np.maximum(t[replicas] - t[i], 1e-5)
+            })
+
+        return secuencias
+
+    def _ajustar_tipo(self, tipo: str, secuencias: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Máxima verosimilitud (L-BFGS-B con gradiente analítico) para un tipo"""
+        base = self.omori_model.params_by_depth[tipo]
+        n_replicas = int(sum(len(s['tiempos']) for s in secuencias))
+        resultado = {
+            'ajustado': False,
+            'secuencias': len(secuencias),
+            'replicas': n_replicas,
+            'c': base['c'],
+            'p': base['p'],
+            'k_factor': base['k_factor'],
+            'fondo_medio': None,
+            'log_verosimilitud': None
+        }
+
+        if len(secuencias) < MIN_SECUENCIAS or n_replicas < MIN_REPLICAS:
+            return resultado
+
+        n_por_secuencia = [len(s['tiempos']) for s in secuencias]
+        A_secuencia = np.array([10 ** (s['magnitud'] - 1.67) for s in secuencias])
+        T_secuencia = np.array([s['duracion'] for s in secuencias])
+        mu_secuencia = np.array([s['fondo'] for s in secuencias])
+        t = np.concatenate([s['tiempos'] for s in secuencias])
+        A_evento = np.repeat(A_secuencia, n_por_secuencia)
+        mu_evento = np.repeat(mu_secuencia, n_por_secuencia)
+
+        # Punto inicial: c y p calibrados, k para reproducir el exceso sobre el fondo
+        exceso = max(n_replicas - np.sum(mu_secuencia * T_secuencia), n_replicas * 0.1)
+        I0, _, _ = _integral_omori(T_secuencia, base['c'], base['p'])
+        k0 = max(exceso / np.sum(A_secuencia * I0), 1e-8)
+        theta0 = np.array([np.log(k0), np.log(base['c']), base['p']])
+        limites = [(np.log(1e-9), np.log(1e3)), (np.log(1e-4), np.log(2.0)), (0.5, 2.5)]
+
+        opt = minimize(
+            log_verosimilitud_negativa, theta0,
+            args=(t, A_evento, mu_evento, A_secuencia, T_secuencia),
+            jac=True, method='L-BFGS-B', bounds=limites
+        )
+        if not np.isfinite(opt.fun):
+            return resultado
+
+        # Un óptimo en el borde indica que el catálogo no restringe el parámetro
+        en_limite = any(
+            np.isclose(x, lim[0]) or np.isclose(x, lim[1])
+            for x, lim in zip(opt.x[1:], limites[1:])
+        )
+
+        k, c = np.exp(opt.x[:2])
+        resultado.update({
+            'ajustado': bool(opt.success) and not en_limite,
+            'c': round(float(c), 4),
+            'p': round(float(opt.x[2]), 3),
+            'k_factor': float(f"{k:.4g}"),
+            'fondo_medio': round(float(mu_secuencia.mean()), 4),
+            'log_verosimilitud': round(float(-opt.fun), 2)
+        })
+        return resultado
+
+
+# Instancia singleton
+fitting_service = OmoriFittingService(sismos_service, simulador_service.omori_model)
@@ -0,0 +1,115 @@
+# ═══════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Nomenclátor de Municipios
+# ═══════════════════════════════════════════════════════════════════════════
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Optional
+from scipy.spatial import cKDTree
+
+from app.config import settings
+
+
+RADIO_TIERRA_KM = 6371.0
+
+COLUMNAS_REQUERIDAS = ['municipio', 'departamento', 'latitud', 'longitud', 'poblacion']
+
+
+def a_cartesianas(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """Coordenadas (x, y, z) sobre la esfera unitaria"""
+    lat = np.radians(np.asarray(latitudes, dtype=float))
+    lon = np.radians(np.asarray(longitudes, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def cuerda_desde_km(distancia_km: float) -> float:
+    """Cuerda en la esfera unitaria equivalente a una distancia de gran círculo"""
+    angulo = min(distancia_km / RADIO_TIERRA_KM, np.pi)
+    return 2.0 * np.sin(angulo / 2.0)
+
+
+class GazetteerService:
+    """
+    Municipios con coordenadas y población, indexados con un KD-tree sobre la
+    esfera unitaria para consultar solo los que caen dentro de un radio.
+    """
+
+    def __init__(self, ruta: Optional[str] = None):
+        self.ruta = Path(ruta or settings.MUNICIPIOS_PATH)
+        self._df: Optional[pd.DataFrame] = None
+        self._arbol: Optional[cKDTree] = None
+        self._registros: List[Dict] = []
+        self._cargar()
+
+    def _cargar(self) -> None:
+        """Carga el CSV del nomenclátor y construye el índice espacial"""
+        if not self.ruta.exists():
+            print(f"⚠️ Nomenclátor no encontrado: {self.ruta}")
+            self._df = pd.DataFrame(columns=COLUMNAS_REQUERIDAS)
+            return
+
+        df = pd.read_csv(self.ruta, encoding='utf-8')
+        faltantes = set(COLUMNAS_REQUERIDAS) - set(df.columns)
+        if faltantes:
+            raise ValueError(f"Faltan columnas en {self.ruta.name}: {', '.join(sorted(faltantes))}")
+
+        df = df.dropna(subset=['latitud', 'longitud']).reset_index(drop=True)
+        df['poblacion'] = pd.to_numeric(df['poblacion'], errors='coerce').fillna(0).astype(int)
+
+        self._df = df
+        self._lat = df['latitud'].to_numpy(dtype=float)
+        self._lon = df['longitud'].to_numpy(dtype=float)
+        self._arbol = cKDTree(a_cartesianas(self._lat, self._lon))
+        self._registros = [
+            {
+                'ciudad': r.municipio,
+                'latitud': float(r.latitud),
+                'longitud': float(r.longitud),
+                'poblacion': int(r.poblacion),
+                'departamento': r.departamento
+            }
+            for r in df.itertuples(index=False)
+        ]
+        print(f"🏘️ Nomenclátor cargado: {len(df)} municipios")
+
+    def __len__(self) -> int:
+        return len(self._registros)
+
+    @property
+    def registros(self) -> List[Dict]:
+        """Todos los municipios en el formato de la lista de ciudades"""
+        return self._registros
+
+    @property
+    def df(self) -> pd.DataFrame:
+        return self._df
+
+    def en_radio(self, latitud: float, longitud: float, radio_km: float) -> np.ndarray:
+        """Índices de los municipios a menos de `radio_km` del punto"""
+        if self._arbol is None or radio_km <= 0:
+            return np.array([], dtype=np.int64)
+
+        centro = a_cartesianas([latitud], [longitud])[0]
+        indices = self._arbol.query_ball_point(centro, cuerda_desde_km(radio_km))
+        return np.sort(np.asarray(indices, dtype=np.int64))
+
+    def buscar(self, nombre: str, departamento: Optional[str] = None) -> Optional[int]:
+        """Índice del municipio por nombre (sin distinguir mayúsculas); None si no existe"""
+        nombre = nombre.strip().lower()
+        departamento = departamento.strip().lower() if departamento else None
+        for i, registro in enumerate(self._registros):
+            if registro['ciudad'].lower() == nombre and (
+                departamento is None or str(registro['departamento']).lower() == departamento
+            ):
+                return i
+        return None
+
+    def coordenadas(self, indices: np.ndarray):
+        """Latitudes y longitudes de los municipios indicados"""
+        return self._lat[indices], self._lon[indices]
+
+
+# Instancia singleton
+gazetteer_service = GazetteerService()
@@ -0,0 +1,231 @@
+# ═══════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Análisis Gutenberg-Richter
+# ═══════════════════════════════════════════════════════════════════════════
+
+import time
+import numpy as np
+from typing import Dict, List, Any, Optional, Tuple
+
+from app.services.sismos_service import sismos_service, SismosService
+from app.utils.cache_utils import LRUCache
+from app.utils.process_pool import map_en_paralelo
+
+
+DELTA_M = 0.1               # Resolución de magnitud del catálogo
+CORRECCION_MAXC = 0.2       # Corrección de máxima curvatura (Woessner & Wiemer, 2005)
+NIVELES_GFT = (95.0, 90.0)  # Niveles de bondad de ajuste, en orden de preferencia
+MIN_EVENTOS = 50            # Eventos mínimos para un análisis
+MIN_EVENTOS_MC = 25         # Eventos mínimos sobre un Mc candidato
+BOOTSTRAP_POR_LOTE = 250
+SEMILLA_DEFECTO = 2024      # Semilla fija: la misma consulta siempre da el mismo intervalo
+
+METODOS_MC = ('maxc', 'gft')
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# ESTIMADORES VECTORIZADOS SOBRE HISTOGRAMAS
+# Cada fila de `conteos` es un histograma de magnitudes (catálogo o réplica
+# bootstrap), de modo que todo el bootstrap se calcula en bloque.
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _b_aki_utsu(conteos: np.ndarray, mags: np.ndarray, idx_mc: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """b de Aki-Utsu (con corrección por intervalo) y número de eventos sobre Mc, por fila"""
+    sobre = np.arange(len(mags))[None, :] >= idx_mc[:, None]
+    n = (conteos * sobre).sum(axis=1)
+    suma = (conteos * sobre * mags[None, :]).sum(axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        media = suma / n
+        b = np.log10(np.e) / (media - (mags[idx_mc] - DELTA_M / 2))
+
+    b[n < 2] = np.nan
+    return b, n
+
+
+def _mc_maxc(conteos: np.ndarray) -> np.ndarray:
+    """Índice del bin de máxima curvatura (moda del histograma) + corrección"""
+    corr = int(round(CORRECCION_MAXC / DELTA_M))
+    return np.minimum(np.argmax(conteos, axis=1) + corr, conteos.shape[1] - 1)
+
+
+def _mc_gft(conteos: np.ndarray, mags: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Índice de Mc por bondad de ajuste (Wiemer & Wyss, 2000): el menor Mc candidato
+    cuyo residuo entre histograma observado y sintético da R ≥ 95% (o 90%).
+    Sin ningún candidato aceptable se usa máxima curvatura. Retorna (índice, R).
+    """
+    n_filas, nb = conteos.shape
+    candidatos = np.arange(nb)
+
+    # b y N para cada (fila, candidato): tensores filas × candidatos
+    idx = np.broadcast_to(candidatos, (n_filas, nb)).ravel()
+    b, n = _b_aki_utsu(np.repeat(conteos, nb, axis=0), mags, idx)
+    b, n = b.reshape(n_filas, nb), n.reshape(n_filas, nb)
+
+    # Histograma sintético por bin para cada candidato
+    dm = mags[None, None, :] - mags[None, :, None]
+    sobre = dm >= -1e-9
+    with np.errstate(invalid='ignore', over='ignore'):
+        fraccion = 10 ** (-b[:, :, None] * dm) * (1 - 10 ** (-b[:, :, None] * DELTA_M))
+    sintetico = n[:, :, None] * fraccion
+    observado = conteos[:, None, :]
+
+    residuo = np.where(sobre, np.abs(observado - sintetico), 0).sum(axis=2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        R = 100 - 100 * residuo / n
+    R[(n < MIN_EVENTOS_MC) | ~np.isfinite(R)] = -np.inf
+
+    resultado = _mc_maxc(conteos)
+    encontrado = np.zeros(n_filas, dtype=bool)
+    for nivel in NIVELES_GFT:
+        aceptable = R >= nivel
+        nuevos = aceptable.any(axis=1) & ~encontrado
+        resultado[nuevos] = np.argmax(aceptable[nuevos], axis=1)
+        encontrado |= nuevos
+
+    return resultado, R[np.arange(n_filas), resultado]
+
+
+def _estimar(conteos: np.ndarray, mags: np.ndarray, metodo: str) -> Dict[str, np.ndarray]:
+    """Mc y b por fila con el método indicado"""
+    if metodo == 'gft':
+        idx_mc, R = _mc_gft(conteos, mags)
+    else:
+        idx_mc, R = _mc_maxc(conteos), np.full(len(conteos), np.nan)
+
+    b, n = _b_aki_utsu(conteos, mags, idx_mc)
+    return {'idx_mc': idx_mc, 'mc': mags[idx_mc], 'b': b, 'n': n, 'R': R}
+
+
+def _bootstrap_lote(
+    conteos: np.ndarray, mags: np.ndarray, metodo: str, n_replicas: int, semilla: np.random.SeedSequence
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Réplicas bootstrap de un lote. Remuestrear eventos con reemplazo equivale a
+    una extracción multinomial del histograma, así que cada réplica cuesta O(bins).
+    """
+    rng = np.random.default_rng(semilla)
+    total = int(conteos.sum())
+    replicas = rng.multinomial(total, conteos / total, size=n_replicas)
+    est = _estimar(replicas, mags, metodo)
+    return est['mc'], est['b']
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SERVICIO GUTENBERG-RICHTER
+# ═══════════════════════════════════════════════════════════════════════════
+
+class GutenbergRichterService:
+    """Magnitud de completitud (Mc) y valor b del catálogo, con intervalos bootstrap"""
+
+    def __init__(self, sismos: SismosService):
+        self.sismos = sismos
+        self._cache = LRUCache(maxsize=256)
+
+    def analizar(
+        self,
+        filtros: Optional[Dict[str, Any]] = None,
+        metodo: str = 'gft',
+        bootstrap: int = 500,
+        semilla: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Resultado cacheado por versión del dataset y parámetros de la consulta"""
+        if metodo not in METODOS_MC:
+            raise ValueError(f"Método de Mc no soportado: {metodo}")
+
+        filtros = {k: v for k, v in (filtros or {}).items() if v is not None}
+        semilla = SEMILLA_DEFECTO if semilla is None else semilla
+        clave = (self.sismos.version, tuple(sorted((k, str(v)) for k, v in filtros.items())), metodo, bootstrap, semilla)
+
+        return self._cache.get_or_compute(
+            clave, lambda: self._calcular(filtros, metodo, bootstrap, semilla)
+        )
+
+    def _calcular(self, filtros: Dict[str, Any], metodo: str, bootstrap: int, semilla: int) -> Dict[str, Any]:
+        """Histograma, estimación puntual y bootstrap en paralelo"""
+        inicio = time.perf_counter()
+
+        magnitudes = self.sismos.get_arrays(['magnitud'], filtros)['magnitud'].astype(float)
+        if len(magnitudes) < MIN_EVENTOS:
+            raise ValueError(f"Se requieren al menos {MIN_EVENTOS} eventos (hay {len(magnitudes)})")
+
+        # Histograma de magnitudes en bins de DELTA_M
+        k = np.round(magnitudes / DELTA_M).astype(np.int64)
+        k_min = int(k.min())
+        conteos = np.bincount(k - k_min).astype(np.int64)
+        mags = np.round((k_min + np.arange(len(conteos))) * DELTA_M, 1)
+
+        est = _estimar(conteos[None, :], mags, metodo)
+        mc, b, n_sobre = float(est['mc'][0]), float(est['b'][0]), int(est['n'][0])
+        sobre = magnitudes >= mc - 1e-9
+
+        # Error de Shi & Bolt (1982)
+        m_sobre = magnitudes[sobre]
+        b_error = 2.3 * b ** 2 * np.sqrt(np.sum((m_sobre - m_sobre.mean()) ** 2) / (n_sobre * (n_sobre - 1)))
+        a = np.log10(n_sobre) + b * mc
+
+        resultado = {
+            "version_dataset": self.sismos.version,
+            "filtros": filtros,
+            "metodo": metodo,
+            "n_eventos": int(len(magnitudes)),
+            "n_sobre_mc": n_sobre,
+            "mc": mc,
+            "mc_maxc": float(mags[_mc_maxc(conteos[None, :])[0]]),
+            "gft_r": round(float(est['R'][0]), 1) if np.isfinite(est['R'][0]) else None,
+            "b": round(b, 3),
+            "b_error_shi_bolt": round(float(b_error), 3),
+            "a": round(float(a), 3),
+            "bootstrap": self._bootstrap(conteos, mags, metodo, bootstrap, semilla),
+            "distribucion": self._distribucion(conteos, mags, a, b, mc),
+        }
+        resultado["tiempo_calculo_ms"] = round((time.perf_counter() - inicio) * 1000, 1)
+        return resultado
+
+    def _bootstrap(
+        self, conteos: np.ndarray, mags: np.ndarray, metodo: str, n: int, semilla: int
+    ) -> Optional[Dict[str, Any]]:
+        """Intervalos del 95% para Mc y b, con lotes repartidos en el pool de procesos"""
+        if n <= 0:
+            return None
+
+        n_lotes = -(-n // BOOTSTRAP_POR_LOTE)
+        semillas = np.random.SeedSequence(semilla).spawn(n_lotes)
+        tareas = [
+            (conteos, mags, metodo, min(BOOTSTRAP_POR_LOTE, n - i * BOOTSTRAP_POR_LOTE), semillas[i])
+            for i in range(n_lotes)
+        ]
+        lotes = map_en_paralelo(_bootstrap_lote, tareas)
+
+        mc = np.concatenate([l[0] for l in lotes])
+        b = np.concatenate([l[1] for l in lotes])
+        mc_lo, mc_hi = np.percentile(mc, [2.5, 97.5])
+        b_lo, b_hi = np.nanpercentile(b, [2.5, 97.5])
+
+        return {
+            "replicas": n,
+            "semilla": semilla,
+            "mc_ic95": [round(float(mc_lo), 2), round(float(mc_hi), 2)],
+            "mc_std": round(float(mc.std()), 3),
+            "b_ic95": [round(float(b_lo), 3), round(float(b_hi), 3)],
+            "b_std": round(float(np.nanstd(b)), 3),
+        }
+
+    def _distribucion(
+        self, conteos: np.ndarray, mags: np.ndarray, a: float, b: float, mc: float
+    ) -> List[Dict[str, Any]]:
+        """Distribución frecuencia-magnitud observada y curva GR ajustada (desde Mc)"""
+        acumulado = np.cumsum(conteos[::-1])[::-1]
+        return [
+            {
+                "magnitud": float(m),
+                "cantidad": int(c),
+                "acumulado": int(ac),
+                "acumulado_gr": round(float(10 ** (a - b * m)), 2) if m >= mc - 1e-9 else None
+            }
+            for m, c, ac in zip(mags, conteos, acumulado)
+        ]
+
+
+# Instancia singleton
+gutenberg_richter_service = GutenbergRichterService(sismos_service)
@@ -0,0 +1,250 @@
+# ═══════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Intensidades Históricas por Municipio
+# ═══════════════════════════════════════════════════════════════════════════
+
+import threading
+import time
+import numpy as np
+from typing import Dict, List, Any, Optional
+
+from app.services.sismos_service import sismos_service, SismosService
+from app.services.gazetteer_service import gazetteer_service, GazetteerService
+from app.services.simulador_service import simulador_service, SeismicAttenuationModel
+
+
+ESCALA_CODIFICACION = 20    # intensidad = valor_uint8 / 20, como el raster del ShakeMap
+INTENSIDAD_MIN = 2.0        # Bajo II no se siente: esas celdas no se guardan
+INTENSIDAD_SENTIDA = 3.0    # "Sentido": intensidad III o mayor
+MAX_PARES = 2_000_000       # Celdas evento × municipio evaluadas a la vez
+
+NIVELES_ROMANOS = ['I', 'II', 'III', 'IV', 'V', 'VI', 'VII', 'VIII', 'IX', 'X', 'XI', 'XII']
+
+COLUMNAS = ['id', 'tiempo_dias', 'latitud', 'longitud', 'profundidad', 'magnitud']
+
+
+class IntensidadesHistoricasService:
+    """
+    Matriz evento × municipio de la intensidad estimada con el modelo de
+    atenuación, calculada una vez por versión del catálogo (en segundo plano
+    al iniciar y tras cada recarga) por lotes vectorizados.
+
+    Se guarda dispersa por municipio (formato CSC): solo las celdas con
+    intensidad ≥ II, como uint8 truncado a 0.05 de intensidad y con los eventos en
+    orden cronológico. Los resúmenes por municipio (sentidos, máximo, conteo
+    por nivel) quedan precalculados; el historial de un municipio es un corte
+    contiguo de la matriz.
+    """
+
+    def __init__(self, sismos: SismosService, gazetteer: GazetteerService, modelo: SeismicAttenuationModel):
+        self.sismos = sismos
+        self.gazetteer = gazetteer
+        self.modelo = modelo
+        self._matriz: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    def iniciar_en_segundo_plano(self) -> None:
+        """Calcula la matriz de la versión actual en un hilo de fondo"""
+        threading.Thread(target=self._obtener_matriz, name="intensidades-historicas", daemon=True).start()
+
+    def _obtener_matriz(self) -> Dict[str, Any]:
+        """Matriz de la versión actual; se recalcula si cambió el catálogo"""
+        version = self.sismos.version
+        actual = self._matriz
+        if actual is not None and actual['version'] == version:
+            return actual
+
+        with self._lock:
+            if self._matriz is not None and self._matriz['version'] == version:
+                return self._matriz
+            self._matriz = self._construir(version)
+            return self._matriz
+
+    def _construir(self, version: int) -> Dict[str, Any]:
+        inicio = time.perf_counter()
+        datos = self.sismos.get_arrays(COLUMNAS)
+        for col in ('latitud', 'longitud', 'profundidad', 'magnitud'):
+            datos[col] = datos[col].astype(float)
+        validos = np.flatnonzero(
+            np.isfinite(datos['latitud']) & np.isfinite(datos['longitud'])
+            & np.isfinite(datos['profundidad']) & np.isfinite(datos['magnitud'])
+        )
+        # Orden cronológico (sin fecha al final): el historial sale ordenado
+        validos = validos[np.argsort(datos['tiempo_dias'][validos], kind='stable')]
+        eventos = {col: valores[validos] for col, valores in datos.items()}
+
+        lat_sitios, lon_sitios = self.gazetteer.coordenadas(np.arange(len(self.gazetteer)))
+        n, m = len(validos), len(lat_sitios)
+
+        filas, columnas, valores = [], [], []
+        lote = max(1, MAX_PARES // max(m, 1))
+        for a in range(0, n if m else 0, lote):
+            b = min(a + lote, n)
+            distancia = self.modelo.haversine_distance(
+                eventos['latitud'][a:b, None], eventos['longitud'][a:b, None], lat_sitios[None, :], lon_sitios[None, :]
+            )
+            intensidad = self.modelo.calculate_intensity_array(
+                eventos['magnitud'][a:b, None], distancia, eventos['profundidad'][a:b, None]
+            )
+            # Truncar: valor / 20 ≤ intensidad, así los umbrales por nivel son exactos
+            codigo = np.floor(intensidad * ESCALA_CODIFICACION).astype(np.uint8)
+            fila, columna = np.nonzero(codigo >= INTENSIDAD_MIN * ESCALA_CODIFICACION)
+            filas.append((fila + a).astype(np.int32))
+            columnas.append(columna)
+            valores.append(codigo[fila, columna])
+
+        filas = np.concatenate(filas) if filas else np.empty(0, dtype=np.int32)
+        columnas = np.concatenate(columnas) if columnas else np.empty(0, dtype=np.int64)
+        valores = np.concatenate(valores) if valores else np.empty(0, dtype=np.uint8)
+
+        # CSC: por municipio, eventos en orden cronológico (argsort estable)
+        orden = np.argsort(columnas, kind='stable')
+        filas, valores = filas[orden], valores[orden]
+        punteros = np.searchsorted(columnas[orden], np.arange(m + 1))
+
+        matriz = {
+            'version': version,
+            'eventos': eventos,
+            'punteros': punteros,
+            'filas': filas,
+            'valores': valores,
+            'resumen': self._resumir(punteros, filas, valores, eventos)
+        }
+        memoria = filas.nbytes + valores.nbytes + punteros.nbytes
+        print(f"✅ Intensidades históricas: {n} eventos × {m} municipios, {len(valores)} celdas ≥ II "
+              f"({memoria / 1024:.0f} KB, {(time.perf_counter() - inicio) * 1000:.0f} ms, versión {version})")
+        return matriz
+
+    def _resumir(
+        self, punteros: np.ndarray, filas: np.ndarray, valores: np.ndarray, eventos: Dict[str, np.ndarray]
+    ) -> List[Dict[str, Any]]:
+        """Sentidos, intensidad máxima y eventos por nivel de cada municipio"""
+        m = len(punteros) - 1
+        columna = np.repeat(np.arange(m), np.diff(punteros))
+        nivel = valores // ESCALA_CODIFICACION
+        por_nivel = np.zeros((m, len(NIVELES_ROMANOS) + 1), dtype=np.int64)
+        np.add.at(por_nivel, (columna, nivel), 1)
+
+        # Celda de intensidad máxima por municipio (el primer evento en empate)
+        maxima = np.zeros(m, dtype=np.int64)
+        np.maximum.at(maxima, columna, valores)
+        candidatas = np.flatnonzero(valores == maxima[columna])
+        posicion = np.full(m, len(valores), dtype=np.int64)
+        np.minimum.at(posicion, columna[candidatas], candidatas)
+        primera = np.full(m, -1, dtype=np.int64)
+        con_celdas = posicion < len(valores)
+        primera[con_celdas] = filas[posicion[con_celdas]]
+
+        umbral = int(INTENSIDAD_SENTIDA)
+        resumen = []
+        for i, registro in enumerate(self.gazetteer.registros):
+            evento_max = None
+            if primera[i] >= 0:
+                fila = primera[i]
+                evento_max = {
+                    "id": int(eventos['id'][fila]),
+                    "fecha_hora": self._fecha(eventos['tiempo_dias'][fila]),
+                    "magnitud": float(eventos['magnitud'][fila]),
+                    "profundidad": float(eventos['profundidad'][fila])
+                }
+            resumen.append({
+                "ciudad": registro['ciudad'],
+                "departamento": registro['departamento'],
+                "poblacion": registro['poblacion'],
+                "eventos_percibidos": int(punteros[i + 1] - punteros[i]),
+                "eventos_sentidos": int(por_nivel[i, umbral:].sum()),
+                "intensidad_max": round(maxima[i] / ESCALA_CODIFICACION, 2) if primera[i] >= 0 else None,
+                "mercalli_max": NIVELES_ROMANOS[maxima[i] // ESCALA_CODIFICACION - 1] if primera[i] >= 0 else None,
+                "evento_max": evento_max,
+                "por_nivel": {
+                    NIVELES_ROMANOS[k - 1]: int(por_nivel[i, k])
+                    for k in range(int(INTENSIDAD_MIN), len(NIVELES_ROMANOS) + 1) if por_nivel[i, k]
+                }
+            })
+        return resumen
+
+    @staticmethod
+    def _fecha(tiempo_dias: float) -> Optional[str]:
+        if not np.isfinite(tiempo_dias):
+            return None
+        return str(np.datetime64(int(round(tiempo_dias * 86400.0)), 's'))
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # CONSULTAS
+    # ═══════════════════════════════════════════════════════════════════════
+
+    def resumen(self, orden: str = 'sentidos') -> Dict[str, Any]:
+        """Resumen de todos los municipios, por eventos sentidos o por intensidad máxima"""
+        matriz = self._obtener_matriz()
+        if orden == 'intensidad':
+            clave = lambda r: (r['intensidad_max'] or 0.0, r['eventos_sentidos'])
+        else:
+            clave = lambda r: (r['eventos_sentidos'], r['intensidad_max'] or 0.0)
+        return {
+            "version_dataset": matriz['version'],
+            "eventos_evaluados": int(len(matriz['eventos']['id'])),
+            "intensidad_sentida": INTENSIDAD_SENTIDA,
+            "municipios": sorted(matriz['resumen'], key=clave, reverse=True)
+        }
+
+    def historial(
+        self,
+        ciudad: str,
+        departamento: Optional[str] = None,
+        intensidad_min: float = INTENSIDAD_SENTIDA,
+        limite: int = 500
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Eventos que sacudieron el municipio con intensidad ≥ intensidad_min,
+        del más reciente al más antiguo, y su conteo por año. None si el
+        municipio no existe.
+        """
+        indice = self.gazetteer.buscar(ciudad, departamento)
+        if indice is None:
+            return None
+        matriz = self._obtener_matriz()
+        corte = slice(matriz['punteros'][indice], matriz['punteros'][indice + 1])
+        filas, valores = matriz['filas'][corte], matriz['valores'][corte]
+        seleccion = valores >= np.floor(intensidad_min * ESCALA_CODIFICACION)
+        filas, valores = filas[seleccion], valores[seleccion]
+
+        eventos = matriz['eventos']
+        tiempos = eventos['tiempo_dias'][filas]
+        con_fecha = np.isfinite(tiempos)
+        anios = tiempos[con_fecha].astype(np.int64).astype('datetime64[D]').astype('datetime64[Y]').astype(int) + 1970
+        por_anio, conteos = np.unique(anios, return_counts=True)
+
+        # Los eventos sin fecha quedan al final del orden cronológico
+        recientes = np.concatenate([np.flatnonzero(con_fecha)[::-1], np.flatnonzero(~con_fecha)])[:limite]
+        lat_sitio, lon_sitio = self.gazetteer.coordenadas(np.array([indice]))
+        distancias = self.modelo.haversine_distance(
+            eventos['latitud'][filas[recientes]], eventos['longitud'][filas[recientes]], lat_sitio[0], lon_sitio[0]
+        )
+        registro = self.gazetteer.registros[indice]
+        return {
+            "ciudad": registro['ciudad'],
+            "departamento": registro['departamento'],
+            "version_dataset": matriz['version'],
+            "intensidad_min": intensidad_min,
+            "total": int(len(filas)),
+            "por_anio": {str(a): int(c) for a, c in zip(por_anio, conteos)},
+            "eventos": [
+                {
+                    "id": int(eventos['id'][fila]),
+                    "fecha_hora": self._fecha(eventos['tiempo_dias'][fila]),
+                    "magnitud": float(eventos['magnitud'][fila]),
+                    "profundidad": float(eventos['profundidad'][fila]),
+                    "distancia_km": round(float(distancia), 1),
+                    "intensidad": round(valor / ESCALA_CODIFICACION, 2),
+                    "mercalli": NIVELES_ROMANOS[valor // ESCALA_CODIFICACION - 1]
+                }
+                for fila, valor, distancia in zip(
+                    filas[recientes].tolist(), valores[recientes].tolist(), distancias.tolist()
+                )
+            ]
+        }
+
+
+# Instancia singleton
+intensidades_historicas_service = IntensidadesHistoricasService(
+    sismos_service, gazetteer_service, simulador_service.attenuation_model
+)
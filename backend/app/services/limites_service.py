@@ -0,0 +1,98 @@
+# ═══════════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Límites Municipales (unión espacial)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+import json
+import numpy as np
+from pathlib import Path
+from typing import Optional, Tuple
+
+from app.config import settings
+from app.utils.poligonos import IndicePoligonos, anillos_geojson
+
+
+# Propiedades del GeoJSON con el nombre del municipio y del departamento
+# (nombres propios y los del Marco Geoestadístico Nacional del DANE)
+CLAVES_MUNICIPIO = ('municipio', 'MPIO_CNMBR', 'NOMBRE_MPI', 'MPIO_NOMBRE', 'nombre', 'name')
+CLAVES_DEPARTAMENTO = ('departamento', 'DPTO_CNMBR', 'NOMBRE_DPT', 'DPTO_NOMBRE')
+
+SIN_MUNICIPIO = "N/A"
+
+
+def _propiedad(propiedades: dict, claves: Tuple[str, ...]) -> str:
+    for clave in claves:
+        valor = propiedades.get(clave)
+        if valor not in (None, ''):
+            return str(valor).strip()
+    return SIN_MUNICIPIO
+
+
+class LimitesService:
+    """
+    Polígonos municipales de un GeoJSON local (settings.LIMITES_MUNICIPALES_PATH)
+    para asignar municipio y departamento a cada evento por su ubicación: los
+    eventos en el mar o fuera de todo municipio quedan como "N/A". Sin el
+    archivo, el catálogo sigue extrayéndolos del texto de "Ubicacion".
+    """
+
+    def __init__(self, ruta: Optional[str] = None):
+        self.ruta = Path(ruta or settings.LIMITES_MUNICIPALES_PATH)
+        self._indice: Optional[IndicePoligonos] = None
+        self._municipios = np.array([], dtype=object)
+        self._departamentos = np.array([], dtype=object)
+        # Tamaño y fecha del GeoJSON: si cambia, las particiones se vuelven a ingerir
+        self.firma = ""
+        self._cargar()
+
+    def _cargar(self) -> None:
+        if not self.ruta.exists():
+            print(f"ℹ️ Sin límites municipales ({self.ruta.name}): municipio y departamento salen de 'Ubicacion'")
+            return
+
+        try:
+            datos = json.loads(self.ruta.read_text(encoding='utf-8'))
+            anillos, municipios, departamentos = [], [], []
+            for feature in datos.get('features', []):
+                partes = anillos_geojson(feature.get('geometry') or {})
+                if not partes:
+                    continue
+                propiedades = feature.get('properties') or {}
+                anillos.append(partes)
+                municipios.append(_propiedad(propiedades, CLAVES_MUNICIPIO))
+                departamentos.append(_propiedad(propiedades, CLAVES_DEPARTAMENTO))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"⚠️ Límites municipales ilegibles ({self.ruta.name}): {e}")
+            return
+
+        if not anillos:
+            print(f"⚠️ {self.ruta.name} no tiene polígonos")
+            return
+
+        self._indice = IndicePoligonos(anillos)
+        self._municipios = np.array(municipios, dtype=object)
+        self._departamentos = np.array(departamentos, dtype=object)
+        estado = self.ruta.stat()
+        self.firma = f"{estado.st_size}|{estado.st_mtime_ns}"
+        print(f"🗺️ Límites municipales cargados: {len(anillos)} polígonos")
+
+    @property
+    def disponible(self) -> bool:
+        return self._indice is not None
+
+    def asignar(self, latitudes: np.ndarray, longitudes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Municipio y departamento del polígono que contiene cada punto ("N/A" si ninguno)"""
+        n = len(latitudes)
+        if self._indice is None:
+            return np.full(n, SIN_MUNICIPIO, dtype=object), np.full(n, SIN_MUNICIPIO, dtype=object)
+
+        poligono = self._indice.localizar(longitudes, latitudes)
+        dentro = poligono >= 0
+        municipios = np.full(n, SIN_MUNICIPIO, dtype=object)
+        departamentos = np.full(n, SIN_MUNICIPIO, dtype=object)
+        municipios[dentro] = self._municipios[poligono[dentro]]
+        departamentos[dentro] = self._departamentos[poligono[dentro]]
+        return municipios, departamentos
+
+
+# Instancia singleton
+limites_service = LimitesService()
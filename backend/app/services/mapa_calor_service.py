@@ -0,0 +1,194 @@
+# ═══════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Mapa de Calor de Sismicidad (KDE por FFT)
+# ═══════════════════════════════════════════════════════════════════════════
+
+import time
+import numpy as np
+from typing import Dict, Any, Optional, Tuple
+
+from app.services.sismos_service import sismos_service, SismosService
+from app.utils.cache_utils import LRUCache
+from app.utils.raster_utils import encode_png, colorear, hex_a_rgba, suavizar_en_malla, KM_POR_GRADO
+
+
+MARGEN_GRADOS = 0.1         # Margen de la caja automática (extensión del catálogo)
+DECADAS_LOG = 4             # Rango dinámico de la escala logarítmica
+
+PONDERACIONES = {
+    'conteo': 'eventos/km²',
+    'magnitud': 'magnitud/km²',
+    'energia': 'J/km²',
+}
+
+# Rampa del PNG: (color, alfa) de menor a mayor densidad; el índice 0 es transparente
+RAMPA = [('#3B82F6', 60), ('#FDE047', 140), ('#F59E0B', 190), ('#DC2626', 220), ('#6B46C1', 240)]
+
+
+def energia_joules(magnitud: np.ndarray) -> np.ndarray:
+    """Energía radiada de Gutenberg-Richter: log10 E = 1.5 M + 4.8 (J)"""
+    return 10 ** (1.5 * magnitud + 4.8)
+
+
+def _paleta() -> np.ndarray:
+    """256 colores RGBA interpolados sobre RAMPA (índice 0 transparente)"""
+    anclas = np.array([hex_a_rgba(color, alfa) for color, alfa in RAMPA], dtype=float)
+    x = np.linspace(1, 255, len(anclas))
+    niveles = np.arange(256)
+    paleta = np.column_stack([np.interp(niveles, x, anclas[:, c]) for c in range(4)])
+    paleta[0] = 0
+    return np.round(paleta).astype(np.uint8)
+
+
+class MapaCalorService:
+    """
+    Densidad de sismicidad por estimación de núcleo (KDE gaussiano) sobre una
+    malla lat/lon regular. Los eventos se agrupan en celdas con
+    np.histogram2d y el núcleo se aplica por convolución FFT (ver
+    suavizar_en_malla), así que el costo es O(n + celdas·log celdas) en lugar
+    de eventos × celdas. La densidad se divide por el área real de cada fila
+    de celdas. Las mallas se cachean por versión del catálogo y parámetros,
+    y los rasters codificados junto a ellas.
+    """
+
+    def __init__(self, sismos: SismosService):
+        self.sismos = sismos
+        self._cache = LRUCache(maxsize=64)
+        self._paleta = _paleta()
+
+    def obtener_malla(
+        self,
+        filtros: Dict[str, Any],
+        caja: Optional[Tuple[float, float, float, float]] = None,
+        resolucion: int = 256,
+        ancho_banda_km: float = 10.0,
+        ponderacion: str = 'conteo',
+        profundidad_min: Optional[float] = None,
+        profundidad_max: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Malla de densidad (cacheada). `caja` es (lat_min, lat_max, lon_min,
+        lon_max); sin caja se usa la extensión de los eventos filtrados.
+        """
+        if ponderacion not in PONDERACIONES:
+            raise ValueError(f"Ponderación no soportada: {ponderacion}")
+        if caja is not None and (caja[0] >= caja[1] or caja[2] >= caja[3]):
+            raise ValueError("La caja debe cumplir lat_min < lat_max y lon_min < lon_max")
+
+        clave = (
+            self.sismos.version, tuple(sorted((k, str(v)) for k, v in filtros.items())), caja,
+            int(resolucion), float(ancho_banda_km), ponderacion, profundidad_min, profundidad_max
+        )
+        return self._cache.get_or_compute(clave, lambda: self._calcular_malla(
+            filtros, caja, resolucion, ancho_banda_km, ponderacion, profundidad_min, profundidad_max
+        ))
+
+    def _calcular_malla(
+        self,
+        filtros: Dict[str, Any],
+        caja: Optional[Tuple[float, float, float, float]],
+        resolucion: int,
+        ancho_banda_km: float,
+        ponderacion: str,
+        profundidad_min: Optional[float],
+        profundidad_max: Optional[float]
+    ) -> Dict[str, Any]:
+        inicio = time.perf_counter()
+        datos = self.sismos.get_arrays(['latitud', 'longitud', 'profundidad', 'magnitud'], filtros)
+        lat, lon = datos['latitud'].astype(float), datos['longitud'].astype(float)
+        profundidad, magnitud = datos['profundidad'].astype(float), datos['magnitud'].astype(float)
+
+        validos = np.isfinite(lat) & np.isfinite(lon)
+        if profundidad_min is not None:
+            validos &= profundidad >= profundidad_min
+        if profundidad_max is not None:
+            validos &= profundidad <= profundidad_max
+        lat, lon, magnitud = lat[validos], lon[validos], magnitud[validos]
+
+        # Sin magnitud, el evento no aporta a las densidades ponderadas
+        if ponderacion == 'magnitud':
+            pesos = np.nan_to_num(magnitud, nan=0.0)
+        elif ponderacion == 'energia':
+            pesos = np.where(np.isfinite(magnitud), energia_joules(np.nan_to_num(magnitud)), 0.0)
+        else:
+            pesos = None
+
+        if caja is None:
+            if len(lat):
+                caja = (
+                    float(np.floor((lat.min() - MARGEN_GRADOS) * 10) / 10),
+                    float(np.ceil((lat.max() + MARGEN_GRADOS) * 10) / 10),
+                    float(np.floor((lon.min() - MARGEN_GRADOS) * 10) / 10),
+                    float(np.ceil((lon.max() + MARGEN_GRADOS) * 10) / 10),
+                )
+            else:
+                caja = (-90.0, 90.0, -180.0, 180.0)
+        lat_min, lat_max, lon_min, lon_max = caja
+
+        # Celdas cuadradas en grados; `resolucion` celdas en el lado mayor
+        celda = max(lat_max - lat_min, lon_max - lon_min) / resolucion
+        alto = max(int(np.ceil((lat_max - lat_min) / celda - 1e-9)), 1)
+        ancho = max(int(np.ceil((lon_max - lon_min) / celda - 1e-9)), 1)
+        lat_max, lon_max = lat_min + alto * celda, lon_min + ancho * celda
+
+        masa = suavizar_en_malla(lat, lon, pesos, lat_min, lon_min, alto, ancho, celda, ancho_banda_km)
+
+        # De masa por celda a densidad por km² (filas de sur a norte) y norte arriba
+        lats = lat_min + (np.arange(alto) + 0.5) * celda
+        area_km2 = (KM_POR_GRADO * celda) ** 2 * np.cos(np.radians(lats))
+        densidad = (masa / area_km2[:, None])[::-1]
+
+        return {
+            'bounds': [round(lat_min, 5), round(lon_min, 5), round(lat_max, 5), round(lon_max, 5)],
+            'ancho': ancho,
+            'alto': alto,
+            'eventos': int(len(lat)),
+            'ponderacion': ponderacion,
+            'unidades': PONDERACIONES[ponderacion],
+            'ancho_banda_km': ancho_banda_km,
+            'densidad_max': float(densidad.max()) if densidad.size else 0.0,
+            'densidad': densidad.astype(np.float32),
+            'tiempo_calculo_ms': round((time.perf_counter() - inicio) * 1000, 1)
+        }
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # CODIFICACIÓN
+    # ═══════════════════════════════════════════════════════════════════════
+
+    @staticmethod
+    def codificacion(malla: Dict[str, Any], escala: str) -> str:
+        """Cómo recuperar la densidad del valor uint8 (cabecera X-Encoding)"""
+        maximo = f"{malla['densidad_max']:.6g}"
+        if escala == 'log':
+            return f"uint8; 0 = sin dato; densidad = {maximo} * 10^({DECADAS_LOG} * (valor - 255) / 254)"
+        return f"uint8; densidad = {maximo} * valor / 255"
+
+    def raster(self, malla: Dict[str, Any], escala: str = 'lineal') -> np.ndarray:
+        """Densidad cuantizada a uint8 fila por fila (norte a sur), relativa al máximo"""
+        clave = f'raster_{escala}'
+        if clave not in malla:
+            densidad, maximo = malla['densidad'].astype(float), malla['densidad_max']
+            if maximo <= 0:
+                malla[clave] = np.zeros(densidad.shape, dtype=np.uint8)
+            elif escala == 'log':
+                # Valores 1..255 para las DECADAS_LOG décadas bajo el máximo; el resto es 0
+                with np.errstate(divide='ignore'):
+                    decadas = np.log10(densidad / maximo)
+                valor = np.round(255 + 254 * decadas / DECADAS_LOG)
+                malla[clave] = np.where(decadas >= -DECADAS_LOG, np.clip(valor, 1, 255), 0).astype(np.uint8)
+            else:
+                malla[clave] = np.round(255 * densidad / maximo).astype(np.uint8)
+        return malla[clave]
+
+    def raster_binario(self, malla: Dict[str, Any], escala: str = 'lineal') -> bytes:
+        return self.raster(malla, escala).tobytes()
+
+    def raster_png(self, malla: Dict[str, Any], escala: str = 'lineal') -> bytes:
+        """PNG RGBA con la rampa de colores, listo para superponer en el mapa"""
+        clave = f'png_{escala}'
+        if clave not in malla:
+            malla[clave] = encode_png(colorear(self.raster(malla, escala), self._paleta))
+        return malla[clave]
+
+
+# Instancia singleton
+mapa_calor_service = MapaCalorService(sismos_service)
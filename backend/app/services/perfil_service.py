@@ -0,0 +1,188 @@
+# ═══════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Perfiles de Profundidad (secciones transversales)
+# ═══════════════════════════════════════════════════════════════════════════
+
+import time
+import numpy as np
+from typing import Dict, Any, Optional, Tuple
+
+from app.services.sismos_service import sismos_service, SismosService
+from app.utils.cache_utils import LRUCache
+from app.utils.indice_espacio_temporal import RADIO_TIERRA_KM, KM_POR_GRADO
+
+
+MUESTRAS_TRAZA = 64         # Puntos del círculo máximo usados para la caja de la franja
+DECIMALES_KM = 3
+
+COLUMNAS_BINARIO = ('distancia_km', 'profundidad', 'magnitud')
+CAMPOS_META = ('inicio', 'fin', 'longitud_km', 'ancho_km', 'version_dataset', 'total', 'tiempo_calculo_ms')
+
+
+def _unitarios(latitud: np.ndarray, longitud: np.ndarray) -> np.ndarray:
+    """Vectores unitarios (n, 3) sobre la esfera"""
+    phi, lam = np.radians(latitud), np.radians(longitud)
+    return np.column_stack([np.cos(phi) * np.cos(lam), np.cos(phi) * np.sin(lam), np.sin(phi)])
+
+
+def proyectar_en_perfil(
+    latitud: np.ndarray, longitud: np.ndarray, inicio: Tuple[float, float], fin: Tuple[float, float]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Distancia a lo largo del perfil (km desde `inicio`, sobre el círculo
+    máximo) y desplazamiento perpendicular con signo (km, positivo a la
+    izquierda del sentido inicio → fin) de cada punto.
+    """
+    a, b = _unitarios(np.array([inicio[0], fin[0]]), np.array([inicio[1], fin[1]]))
+    normal = np.cross(a, b)
+    normal /= np.linalg.norm(normal)
+
+    p = _unitarios(latitud, longitud)
+    seno_normal = p @ normal
+    # Proyección sobre el plano del círculo máximo y su ángulo desde `inicio`
+    plano = p - seno_normal[:, None] * normal
+    angulo = np.arctan2(np.cross(a, plano) @ normal, plano @ a)
+    return angulo * RADIO_TIERRA_KM, np.arcsin(np.clip(seno_normal, -1.0, 1.0)) * RADIO_TIERRA_KM
+
+
+def caja_franja(
+    inicio: Tuple[float, float], fin: Tuple[float, float], semiancho_km: float
+) -> Optional[Tuple[float, float, float, float]]:
+    """
+    (lat_min, lat_max, lon_min, lon_max) que contiene la franja, a partir de
+    puntos del círculo máximo más el semiancho. None si cruza el antimeridiano
+    o se acerca a un polo (sin prefiltro).
+    """
+    a, b = _unitarios(np.array([inicio[0], fin[0]]), np.array([inicio[1], fin[1]]))
+    omega = np.arccos(np.clip(a @ b, -1.0, 1.0))
+    t = np.linspace(0.0, 1.0, MUESTRAS_TRAZA)[:, None]
+    if omega < 1e-12:
+        traza = np.repeat(a[None], len(t), axis=0)
+    else:
+        traza = (np.sin((1 - t) * omega) * a + np.sin(t * omega) * b) / np.sin(omega)
+    lat = np.degrees(np.arcsin(np.clip(traza[:, 2], -1.0, 1.0)))
+    lon = np.degrees(np.arctan2(traza[:, 1], traza[:, 0]))
+
+    # Margen: semiancho más la flecha entre muestras del círculo máximo
+    margen_lat = semiancho_km / KM_POR_GRADO + np.degrees(omega) / (MUESTRAS_TRAZA - 1)
+    lat_min, lat_max = lat.min() - margen_lat, lat.max() + margen_lat
+    if lat_min <= -89.0 or lat_max >= 89.0 or lon.max() - lon.min() > 180.0:
+        return None
+    margen_lon = margen_lat / np.cos(np.radians(max(abs(lat_min), abs(lat_max))))
+    return float(lat_min), float(lat_max), float(lon.min() - margen_lon), float(lon.max() + margen_lon)
+
+
+class PerfilService:
+    """
+    Sección transversal de profundidad: los hipocentros dentro de una franja
+    alrededor de un perfil (círculo máximo entre dos puntos) proyectados
+    sobre él. La caja de la franja va como filtro del catálogo, así que solo
+    se leen las particiones (o filas del R-tree) que la tocan; la proyección
+    es una sola operación vectorizada. Cacheado por versión y parámetros.
+    """
+
+    def __init__(self, sismos: SismosService):
+        self.sismos = sismos
+        self._cache = LRUCache(maxsize=64)
+
+    def perfil(
+        self,
+        inicio: Tuple[float, float],
+        fin: Tuple[float, float],
+        ancho_km: float,
+        filtros: Dict[str, Any],
+        profundidad_min: Optional[float] = None,
+        profundidad_max: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Columnas id, distancia_km, desplazamiento_km, profundidad y magnitud, por distancia"""
+        inicio = (round(float(inicio[0]), 5), round(float(inicio[1]), 5))
+        fin = (round(float(fin[0]), 5), round(float(fin[1]), 5))
+        if inicio == fin:
+            raise ValueError("Los extremos del perfil deben ser distintos")
+
+        clave = (
+            self.sismos.version, inicio, fin, float(ancho_km),
+            tuple(sorted((k, str(v)) for k, v in filtros.items())), profundidad_min, profundidad_max
+        )
+        return self._cache.get_or_compute(clave, lambda: self._calcular(
+            inicio, fin, ancho_km, filtros, profundidad_min, profundidad_max
+        ))
+
+    def _calcular(
+        self,
+        inicio: Tuple[float, float],
+        fin: Tuple[float, float],
+        ancho_km: float,
+        filtros: Dict[str, Any],
+        profundidad_min: Optional[float],
+        profundidad_max: Optional[float]
+    ) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        semiancho = ancho_km / 2.0
+        caja = caja_franja(inicio, fin, semiancho)
+        if caja is not None:
+            filtros = {**filtros, **dict(zip(('lat_min', 'lat_max', 'lon_min', 'lon_max'), caja))}
+
+        datos = self.sismos.get_arrays(['id', 'latitud', 'longitud', 'profundidad', 'magnitud'], filtros)
+        lat, lon = datos['latitud'].astype(float), datos['longitud'].astype(float)
+        profundidad = datos['profundidad'].astype(float)
+        validos = np.isfinite(lat) & np.isfinite(lon) & np.isfinite(profundidad)
+        if profundidad_min is not None:
+            validos &= profundidad >= profundidad_min
+        if profundidad_max is not None:
+            validos &= profundidad <= profundidad_max
+        filas = np.flatnonzero(validos)
+
+        longitud_km = float(proyectar_en_perfil(np.array([fin[0]]), np.array([fin[1]]), inicio, fin)[0][0])
+        distancia, desplazamiento = proyectar_en_perfil(lat[filas], lon[filas], inicio, fin)
+        en_franja = (distancia >= 0) & (distancia <= longitud_km) & (np.abs(desplazamiento) <= semiancho)
+        orden = np.argsort(distancia[en_franja], kind='stable')
+        filas = filas[en_franja][orden]
+
+        return {
+            'inicio': {'latitud': inicio[0], 'longitud': inicio[1]},
+            'fin': {'latitud': fin[0], 'longitud': fin[1]},
+            'longitud_km': round(longitud_km, DECIMALES_KM),
+            'ancho_km': ancho_km,
+            'version_dataset': self.sismos.version,
+            'total': int(len(filas)),
+            'id': datos['id'][filas],
+            'distancia_km': distancia[en_franja][orden],
+            'desplazamiento_km': desplazamiento[en_franja][orden],
+            'profundidad': profundidad[filas],
+            'magnitud': datos['magnitud'][filas].astype(float),
+            'tiempo_calculo_ms': round((time.perf_counter() - t0) * 1000, 1)
+        }
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # FORMATOS
+    # ═══════════════════════════════════════════════════════════════════════
+
+    @staticmethod
+    def a_json(perfil: Dict[str, Any]) -> Dict[str, Any]:
+        """Respuesta columnar: un arreglo por columna (magnitud null si falta)"""
+        if 'json' not in perfil:
+            magnitud = perfil['magnitud']
+            perfil['json'] = {
+                **{k: perfil[k] for k in CAMPOS_META},
+                'columnas': {
+                    'id': perfil['id'].tolist(),
+                    'distancia_km': np.round(perfil['distancia_km'], DECIMALES_KM).tolist(),
+                    'desplazamiento_km': np.round(perfil['desplazamiento_km'], DECIMALES_KM).tolist(),
+                    'profundidad': perfil['profundidad'].tolist(),
+                    'magnitud': [None if np.isnan(m) else m for m in magnitud.tolist()]
+                }
+            }
+        return perfil['json']
+
+    @staticmethod
+    def a_binario(perfil: Dict[str, Any]) -> bytes:
+        """float32 little-endian fila por fila: distancia_km, profundidad, magnitud (NaN si falta)"""
+        if 'binario' not in perfil:
+            perfil['binario'] = np.column_stack(
+                [perfil[col] for col in COLUMNAS_BINARIO]
+            ).astype('<f4').tobytes()
+        return perfil['binario']
+
+
+# Instancia singleton
+perfil_service = PerfilService(sismos_service)
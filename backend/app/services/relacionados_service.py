@@ -0,0 +1,174 @@
+# ═══════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Eventos Relacionados (vecindad espacio-temporal)
+# ═══════════════════════════════════════════════════════════════════════════
+
+import threading
+import time
+import numpy as np
+from typing import Dict, List, Any, Optional, Tuple
+
+from app.services.sismos_service import sismos_service, SismosService
+from app.utils.cache_utils import LRUCache
+from app.utils.indice_espacio_temporal import IndiceEspacioTemporal
+
+
+CELDA_GRADOS = 0.5          # Lado de las cubetas espaciales (~55 km)
+RADIO_DEFECTO_KM = 30.0
+VENTANA_DEFECTO_DIAS = 30.0
+
+COLUMNAS_INDICE = ['id', 'tiempo_dias', 'latitud', 'longitud', 'magnitud', 'profundidad']
+
+
+class EventosRelacionadosService:
+    """
+    Eventos a menos de R km y ±T días de otro, con su contexto de precursores
+    y réplicas. El índice espacio-temporal se construye una vez por versión
+    del catálogo (en segundo plano al iniciar y tras cada recarga) y las
+    consultas solo tocan la ventana de tiempo o las cubetas del radio.
+    """
+
+    def __init__(self, sismos: SismosService):
+        self.sismos = sismos
+        self._indice: Optional[Tuple[int, IndiceEspacioTemporal, Dict[str, np.ndarray]]] = None
+        self._lock = threading.Lock()
+        self._conteos = LRUCache(maxsize=16)
+
+    def iniciar_en_segundo_plano(self) -> None:
+        """Construye el índice de la versión actual en un hilo de fondo"""
+        threading.Thread(target=self._obtener_indice, name="indice-relacionados", daemon=True).start()
+
+    def _obtener_indice(self) -> Tuple[IndiceEspacioTemporal, Dict[str, np.ndarray]]:
+        """Índice y columnas de la versión actual; se reconstruye si cambió el catálogo"""
+        version = self.sismos.version
+        actual = self._indice
+        if actual is not None and actual[0] == version:
+            return actual[1], actual[2]
+
+        with self._lock:
+            if self._indice is not None and self._indice[0] == version:
+                return self._indice[1], self._indice[2]
+
+            inicio = time.perf_counter()
+            datos = self.sismos.get_arrays(COLUMNAS_INDICE)
+            indice = IndiceEspacioTemporal(
+                datos['tiempo_dias'], datos['latitud'], datos['longitud'], celda_grados=CELDA_GRADOS
+            )
+            # Fila del catálogo por id, para ubicar el evento consultado
+            orden_ids = np.argsort(datos['id'], kind='stable')
+            datos['_ids_ordenados'] = datos['id'][orden_ids]
+            datos['_filas_por_id'] = orden_ids
+
+            self._indice = (version, indice, datos)
+            print(f"✅ Índice espacio-temporal: {len(indice)} eventos "
+                  f"({(time.perf_counter() - inicio) * 1000:.0f} ms, versión {version})")
+            return indice, datos
+
+    @staticmethod
+    def _fila(datos: Dict[str, np.ndarray], sismo_id: int) -> Optional[int]:
+        ids = datos['_ids_ordenados']
+        i = int(np.searchsorted(ids, sismo_id))
+        if i < len(ids) and ids[i] == sismo_id:
+            return int(datos['_filas_por_id'][i])
+        return None
+
+    @staticmethod
+    def _fecha(tiempo_dias: np.ndarray) -> List[str]:
+        """Fechas en el formato del catálogo (AAAA-MM-DDTHH:MM:SS)"""
+        segundos = np.round(tiempo_dias * 86400.0).astype('datetime64[s]')
+        return np.datetime_as_string(segundos, unit='s').tolist()
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # CONSULTAS
+    # ═══════════════════════════════════════════════════════════════════════
+
+    def relacionados(
+        self,
+        sismo_id: int,
+        radio_km: float = RADIO_DEFECTO_KM,
+        ventana_dias: float = VENTANA_DEFECTO_DIAS,
+        limite: int = 200
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Vecindad de un evento: precursores (antes) y réplicas (después) dentro
+        del radio y la ventana, en orden temporal. None si el id no existe;
+        ValueError si el evento no tiene fecha o coordenadas.
+        """
+        indice, datos = self._obtener_indice()
+        fila = self._fila(datos, sismo_id)
+        if fila is None:
+            return None
+        if indice.posicion(fila) < 0:
+            raise ValueError(f"El sismo {sismo_id} no tiene fecha o coordenadas")
+
+        filas, distancias, desfases = indice.vecinos(fila, radio_km, ventana_dias)
+        posicion = indice.posicion(fila)
+        posteriores = indice.posiciones(filas) > posicion
+
+        magnitud = datos['magnitud'][fila]
+        magnitudes = datos['magnitud'][filas]
+        mayor = int(np.nanargmax(magnitudes)) if len(filas) and np.isfinite(magnitudes).any() else None
+        es_principal = bool(
+            np.isfinite(magnitud) and (mayor is None or not magnitudes[mayor] > magnitud)
+        )
+
+        mostrados = slice(0, limite)
+        return {
+            "id": int(sismo_id),
+            "radio_km": radio_km,
+            "ventana_dias": ventana_dias,
+            "total": int(len(filas)),
+            "precursores": int((~posteriores).sum()),
+            "replicas": int(posteriores.sum()),
+            # Sin un vecino de mayor magnitud, el evento es candidato a sismo principal
+            "es_principal": es_principal,
+            "mayor_vecino": None if mayor is None else {
+                "id": int(datos['id'][filas[mayor]]),
+                "magnitud": float(magnitudes[mayor]),
+                "dias": round(float(desfases[mayor]), 3)
+            },
+            "eventos": [
+                {
+                    "id": int(i),
+                    "fecha_hora": fecha,
+                    "latitud": float(lat),
+                    "longitud": float(lon),
+                    "magnitud": None if np.isnan(mag) else float(mag),
+                    "profundidad": None if np.isnan(prof) else float(prof),
+                    "distancia_km": round(float(dist), 1),
+                    "dias": round(float(dt), 3),
+                    "relacion": "replica" if post else "precursor"
+                }
+                for i, fecha, lat, lon, mag, prof, dist, dt, post in zip(
+                    datos['id'][filas[mostrados]],
+                    self._fecha(datos['tiempo_dias'][filas[mostrados]]),
+                    datos['latitud'][filas[mostrados]],
+                    datos['longitud'][filas[mostrados]],
+                    datos['magnitud'][filas[mostrados]],
+                    datos['profundidad'][filas[mostrados]],
+                    distancias[mostrados], desfases[mostrados], posteriores[mostrados]
+                )
+            ]
+        }
+
+    def conteos(
+        self, radio_km: float = RADIO_DEFECTO_KM, ventana_dias: float = VENTANA_DEFECTO_DIAS
+    ) -> List[Dict[str, Any]]:
+        """Modo masivo: precursores y réplicas de cada evento, cacheado por versión y parámetros"""
+        indice, datos = self._obtener_indice()
+        clave = (self.sismos.version, float(radio_km), float(ventana_dias))
+
+        def calcular() -> List[Dict[str, Any]]:
+            previos, posteriores = indice.contar_vecinos(radio_km, ventana_dias)
+            indexados = np.sort(indice.filas)  # orden del catálogo
+            return [
+                {"id": int(i), "precursores": int(a), "replicas": int(b)}
+                for i, a, b in zip(
+                    datos['id'][indexados], previos[indexados], posteriores[indexados]
+                )
+            ]
+
+        return self._conteos.get_or_compute(clave, calcular)
+
+
+# Instancia singleton
+relacionados_service = EventosRelacionadosService(sismos_service)
@@ -0,0 +1,149 @@
+# ═══════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Servicio ShakeMap (campo de intensidades)
+# ═══════════════════════════════════════════════════════════════════════════
+
+import numpy as np
+from typing import Dict, List, Any, Tuple
+
+from app.services.simulador_service import simulador_service, SeismicAttenuationModel
+from app.utils.cache_utils import LRUCache
+from app.utils.raster_utils import encode_png, colorear, hex_a_rgba, marching_squares
+
+
+KM_POR_GRADO = 111.195
+RADIO_MIN_KM = 20.0
+RADIO_MAX_KM = 600.0
+ESCALA_CODIFICACION = 20        # intensidad = valor_uint8 / 20 (resolución 0.05)
+ALFA_PNG = 170
+
+NIVELES_ROMANOS = ['I', 'II', 'III', 'IV', 'V', 'VI', 'VII', 'VIII', 'IX', 'X', 'XI', 'XII']
+
+
+class ShakeMapService:
+    """
+    Evalúa el modelo de atenuación sobre una malla lat/lon regular alrededor del
+    epicentro y la entrega como raster compacto e isosistas (marching squares).
+    Las mallas se cachean por escenario cuantizado.
+    """
+
+    def __init__(self, attenuation_model: SeismicAttenuationModel):
+        self.attenuation_model = attenuation_model
+        self._cache = LRUCache(maxsize=64)
+
+        # Paleta RGBA por nivel entero de Mercalli (índice 0 = transparente)
+        paleta = [(0, 0, 0, 0)]
+        for nivel in NIVELES_ROMANOS:
+            info = self.attenuation_model.mercalli_scale[nivel]
+            paleta.append(hex_a_rgba(info['color'], ALFA_PNG))
+        paleta[1] = (0, 0, 0, 0)   # Intensidad I (no sentido) también transparente
+        self._paleta = np.array(paleta, dtype=np.uint8)
+
+    @staticmethod
+    def cuantizar(latitud: float, longitud: float, magnitud: float, profundidad: float, resolucion: int) -> Tuple:
+        """Escenario cuantizado: 0.01° en posición, 0.1 en magnitud y 1 km en profundidad"""
+        return (
+            round(latitud, 2), round(longitud, 2), round(magnitud, 1),
+            float(round(profundidad)), int(resolucion)
+        )
+
+    def obtener_malla(
+        self, latitud: float, longitud: float, magnitud: float, profundidad: float, resolucion: int = 200
+    ) -> Dict[str, Any]:
+        """Malla de intensidades del escenario (cacheada)"""
+        clave = self.cuantizar(latitud, longitud, magnitud, profundidad, resolucion)
+        return self._cache.get_or_compute(clave, lambda: self._calcular_malla(*clave))
+
+    def _calcular_malla(
+        self, latitud: float, longitud: float, magnitud: float, profundidad: float, resolucion: int
+    ) -> Dict[str, Any]:
+        """Evalúa la atenuación en toda la malla en una sola pasada vectorizada"""
+        # Extensión: hasta donde la intensidad baja de II
+        radio = self.attenuation_model.calculate_affected_radius(magnitud, profundidad, 2.0)
+        radio = float(np.clip(radio * 1.1, RADIO_MIN_KM, RADIO_MAX_KM))
+
+        d_lat = radio / KM_POR_GRADO
+        d_lon = radio / (KM_POR_GRADO * np.cos(np.radians(latitud)))
+        lat_max, lat_min = latitud + d_lat, latitud - d_lat
+        lon_min, lon_max = longitud - d_lon, longitud + d_lon
+
+        # Filas de norte a sur, columnas de oeste a este (centros de celda)
+        lats = lat_max - (np.arange(resolucion) + 0.5) * (2 * d_lat / resolucion)
+        lons = lon_min + (np.arange(resolucion) + 0.5) * (2 * d_lon / resolucion)
+        dist = self.attenuation_model.haversine_distance(
+            latitud, longitud, lats[:, None], lons[None, :]
+        )
+        intensidad = self.attenuation_model.calculate_intensity_array(magnitud, dist, profundidad)
+
+        return {
+            'escenario': {
+                'latitud': latitud, 'longitud': longitud,
+                'magnitud': magnitud, 'profundidad': profundidad
+            },
+            'bounds': [round(lat_min, 5), round(lon_min, 5), round(lat_max, 5), round(lon_max, 5)],
+            'ancho': resolucion,
+            'alto': resolucion,
+            'radio_km': round(radio, 1),
+            'intensidad_max': round(float(intensidad.max()), 2),
+            'raster': np.round(intensidad * ESCALA_CODIFICACION).astype(np.uint8),
+            'lats': lats,
+            'lons': lons,
+        }
+
+    def raster_binario(self, malla: Dict[str, Any]) -> bytes:
+        """Raster uint8 fila por fila (norte a sur): intensidad = valor / 20"""
+        return malla['raster'].tobytes()
+
+    def raster_png(self, malla: Dict[str, Any]) -> bytes:
+        """PNG RGBA coloreado por nivel de Mercalli, listo para superponer en el mapa"""
+        if 'png' not in malla:
+            niveles = (malla['raster'] // ESCALA_CODIFICACION).astype(np.int64)
+            malla['png'] = encode_png(colorear(niveles, self._paleta))
+        return malla['png']
+
+    def isosistas(self, malla: Dict[str, Any]) -> Dict[str, Any]:
+        """FeatureCollection GeoJSON con una isosista por nivel entero de Mercalli"""
+        if 'isosistas' in malla:
+            return malla['isosistas']
+
+        intensidad = malla['raster'].astype(np.float32) / ESCALA_CODIFICACION
+        lats, lons = malla['lats'], malla['lons']
+        filas = np.arange(len(lats))
+        cols = np.arange(len(lons))
+
+        features: List[Dict[str, Any]] = []
+        for valor in range(2, int(np.floor(intensidad.max())) + 1):
+            anillos = marching_squares(intensidad, float(valor))
+            if not anillos:
+                continue
+
+            poligonos = []
+            for anillo in anillos:
+                lat = np.interp(anillo[:, 0], filas, lats)
+                lon = np.interp(anillo[:, 1], cols, lons)
+                poligonos.append([np.round(np.column_stack([lon, lat]), 5).tolist()])
+
+            nivel = NIVELES_ROMANOS[valor - 1]
+            info = self.attenuation_model.mercalli_scale[nivel]
+            features.append({
+                'type': 'Feature',
+                'geometry': {'type': 'MultiPolygon', 'coordinates': poligonos},
+                'properties': {
+                    'intensidad': valor,
+                    'mercalli': nivel,
+                    'descripcion': info['desc'],
+                    'color': info['color']
+                }
+            })
+
+        malla['isosistas'] = {
+            'type': 'FeatureCollection',
+            'bounds': malla['bounds'],
+            'escenario': malla['escenario'],
+            'intensidad_max': malla['intensidad_max'],
+            'features': features
+        }
+        return malla['isosistas']
+
+
+# Instancia singleton
+shakemap_service = ShakeMapService(simulador_service.attenuation_model)
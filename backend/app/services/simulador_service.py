@@ -3,13 +3,13 @@
 # ═══════════════════════════════════════════════════════════════════════════
 
 import numpy as np
-from scipy.stats import poisson
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Optional
 
 from app.models import (
     SimuladorInput, SimuladorOutput, TipoProfundidad,
     ZonaImpacto, CiudadAfectada, PrediccionReplica
 )
+from app.services.gazetteer_service import gazetteer_service
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -30,28 +30,45 @@ class OmoriUtsuModel:
             'Nido Sísmico': {'c': 0.15, 'p': 1.15, 'k_factor': 0.7},
             'Profundo': {'c': 0.20, 'p': 1.2, 'k_factor': 0.5}
         }
+        
+        # Parámetros ajustados por máxima verosimilitud (los publica el servicio de ajuste)
+        self.params_ajustados: Dict[str, Dict[str, float]] = {}
+    
+    def _params(self, depth_type: str, ajustados: bool = False) -> Dict[str, float]:
+        """Parámetros del tipo de profundidad, ajustados si se piden y existen"""
+        if ajustados and depth_type in self.params_ajustados:
+            return self.params_ajustados[depth_type]
+        return self.params_by_depth.get(depth_type, self.params_by_depth['Intermedio'])
     
-    def calculate_K(self, magnitude: float, depth_type: str = 'Nido Sísmico') -> float:
+    def usa_ajustados(self, depth_type: str, ajustados: bool = False) -> bool:
+        """Indica si se usarán parámetros ajustados para el tipo de profundidad"""
+        return ajustados and depth_type in self.params_ajustados
+    
+    def calculate_K(self, magnitude: float, depth_type: str = 'Nido Sísmico', ajustados: bool = False) -> float:
         """Calcula productividad K basada en magnitud"""
         a, b = 1.0, -1.67
-        k_factor = self.params_by_depth.get(depth_type, {}).get('k_factor', 1.0)
+        k_factor = self._params(depth_type, ajustados).get('k_factor', 1.0)
         return k_factor * (10 ** (a * magnitude + b))
     
-    def get_params(self, depth_type: str) -> Tuple[float, float]:
+    def get_params(self, depth_type: str, ajustados: bool = False) -> Tuple[float, float]:
         """Obtiene parámetros c y p según profundidad"""
-        params = self.params_by_depth.get(depth_type, self.params_by_depth['Intermedio'])
+        params = self._params(depth_type, ajustados)
         return params['c'], params['p']
     
-    def aftershock_rate(self, t: float, magnitude: float, depth_type: str = 'Nido Sísmico') -> float:
+    def aftershock_rate(
+        self, t: float, magnitude: float, depth_type: str = 'Nido Sísmico', ajustados: bool = False
+    ) -> float:
         """Tasa de réplicas en tiempo t (días)"""
-        K = self.calculate_K(magnitude, depth_type)
-        c, p = self.get_params(depth_type)
+        K = self.calculate_K(magnitude, depth_type, ajustados)
+        c, p = self.get_params(depth_type, ajustados)
         return K / ((t + c) ** p)
     
-    def cumulative_aftershocks(self, t: float, magnitude: float, depth_type: str = 'Nido Sísmico') -> float:
+    def cumulative_aftershocks(
+        self, t: float, magnitude: float, depth_type: str = 'Nido Sísmico', ajustados: bool = False
+    ) -> float:
         """Número acumulado de réplicas hasta tiempo t"""
-        K = self.calculate_K(magnitude, depth_type)
-        c, p = self.get_params(depth_type)
+        K = self.calculate_K(magnitude, depth_type, ajustados)
+        c, p = self.get_params(depth_type, ajustados)
         
         if p == 1:
             return K * np.log((t + c) / c)
@@ -63,23 +80,29 @@ class OmoriUtsuModel:
         magnitude: float, 
         depth_type: str = 'Nido Sísmico',
         days: int = 30, 
-        min_magnitude: float = 2.0
+        min_magnitude: float = 2.0,
+        ajustados: bool = False
     ) -> List[PrediccionReplica]:
-        """Predice réplicas para un período de tiempo"""
+        """
+        Predice réplicas para un período de tiempo.
+        Los valores se calculan aquí mismo, así que los modelos se construyen
+        sin revalidar (model_construct).
+        """
         
         results = []
         mag_factor = 10 ** (-(min_magnitude - 2.0))
         
         for day in range(1, days + 1):
-            rate = self.aftershock_rate(day, magnitude, depth_type) * mag_factor
-            cumulative = self.cumulative_aftershocks(day, magnitude, depth_type) * mag_factor
-            prob = 1 - poisson.pmf(0, max(rate, 0.001))
+            rate = float(self.aftershock_rate(day, magnitude, depth_type, ajustados) * mag_factor)
+            cumulative = float(self.cumulative_aftershocks(day, magnitude, depth_type, ajustados) * mag_factor)
+            # P(al menos una réplica) = 1 - P_poisson(0) = 1 - e^(-tasa)
+            prob = 1 - np.exp(-max(rate, 0.001))
             
-            results.append(PrediccionReplica(
+            results.append(PrediccionReplica.model_construct(
                 dia=day,
                 tasa_replicas=round(rate, 2),
                 acumulado=round(cumulative, 2),
-                probabilidad_pct=round(prob * 100, 1)
+                probabilidad_pct=round(float(prob) * 100, 1)
             ))
         
         return results
@@ -129,6 +152,12 @@ class SeismicAttenuationModel:
         intensity = self.c1 + self.c2 * magnitude - self.c3 * np.log10(R) - self.c4 * R
         return float(np.clip(intensity, 1, 12))
     
+    def calculate_intensity_array(self, magnitude: float, epicentral_dist: np.ndarray, depth: float) -> np.ndarray:
+        """Versión vectorizada de calculate_intensity para arreglos de distancias"""
+        R = np.maximum(np.sqrt(np.square(epicentral_dist) + depth**2), 1)
+        intensity = self.c1 + self.c2 * magnitude - self.c3 * np.log10(R) - self.c4 * R
+        return np.clip(intensity, 1, 12)
+    
     def get_mercalli_level(self, intensity: float) -> Tuple[str, Dict]:
         """Convierte intensidad numérica a nivel Mercalli"""
         for level, info in self.mercalli_scale.items():
@@ -136,6 +165,13 @@ class SeismicAttenuationModel:
                 return level, info
         return 'XII', self.mercalli_scale['XII']
     
+    def get_mercalli_levels(self, intensities: np.ndarray) -> np.ndarray:
+        """Versión vectorizada: nivel más alto cuyo mínimo no supera la intensidad"""
+        levels = np.array(list(self.mercalli_scale.keys()))
+        mins = np.array([info['min'] for info in self.mercalli_scale.values()])
+        idx = np.clip(np.searchsorted(mins, intensities, side='right') - 1, 0, len(levels) - 1)
+        return levels[idx]
+    
     def calculate_affected_radius(self, magnitude: float, depth: float, target_intensity: float) -> float:
         """Calcula radio donde se alcanza una intensidad específica"""
         r_min, r_max = 0.1, 1000
@@ -157,35 +193,35 @@ class SeismicAttenuationModel:
         epicenter_intensity = self.calculate_intensity(magnitude, 0, depth)
         
         zones = [
-            ZonaImpacto(
+            ZonaImpacto.model_construct(
                 nombre='epicentro',
                 radio_km=0,
                 intensidad=f'{epicenter_intensity:.1f}',
                 color='#800000',
                 descripcion='Epicentro'
             ),
-            ZonaImpacto(
+            ZonaImpacto.model_construct(
                 nombre='daño_severo',
                 radio_km=round(self.calculate_affected_radius(magnitude, depth, 8), 1),
                 intensidad='VIII+',
                 color='#E93C00',
                 descripcion='Daño severo a estructuras'
             ),
-            ZonaImpacto(
+            ZonaImpacto.model_construct(
                 nombre='daño_moderado',
                 radio_km=round(self.calculate_affected_radius(magnitude, depth, 6), 1),
                 intensidad='VI-VII',
                 color='#FF9100',
                 descripcion='Daño moderado, grietas'
             ),
-            ZonaImpacto(
+            ZonaImpacto.model_construct(
                 nombre='percepcion_fuerte',
                 radio_km=round(self.calculate_affected_radius(magnitude, depth, 4), 1),
                 intensidad='IV-V',
                 color='#F5F500',
                 descripcion='Percepción fuerte, objetos caen'
             ),
-            ZonaImpacto(
+            ZonaImpacto.model_construct(
                 nombre='percepcion_leve',
                 radio_km=round(self.calculate_affected_radius(magnitude, depth, 2), 1),
                 intensidad='II-III',
@@ -205,29 +241,6 @@ class SeismicAttenuationModel:
         return R * 2 * np.arcsin(np.sqrt(a))
 
 
-# ═══════════════════════════════════════════════════════════════════════════
-# DATOS DE CIUDADES
-# ═══════════════════════════════════════════════════════════════════════════
-
-CIUDADES = [
-    {'ciudad': 'Bucaramanga', 'latitud': 7.119, 'longitud': -73.122, 'poblacion': 581130, 'departamento': 'Santander'},
-    {'ciudad': 'Floridablanca', 'latitud': 7.064, 'longitud': -73.088, 'poblacion': 271728, 'departamento': 'Santander'},
-    {'ciudad': 'Girón', 'latitud': 7.074, 'longitud': -73.170, 'poblacion': 200000, 'departamento': 'Santander'},
-    {'ciudad': 'Piedecuesta', 'latitud': 6.988, 'longitud': -73.052, 'poblacion': 175000, 'departamento': 'Santander'},
-    {'ciudad': 'Barrancabermeja', 'latitud': 7.065, 'longitud': -73.855, 'poblacion': 191784, 'departamento': 'Santander'},
-    {'ciudad': 'San Gil', 'latitud': 6.556, 'longitud': -73.136, 'poblacion': 46552, 'departamento': 'Santander'},
-    {'ciudad': 'Socorro', 'latitud': 6.467, 'longitud': -73.260, 'poblacion': 32356, 'departamento': 'Santander'},
-    {'ciudad': 'Cúcuta', 'latitud': 7.894, 'longitud': -72.508, 'poblacion': 711715, 'departamento': 'Norte de Santander'},
-    {'ciudad': 'Pamplona', 'latitud': 7.376, 'longitud': -72.648, 'poblacion': 58299, 'departamento': 'Norte de Santander'},
-    {'ciudad': 'Tunja', 'latitud': 5.535, 'longitud': -73.362, 'poblacion': 202939, 'departamento': 'Boyacá'},
-    {'ciudad': 'Duitama', 'latitud': 5.827, 'longitud': -73.033, 'poblacion': 113954, 'departamento': 'Boyacá'},
-    {'ciudad': 'Sogamoso', 'latitud': 5.714, 'longitud': -72.934, 'poblacion': 114509, 'departamento': 'Boyacá'},
-    {'ciudad': 'Los Santos', 'latitud': 6.750, 'longitud': -73.100, 'poblacion': 12000, 'departamento': 'Santander'},
-    {'ciudad': 'Zapatoca', 'latitud': 6.817, 'longitud': -73.267, 'poblacion': 9500, 'departamento': 'Santander'},
-    {'ciudad': 'Villanueva', 'latitud': 6.683, 'longitud': -73.183, 'poblacion': 8000, 'departamento': 'Santander'},
-]
-
-
 # ═══════════════════════════════════════════════════════════════════════════
 # SERVICIO DEL SIMULADOR
 # ═══════════════════════════════════════════════════════════════════════════
@@ -238,7 +251,7 @@ class SimuladorService:
     def __init__(self):
         self.omori_model = OmoriUtsuModel()
         self.attenuation_model = SeismicAttenuationModel()
-        self.ciudades = CIUDADES
+        self.gazetteer = gazetteer_service
     
     def clasificar_profundidad(self, depth: float) -> str:
         """Clasifica el tipo de sismo por profundidad"""
@@ -273,28 +286,31 @@ class SimuladorService:
         affected_cities = self._calcular_ciudades_afectadas(lat, lon, magnitude, depth, zones)
         
         # Predicción de réplicas
-        replicas = self.omori_model.predict_aftershocks(magnitude, depth_type, 14, 3.0)
+        ajustados = self.omori_model.usa_ajustados(depth_type, params.usar_parametros_ajustados)
+        replicas = self.omori_model.predict_aftershocks(magnitude, depth_type, 14, 3.0, ajustados)
         max_aftershock = self.omori_model.max_aftershock_magnitude(magnitude)
         
         # Energía liberada
         energy_joules = 10**(1.5 * magnitude + 4.8)
         energy_tnt = energy_joules / 4.184e9
         
-        return SimuladorOutput(
+        # Salida construida con valores internos ya tipados: sin revalidación
+        return SimuladorOutput.model_construct(
             epicentro={'lat': lat, 'lon': lon},
             magnitud=magnitude,
             profundidad=depth,
             tipo_profundidad=TipoProfundidad(depth_type),
-            intensidad_epicentro=round(epicenter_intensity, 1),
+            intensidad_epicentro=round(float(epicenter_intensity), 1),
             mercalli=mercalli_level,
             mercalli_descripcion=mercalli_info['desc'],
-            energia_joules=energy_joules,
-            energia_tnt_toneladas=round(energy_tnt, 1),
+            energia_joules=float(energy_joules),
+            energia_tnt_toneladas=round(float(energy_tnt), 1),
             zonas=zones,
             ciudades_afectadas=affected_cities,
             replicas_prediccion=replicas,
-            max_replica_magnitud=round(max_aftershock, 1),
-            total_replicas_14_dias=replicas[-1].acumulado if replicas else 0
+            max_replica_magnitud=round(float(max_aftershock), 1),
+            total_replicas_14_dias=replicas[-1].acumulado if replicas else 0,
+            parametros_ajustados=ajustados
         )
     
     def _calcular_ciudades_afectadas(
@@ -305,43 +321,76 @@ class SimuladorService:
         depth: float,
         zones: List[ZonaImpacto]
     ) -> List[CiudadAfectada]:
-        """Calcula el impacto en cada ciudad"""
+        """
+        Calcula el impacto en los municipios dentro del radio de percepción.
+        El KD-tree del nomenclátor descarta el resto sin calcular distancias,
+        así que el costo crece con el área afectada y no con el nomenclátor.
+        """
         
-        # Crear diccionario de zonas para búsqueda rápida
-        zones_dict = {z.nombre: z for z in zones}
+        radio_percepcion = max((z.radio_km for z in zones), default=0)
+        indices = self.gazetteer.en_radio(lat, lon, radio_percepcion)
+        if len(indices) == 0:
+            return []
         
-        affected = []
-        for city in self.ciudades:
-            dist = self.attenuation_model.haversine_distance(
-                lat, lon, city['latitud'], city['longitud']
-            )
-            intensity = self.attenuation_model.calculate_intensity(magnitude, dist, depth)
-            mercalli, _ = self.attenuation_model.get_mercalli_level(intensity)
-            
-            # Determinar zona
-            zone = 'fuera_de_zona'
-            for zone_name in ['daño_severo', 'daño_moderado', 'percepcion_fuerte', 'percepcion_leve']:
-                if zone_name in zones_dict and dist <= zones_dict[zone_name].radio_km:
-                    zone = zone_name
-                    break
-            
-            affected.append(CiudadAfectada(
-                ciudad=city['ciudad'],
-                poblacion=city['poblacion'],
+        latitudes, longitudes = self.gazetteer.coordenadas(indices)
+        escenario = SimuladorInput(latitud=lat, longitud=lon, magnitud=magnitude, profundidad=depth)
+        calc = self.intensidad_en_sitios(escenario, latitudes, longitudes, zones)
+        
+        registros = self.gazetteer.registros
+        affected = [
+            CiudadAfectada.model_construct(
+                ciudad=registros[idx]['ciudad'],
+                poblacion=registros[idx]['poblacion'],
                 distancia_km=round(dist, 1),
                 intensidad=round(intensity, 1),
                 mercalli=mercalli,
                 zona=zone
-            ))
+            )
+            for idx, dist, intensity, mercalli, zone in zip(
+                indices.tolist(), calc['distancia_km'].tolist(), calc['intensidad'].tolist(),
+                calc['mercalli'].tolist(), calc['zona'].tolist()
+            )
+        ]
         
         # Ordenar por distancia
         affected.sort(key=lambda x: x.distancia_km)
         
         return affected
     
+    def intensidad_en_sitios(
+        self,
+        params: SimuladorInput,
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        zones: Optional[List[ZonaImpacto]] = None
+    ) -> Dict[str, np.ndarray]:
+        """Distancia, intensidad, nivel Mercalli y zona para arreglos de sitios"""
+        if zones is None:
+            zones = self.attenuation_model.calculate_impact_zones(params.magnitud, params.profundidad)
+        
+        dist = self.attenuation_model.haversine_distance(
+            params.latitud, params.longitud, latitudes, longitudes
+        )
+        intensity = self.attenuation_model.calculate_intensity_array(params.magnitud, dist, params.profundidad)
+        mercalli = self.attenuation_model.get_mercalli_levels(intensity)
+        
+        # Zona más severa cuyo radio contiene al sitio (mismo criterio que las ciudades)
+        zona = np.full(len(dist), 'fuera_de_zona', dtype=object)
+        radios = {z.nombre: z.radio_km for z in zones}
+        for zone_name in ['percepcion_leve', 'percepcion_fuerte', 'daño_moderado', 'daño_severo']:
+            if zone_name in radios:
+                zona[dist <= radios[zone_name]] = zone_name
+        
+        return {
+            'distancia_km': dist,
+            'intensidad': intensity,
+            'mercalli': mercalli,
+            'zona': zona
+        }
+    
     def obtener_ciudades(self) -> List[Dict]:
-        """Retorna lista de ciudades disponibles"""
-        return self.ciudades
+        """Retorna lista de municipios del nomenclátor"""
+        return self.gazetteer.registros
     
     def comparar_escenarios(self, escenarios: List[SimuladorInput]) -> List[Dict]:
         """Compara múltiples escenarios sísmicos"""
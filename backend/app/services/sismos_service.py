@@ -2,202 +2,380 @@
 # SIASIC-Santander Backend - Servicio de Sismos (Adaptado al CSV real)
 # ═══════════════════════════════════════════════════════════════════════════════
 
+from abc import ABC, abstractmethod
+
 import pandas as pd
 import numpy as np
-from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import Callable, Iterator, List, Optional, Dict, Any, Tuple
+
+from app.services.catalog_particiones import solapa
+from app.services.catalog_store import catalog_store, CatalogStore, SIN_FECHA
+from app.utils.json_utils import render_json
+
+
+LOTE_STREAM = 1000   # Registros por lote en las respuestas NDJSON
+
+# Columnas por defecto del mapa
+CAMPOS_MAPA = ('id', 'latitud', 'longitud', 'magnitud', 'profundidad', 'tipo_profundidad', 'municipio', 'fecha_hora')
+
+# Filtros de texto (sin distinguir mayúsculas) y de caja geográfica
+FILTROS_TEXTO = ('tipo_profundidad', 'departamento', 'municipio')
+FILTROS_CAJA = ('lat_min', 'lat_max', 'lon_min', 'lon_max')
+
+COLORES_PROFUNDIDAD = {
+    "Superficial": "#DC2626",
+    "Intermedio": "#F59E0B",
+    "Nido Sísmico": "#6B46C1",
+    "Profundo": "#2563EB",
+    "N/A": "#666666"
+}
 
-from app.config import settings
+ESTADISTICAS_VACIAS = {
+    "total_sismos": 0,
+    "magnitud_promedio": 0.0,
+    "magnitud_maxima": 0.0,
+    "profundidad_promedio": 0.0,
+    "sismos_santander": 0,
+    "sismos_nido": 0,
+    "ultimo_sismo": None
+}
 
 
-class SismosService:
-    """Servicio para gestionar datos sísmicos"""
-    
-    def __init__(self):
-        self._df: Optional[pd.DataFrame] = None
-        self._load_data()
-    
-    def _load_data(self) -> None:
-        """Carga los datos desde el CSV"""
-        try:
-            csv_path = Path(settings.DATA_PATH)
-            
-            if not csv_path.exists():
-                print(f"⚠️ Archivo no encontrado: {csv_path}")
-                self._df = pd.DataFrame()
-                return
-            
-            # Cargar CSV
-            self._df = pd.read_csv(csv_path, encoding='utf-8')
-            print(f"📂 Columnas originales: {list(self._df.columns)}")
-            
-            # ═══════════════════════════════════════════════════════════════
-            # MAPEO DE COLUMNAS - Adaptado a sismos_2024_simple.csv
-            # ═══════════════════════════════════════════════════════════════
-            column_mapping = {
-                'FechaHora': 'fecha_hora',
-                'Lat': 'latitud',
-                'Lon': 'longitud',
-                'ProfKm': 'profundidad',
-                'Mag': 'magnitud',
-                'TipoMag': 'tipo_magnitud',
-                'Ubicacion': 'ubicacion',
-                'Estado': 'estado',
-                'Fases': 'fases',
-                'RMS': 'rms',
-                'GAP': 'gap'
+class SismosService(ABC):
+    """
+    Interfaz de consultas sobre el catálogo sísmico, común a los backends en
+    memoria (SismosMemoriaService) y SQLite (SismosSQLiteService). Las
+    consultas públicas son abstractas: un backend que no las implemente
+    todas falla al instanciarse, al importar el servicio.
+    """
+    
+    # Ids de los sismos principales por método de desagrupamiento (filtro
+    # `desagrupado`); lo instala DesagrupamientoService
+    desagrupador: Optional[Callable[[str], np.ndarray]] = None
+    
+    def __init__(self, store: Any):
+        self.store = store
+    
+    @property
+    def version(self) -> int:
+        """Versión del dataset cargado (aumenta con cada carga)"""
+        return self.store.version
+    
+    @property
+    def epoch(self) -> str:
+        return self.store.epoch
+    
+    def _ids_principales(self, metodo: str) -> np.ndarray:
+        """Ids del catálogo desagrupado con `metodo` (ValueError si no está disponible)"""
+        if self.desagrupador is None:
+            raise ValueError("El desagrupamiento del catálogo no está disponible")
+        return self.desagrupador(metodo)
+    
+    @staticmethod
+    def _caja(filtros: Dict[str, Any]) -> Optional[Tuple[float, float, float, float]]:
+        """(lat_min, lat_max, lon_min, lon_max) si se filtró por caja; los lados sin valor quedan abiertos"""
+        if all(filtros.get(k) is None for k in FILTROS_CAJA):
+            return None
+        limites = {'lat_min': -90.0, 'lat_max': 90.0, 'lon_min': -180.0, 'lon_max': 180.0}
+        return tuple(
+            float(filtros[k]) if filtros.get(k) is not None else limites[k] for k in FILTROS_CAJA
+        )
+    
+    def normalizar_campos(self, campos: Optional[str]) -> Optional[Tuple[str, ...]]:
+        """
+        Proyección pedida en `fields=` ("id,magnitud,..."), en el orden de las
+        columnas del catálogo para que la misma selección dé siempre la misma
+        clave. None si no se pidió proyección; ValueError con campos desconocidos.
+        """
+        if not campos or not self.store.columnas:
+            return None
+        
+        pedidos = {c.strip() for c in campos.split(',') if c.strip()}
+        if not pedidos:
+            return None
+        
+        disponibles = self.store.columnas
+        desconocidos = pedidos - set(disponibles)
+        if desconocidos:
+            raise ValueError(
+                f"Campos no válidos: {', '.join(sorted(desconocidos))}. "
+                f"Disponibles: {', '.join(disponibles)}"
+            )
+        return tuple(c for c in disponibles if c in pedidos)
+    
+    @staticmethod
+    def _resumen_ultimo(row: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": int(row['id']),
+            "fecha_hora": row['fecha_hora'],
+            "magnitud": float(row['magnitud']),
+            "profundidad": float(row['profundidad']),
+            "municipio": str(row['municipio']),
+            "tipo_profundidad": str(row['tipo_profundidad'])
+        }
+    
+    @staticmethod
+    def _distribucion_profundidad(conteos, total: int) -> List[Dict[str, Any]]:
+        return [
+            {
+                "tipo": str(tipo),
+                "cantidad": int(cantidad),
+                "porcentaje": round((cantidad / total) * 100, 1) if total > 0 else 0,
+                "color": COLORES_PROFUNDIDAD.get(str(tipo), "#666666")
             }
-            
-            self._df = self._df.rename(columns=column_mapping)
-            print(f"📂 Columnas mapeadas: {list(self._df.columns)}")
-            
-            # ═══════════════════════════════════════════════════════════════
-            # EXTRAER MUNICIPIO Y DEPARTAMENTO DE "UBICACION"
-            # Formato: "Los Santos - Santander, Colombia"
-            # ═══════════════════════════════════════════════════════════════
-            if 'ubicacion' in self._df.columns:
-                # Extraer municipio (antes del " - ")
-                self._df['municipio'] = self._df['ubicacion'].apply(
-                    lambda x: self._extraer_municipio(x) if pd.notna(x) else "N/A"
-                )
-                # Extraer departamento (entre " - " y ",")
-                self._df['departamento'] = self._df['ubicacion'].apply(
-                    lambda x: self._extraer_departamento(x) if pd.notna(x) else "N/A"
-                )
+            for tipo, cantidad in conteos
+        ]
+    
+    # ═══════════════════════════════════════════════════════════════════════
+    # CONSULTAS (cada backend las implementa)
+    # ═══════════════════════════════════════════════════════════════════════
+    
+    @abstractmethod
+    def get_arrays(self, columnas: List[str], filtros: Optional[Dict[str, Any]] = None) -> Dict[str, np.ndarray]:
+        """
+        Retorna columnas como arreglos NumPy para cálculos vectorizados.
+        'tiempo_dias' es la fecha en días desde 1970-01-01 (NaN si no hay fecha).
+        """
+    
+    @abstractmethod
+    def get_all(
+        self, campos: Optional[Tuple[str, ...]] = None, filtros: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Retorna todos los sismos (o los que cumplen `filtros`)"""
+    
+    @abstractmethod
+    def iter_ndjson(
+        self, campos: Optional[Tuple[str, ...]] = None, tamano_lote: int = LOTE_STREAM,
+        filtros: Optional[Dict[str, Any]] = None
+    ) -> Iterator[bytes]:
+        """Todos los sismos como NDJSON (un registro por línea), por lotes de `tamano_lote`"""
+    
+    @abstractmethod
+    def get_filtrados(
+        self, filtros: Optional[Dict[str, Any]] = None, limite: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Sismos que cumplen los filtros (tipo_profundidad, departamento,
+        municipio, fechas, magnitud, caja y desagrupado), hasta `limite`
+        """
+    
+    @abstractmethod
+    def get_paginated(
+        self, page: int = 1, per_page: int = 20, campos: Optional[Tuple[str, ...]] = None,
+        filtros: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Retorna sismos paginados"""
+    
+    @abstractmethod
+    def get_by_id(self, sismo_id: int, campos: Optional[Tuple[str, ...]] = None) -> Optional[Dict[str, Any]]:
+        """Retorna un sismo por ID"""
+    
+    @abstractmethod
+    def get_estadisticas_generales(self) -> Dict[str, Any]:
+        """Retorna estadísticas generales"""
+    
+    @abstractmethod
+    def get_distribucion_mensual(self) -> List[Dict[str, Any]]:
+        """Retorna distribución mensual"""
+    
+    @abstractmethod
+    def get_distribucion_profundidad(self) -> List[Dict[str, Any]]:
+        """Retorna distribución por profundidad"""
+    
+    @abstractmethod
+    def get_para_mapa(
+        self, campos: Optional[Tuple[str, ...]] = None, filtros: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Retorna datos para mapa (por defecto, solo las columnas que usa el mapa)"""
+    
+    @abstractmethod
+    def get_cambios(
+        self, desde: int, epoch: Optional[str] = None, campos: Optional[Tuple[str, ...]] = None
+    ) -> Dict[str, Any]:
+        """
+        Sincronización incremental: eventos nuevos o modificados después de la
+        versión `desde` y los ids eliminados desde entonces. Si `epoch` no
+        corresponde a esta instancia, o la versión es desconocida, se responde
+        el catálogo completo con `completo: true` para que el cliente lo reemplace.
+        """
+    
+    @abstractmethod
+    def get_timeline(self, limite: int = 100, campos: Optional[Tuple[str, ...]] = None) -> List[Dict[str, Any]]:
+        """Los sismos más recientes primero (sin fecha al final)"""
+
+
+class SismosMemoriaService(SismosService):
+    """Consultas sobre el catálogo sísmico en memoria (los datos viven en CatalogStore)"""
+    
+    def __init__(self, store: CatalogStore):
+        super().__init__(store)
+    
+    @property
+    def _df(self) -> pd.DataFrame:
+        """Instantánea actual del catálogo (columnas compactas)"""
+        return self.store.df
+    
+    def _a_registros(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        return self.store.a_registros(df)
+    
+    def _mascara_filtros(self, filtros: Optional[Dict[str, Any]] = None, df: Optional[pd.DataFrame] = None) -> np.ndarray:
+        """
+        Máscara booleana de los filtros soportados: tipo_profundidad, departamento,
+        municipio (sin distinguir mayúsculas), fecha_inicio, fecha_fin,
+        magnitud_min, magnitud_max, la caja lat_min/lat_max/lon_min/lon_max y
+        desagrupado (método: solo los sismos principales). Los filtros en None
+        se ignoran.
+        
+        Con filtros de fecha, magnitud o caja solo se evalúan las particiones
+        cuyo rango en el manifiesto los puede cumplir; el resto queda en False.
+        """
+        df = self._df if df is None else df
+        if not filtros:
+            return np.ones(len(df), dtype=bool)
+        
+        fechas = self.store.rango_fechas(filtros)
+        magnitudes = (filtros.get('magnitud_min'), filtros.get('magnitud_max'))
+        caja = self._caja(filtros)
+        segmentos = self.store.segmentos(df)
+        if segmentos is None or (fechas == (None, None) and magnitudes == (None, None) and caja is None):
+            return self._evaluar_filtros(df, filtros, fechas, caja)
+        
+        # Particiones relevantes contiguas se evalúan en un solo tramo
+        tramos: List[List[int]] = []
+        for segmento in segmentos:
+            if not solapa(segmento, fechas, magnitudes, caja):
+                continue
+            if tramos and tramos[-1][1] == segmento['inicio']:
+                tramos[-1][1] = segmento['fin']
             else:
-                self._df['municipio'] = "N/A"
-                self._df['departamento'] = "N/A"
-            
-            # ═══════════════════════════════════════════════════════════════
-            # LIMPIEZA DE DATOS
-            # ═══════════════════════════════════════════════════════════════
-            
-            # Limpiar columnas de texto
-            text_cols = ['municipio', 'departamento', 'tipo_magnitud', 'estado', 'ubicacion']
-            for col in text_cols:
-                if col in self._df.columns:
-                    self._df[col] = self._df[col].fillna('N/A').astype(str)
-                    self._df[col] = self._df[col].replace('nan', 'N/A')
-                    self._df[col] = self._df[col].replace('', 'N/A')
-            
-            # Limpiar columnas numéricas
-            num_cols = ['latitud', 'longitud', 'profundidad', 'magnitud', 'fases', 'rms', 'gap']
-            for col in num_cols:
-                if col in self._df.columns:
-                    self._df[col] = pd.to_numeric(self._df[col], errors='coerce').fillna(0)
-            
-            # Agregar ID
-            self._df['id'] = range(1, len(self._df) + 1)
-            
-            # Convertir fecha
-            if 'fecha_hora' in self._df.columns:
-                self._df['fecha_hora'] = pd.to_datetime(self._df['fecha_hora'], errors='coerce')
-            
-            # Clasificar profundidad
-            self._df['tipo_profundidad'] = self._df['profundidad'].apply(self._clasificar_profundidad)
-            
-            # Determinar si es Santander
-            self._df['es_santander'] = self._df['departamento'].str.lower().str.contains('santander', na=False)
-            
-            # Determinar si es del Nido Sísmico
-            self._df['es_nido'] = self._df['tipo_profundidad'] == 'Nido Sísmico'
-            
-            print(f"✅ Datos cargados: {len(self._df)} registros")
-            print(f"   - Sismos en Santander: {self._df['es_santander'].sum()}")
-            print(f"   - Sismos del Nido: {self._df['es_nido'].sum()}")
-            
-        except Exception as e:
-            print(f"❌ Error cargando datos: {e}")
-            import traceback
-            traceback.print_exc()
-            self._df = pd.DataFrame()
-    
-    def _extraer_municipio(self, ubicacion: str) -> str:
-        """Extrae el municipio de la ubicación"""
-        try:
-            if ' - ' in ubicacion:
-                return ubicacion.split(' - ')[0].strip()
-            return ubicacion.split(',')[0].strip()
-        except:
-            return "N/A"
-    
-    def _extraer_departamento(self, ubicacion: str) -> str:
-        """Extrae el departamento de la ubicación"""
-        try:
-            if ' - ' in ubicacion:
-                parte = ubicacion.split(' - ')[1]
-                if ',' in parte:
-                    return parte.split(',')[0].strip()
-                return parte.strip()
-            return "N/A"
-        except:
-            return "N/A"
-    
-    def _clasificar_profundidad(self, prof: float) -> str:
-        """Clasifica el sismo según profundidad"""
-        try:
-            if pd.isna(prof) or prof < 0:
-                return "N/A"
-            if prof < 70:
-                return "Superficial"
-            if prof < 140:
-                return "Intermedio"
-            if prof <= 180:
-                return "Nido Sísmico"
-            return "Profundo"
-        except:
-            return "N/A"
-    
-    def _to_dict_safe(self, row: pd.Series) -> Dict[str, Any]:
-        """Convierte una fila a diccionario de forma segura"""
+                tramos.append([segmento['inicio'], segmento['fin']])
+        
+        if tramos == [[0, len(df)]]:
+            return self._evaluar_filtros(df, filtros, fechas, caja)
+        mask = np.zeros(len(df), dtype=bool)
+        for inicio, fin in tramos:
+            mask[inicio:fin] = self._evaluar_filtros(df.iloc[inicio:fin], filtros, fechas, caja)
+        return mask
+    
+    def _evaluar_filtros(
+        self, df: pd.DataFrame, filtros: Dict[str, Any],
+        fechas: Tuple[Optional[int], Optional[int]], caja: Optional[Tuple[float, float, float, float]]
+    ) -> np.ndarray:
+        """Máscara de los filtros sobre todas las filas de `df`"""
+        mask = np.ones(len(df), dtype=bool)
+        
+        for col in FILTROS_TEXTO:
+            valor = filtros.get(col)
+            if valor:
+                mask &= self.store.mascara_texto(df, col, valor)
+        
+        # Fechas en segundos epoch; los eventos sin fecha nunca entran en un rango
+        inicio, fin = fechas
+        segundos = df['fecha_hora'].to_numpy()
+        if inicio is not None:
+            mask &= segundos >= inicio
+        if fin is not None:
+            mask &= (segundos <= fin) & (segundos != SIN_FECHA)
+        
+        if filtros.get('magnitud_min') is not None or filtros.get('magnitud_max') is not None:
+            magnitud = self.store.decodificar(df, 'magnitud')
+            if filtros.get('magnitud_min') is not None:
+                mask &= magnitud >= filtros['magnitud_min']
+            if filtros.get('magnitud_max') is not None:
+                mask &= magnitud <= filtros['magnitud_max']
+        
+        if caja is not None:
+            lat_min, lat_max, lon_min, lon_max = caja
+            lat = self.store.decodificar(df, 'latitud')
+            lon = self.store.decodificar(df, 'longitud')
+            mask &= (lat >= lat_min) & (lat <= lat_max) & (lon >= lon_min) & (lon <= lon_max)
+        
+        if filtros.get('desagrupado'):
+            mask &= np.isin(df['id'].to_numpy(), self._ids_principales(filtros['desagrupado']))
+        
+        return mask
+    
+    def get_arrays(self, columnas: List[str], filtros: Optional[Dict[str, Any]] = None) -> Dict[str, np.ndarray]:
+        """
+        Retorna columnas como arreglos NumPy para cálculos vectorizados.
+        'tiempo_dias' es la fecha en días desde 1970-01-01 (NaN si no hay fecha).
+        """
+        df = self._df
+        if df.empty:
+            return {col: np.array([]) for col in columnas}
+        
+        if filtros:
+            df = df[self._mascara_filtros(filtros, df)]
+        
         result = {}
-        for key, value in row.items():
-            if pd.isna(value):
-                if key in ['municipio', 'departamento', 'tipo_magnitud', 'tipo_profundidad', 'estado', 'ubicacion']:
-                    result[key] = "N/A"
-                elif key in ['latitud', 'longitud', 'profundidad', 'magnitud', 'fases', 'rms', 'gap']:
-                    result[key] = 0.0
-                elif key == 'id':
-                    result[key] = 0
-                elif key in ['es_santander', 'es_nido']:
-                    result[key] = False
-                elif key == 'fecha_hora':
-                    result[key] = ""
-                else:
-                    result[key] = None
-            elif isinstance(value, pd.Timestamp):
-                result[key] = value.isoformat()
-            elif isinstance(value, (np.integer,)):
-                result[key] = int(value)
-            elif isinstance(value, (np.floating,)):
-                if np.isnan(value) or np.isinf(value):
-                    result[key] = 0.0
-                else:
-                    result[key] = float(value)
-            elif isinstance(value, np.bool_):
-                result[key] = bool(value)
+        for col in columnas:
+            if col == 'tiempo_dias':
+                segundos = df['fecha_hora'].to_numpy()
+                result[col] = np.where(segundos == SIN_FECHA, np.nan, segundos / 86400.0)
             else:
-                result[key] = value
+                result[col] = self.store.decodificar(df, col)
         return result
     
-    def get_all(self) -> List[Dict[str, Any]]:
-        """Retorna todos los sismos"""
-        if self._df is None or self._df.empty:
+    def _proyectar(self, df: pd.DataFrame, campos: Optional[Tuple[str, ...]]) -> pd.DataFrame:
+        """Reduce las columnas antes de convertir a registros"""
+        return df if campos is None else df[list(campos)]
+    
+    def _filtrar(self, df: pd.DataFrame, filtros: Optional[Dict[str, Any]]) -> pd.DataFrame:
+        return df[self._mascara_filtros(filtros, df)] if filtros else df
+    
+    def get_all(
+        self, campos: Optional[Tuple[str, ...]] = None, filtros: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Retorna todos los sismos (o los que cumplen `filtros`)"""
+        if self._df.empty:
+            return []
+        return self._a_registros(self._proyectar(self._filtrar(self._df, filtros), campos))
+    
+    def iter_ndjson(
+        self, campos: Optional[Tuple[str, ...]] = None, tamano_lote: int = LOTE_STREAM,
+        filtros: Optional[Dict[str, Any]] = None
+    ) -> Iterator[bytes]:
+        """
+        Todos los sismos como NDJSON (un registro por línea), codificados por
+        lotes desde las columnas: la memoria queda acotada al lote actual.
+        """
+        df = self._df  # referencia fija: una recarga no altera un flujo en curso
+        if df.empty:
+            return
+        
+        df = self._proyectar(self._filtrar(df, filtros), campos)
+        for inicio in range(0, len(df), tamano_lote):
+            registros = self._a_registros(df.iloc[inicio:inicio + tamano_lote])
+            yield b"".join(render_json(r) + b"\n" for r in registros)
+    
+    def get_filtrados(
+        self, filtros: Optional[Dict[str, Any]] = None, limite: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Sismos que cumplen los filtros (ver _mascara_filtros), hasta `limite`"""
+        df = self._df
+        if df.empty:
             return []
-        return [self._to_dict_safe(row) for _, row in self._df.iterrows()]
+        df = self._filtrar(df, filtros)
+        if limite is not None:
+            df = df.head(limite)
+        return self._a_registros(df)
     
-    def get_paginated(self, page: int = 1, per_page: int = 20) -> Dict[str, Any]:
+    def get_paginated(
+        self, page: int = 1, per_page: int = 20, campos: Optional[Tuple[str, ...]] = None,
+        filtros: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """Retorna sismos paginados"""
-        if self._df is None or self._df.empty:
+        if self._df.empty:
             return {"total": 0, "page": page, "per_page": per_page, "total_pages": 0, "data": []}
         
-        total = len(self._df)
+        df = self._filtrar(self._df, filtros)
+        total = len(df)
         total_pages = (total + per_page - 1) // per_page
         start = (page - 1) * per_page
         end = start + per_page
         
-        df_page = self._df.iloc[start:end]
-        data = [self._to_dict_safe(row) for _, row in df_page.iterrows()]
+        df_page = self._proyectar(df.iloc[start:end], campos)
+        data = self._a_registros(df_page)
         
         return {
             "total": total,
@@ -207,51 +385,36 @@ class SismosService:
             "data": data
         }
     
-    def get_by_id(self, sismo_id: int) -> Optional[Dict[str, Any]]:
+    def get_by_id(self, sismo_id: int, campos: Optional[Tuple[str, ...]] = None) -> Optional[Dict[str, Any]]:
         """Retorna un sismo por ID"""
-        if self._df is None or self._df.empty:
+        if self._df.empty:
             return None
         
         result = self._df[self._df['id'] == sismo_id]
         if result.empty:
             return None
         
-        return self._to_dict_safe(result.iloc[0])
+        return self._a_registros(self._proyectar(result.iloc[:1], campos))[0]
     
     def get_estadisticas_generales(self) -> Dict[str, Any]:
         """Retorna estadísticas generales"""
-        if self._df is None or self._df.empty:
-            return {
-                "total_sismos": 0,
-                "magnitud_promedio": 0.0,
-                "magnitud_maxima": 0.0,
-                "profundidad_promedio": 0.0,
-                "sismos_santander": 0,
-                "sismos_nido": 0,
-                "ultimo_sismo": None
-            }
+        if self._df.empty:
+            return dict(ESTADISTICAS_VACIAS)
         
         df = self._df
+        magnitud = pd.Series(self.store.decodificar(df, 'magnitud'))
+        profundidad = pd.Series(self.store.decodificar(df, 'profundidad'))
         
         # Último sismo
         ultimo = None
-        if 'fecha_hora' in df.columns and len(df) > 0:
-            df_sorted = df.dropna(subset=['fecha_hora']).sort_values('fecha_hora', ascending=False)
-            if len(df_sorted) > 0:
-                row = df_sorted.iloc[0]
-                ultimo = {
-                    "id": int(row.get('id', 0)) if pd.notna(row.get('id')) else 0,
-                    "fecha_hora": row['fecha_hora'].isoformat() if pd.notna(row.get('fecha_hora')) else "",
-                    "magnitud": float(row.get('magnitud', 0)) if pd.notna(row.get('magnitud')) else 0.0,
-                    "profundidad": float(row.get('profundidad', 0)) if pd.notna(row.get('profundidad')) else 0.0,
-                    "municipio": str(row.get('municipio', 'N/A')) if pd.notna(row.get('municipio')) else "N/A",
-                    "tipo_profundidad": str(row.get('tipo_profundidad', 'N/A')) if pd.notna(row.get('tipo_profundidad')) else "N/A"
-                }
+        fechas = df['fecha_hora'].to_numpy()
+        if (fechas != SIN_FECHA).any():
+            ultimo = self._resumen_ultimo(self._a_registros(df.iloc[[int(np.argmax(fechas))]])[0])
         
         # Calcular estadísticas con manejo de NaN
-        mag_prom = df['magnitud'].mean() if 'magnitud' in df.columns else 0
-        mag_max = df['magnitud'].max() if 'magnitud' in df.columns else 0
-        prof_prom = df['profundidad'].mean() if 'profundidad' in df.columns else 0
+        mag_prom = magnitud.mean()
+        mag_max = magnitud.max()
+        prof_prom = profundidad.mean()
         
         return {
             "total_sismos": int(len(df)),
@@ -265,10 +428,15 @@ class SismosService:
     
     def get_distribucion_mensual(self) -> List[Dict[str, Any]]:
         """Retorna distribución mensual"""
-        if self._df is None or self._df.empty or 'fecha_hora' not in self._df.columns:
+        if self._df.empty or 'fecha_hora' not in self._df.columns:
             return []
         
-        df = self._df.dropna(subset=['fecha_hora']).copy()
+        fechas = self.store.fechas(self._df)
+        df = pd.DataFrame({
+            'fecha_hora': fechas,
+            'id': self._df['id'],
+            'magnitud': self.store.decodificar(self._df, 'magnitud')
+        }).dropna(subset=['fecha_hora'])
         if df.empty:
             return []
         
@@ -295,40 +463,72 @@ class SismosService:
     
     def get_distribucion_profundidad(self) -> List[Dict[str, Any]]:
         """Retorna distribución por profundidad"""
-        if self._df is None or self._df.empty or 'tipo_profundidad' not in self._df.columns:
+        if self._df.empty or 'tipo_profundidad' not in self._df.columns:
             return []
         
         total = len(self._df)
         grouped = self._df['tipo_profundidad'].value_counts()
+        return self._distribucion_profundidad(grouped.items(), total)
+    
+    def get_para_mapa(
+        self, campos: Optional[Tuple[str, ...]] = None, filtros: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Retorna datos para mapa (por defecto, solo las columnas que usa el mapa)"""
+        if self._df.empty:
+            return []
+        
+        if campos is None:
+            campos = tuple(c for c in CAMPOS_MAPA if c in self._df.columns)
+        
+        return self._a_registros(self._filtrar(self._df, filtros)[list(campos)])
+    
+    def get_cambios(
+        self, desde: int, epoch: Optional[str] = None, campos: Optional[Tuple[str, ...]] = None
+    ) -> Dict[str, Any]:
+        """
+        Sincronización incremental: eventos nuevos o modificados después de la
+        versión `desde` y los ids eliminados desde entonces. Si `epoch` no
+        corresponde a esta instancia, o la versión es desconocida, se responde
+        el catálogo completo con `completo: true` para que el cliente lo reemplace.
+        """
+        df = self._df  # referencia fija frente a recargas concurrentes
+        version = self.version
+        completo = desde <= 0 or desde > version or epoch != self.epoch
         
-        colores = {
-            "Superficial": "#DC2626",
-            "Intermedio": "#F59E0B",
-            "Nido Sísmico": "#6B46C1",
-            "Profundo": "#2563EB",
-            "N/A": "#666666"
+        respuesta = {
+            'epoch': self.epoch,
+            'version': version,
+            'desde': 0 if completo else desde,
+            'completo': completo,
+            'registros': [],
+            'eliminados': []
         }
+        if df.empty:
+            return respuesta
         
-        return [
-            {
-                "tipo": str(tipo),
-                "cantidad": int(cantidad),
-                "porcentaje": round((cantidad / total) * 100, 1) if total > 0 else 0,
-                "color": colores.get(str(tipo), "#666666")
-            }
-            for tipo, cantidad in grouped.items()
-        ]
+        if not completo:
+            df = df[df['_version'].to_numpy() > desde]
+            respuesta['eliminados'] = self.store.eliminados_desde(desde)
+        respuesta['registros'] = self._a_registros(self._proyectar(df, campos))
+        return respuesta
     
-    def get_para_mapa(self) -> List[Dict[str, Any]]:
-        """Retorna datos para mapa"""
-        if self._df is None or self._df.empty:
+    def get_timeline(self, limite: int = 100, campos: Optional[Tuple[str, ...]] = None) -> List[Dict[str, Any]]:
+        """Los sismos más recientes primero (sin fecha al final)"""
+        if self._df.empty:
             return []
         
-        cols = ['id', 'latitud', 'longitud', 'magnitud', 'profundidad', 'tipo_profundidad', 'municipio', 'fecha_hora']
-        available = [c for c in cols if c in self._df.columns]
-        
-        return [self._to_dict_safe(row) for _, row in self._df[available].iterrows()]
+        df = self._df.sort_values('fecha_hora', ascending=False, na_position='last', kind='stable')
+        return self._a_registros(self._proyectar(df.head(limite), campos))
+
+
+
+def _crear_servicio() -> SismosService:
+    """Consultas en pandas o en SQL según el backend del catálogo (settings.CATALOGO_BACKEND)"""
+    if isinstance(catalog_store, CatalogStore):
+        return SismosMemoriaService(catalog_store)
+    from app.services.sismos_sqlite_service import SismosSQLiteService
+    return SismosSQLiteService(catalog_store)
 
 
 # Instancia global
-sismos_service = SismosService()
+sismos_service = _crear_servicio()
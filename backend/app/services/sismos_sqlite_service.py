@@ -0,0 +1,301 @@
+# ═══════════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Consultas del Catálogo en SQLite
+# ═══════════════════════════════════════════════════════════════════════════════
+
+import calendar
+import json
+import numpy as np
+from typing import Iterator, List, Optional, Dict, Any, Tuple
+
+from app.services.catalog_sqlite import SQLiteCatalogStore
+from app.services.catalog_store import CatalogStore
+from app.services.sismos_service import (
+    SismosService, CAMPOS_MAPA, ESTADISTICAS_VACIAS, FILTROS_TEXTO, LOTE_STREAM
+)
+from app.utils.json_utils import render_json
+
+
+# Fecha en el mismo formato que el backend en memoria ("" si falta)
+EXPR_FECHA = "COALESCE(strftime('%Y-%m-%dT%H:%M:%S', fecha_hora, 'unixepoch'), '')"
+
+
+class SismosSQLiteService(SismosService):
+    """
+    Las consultas de SismosService resueltas en SQL: filtros, paginación,
+    estadísticas y exportaciones se ejecutan en la base y solo viajan a
+    Python las filas del resultado.
+    """
+
+    def __init__(self, store: SQLiteCatalogStore):
+        super().__init__(store)
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # SQL
+    # ═══════════════════════════════════════════════════════════════════════
+
+    def _select(self, campos: Optional[Tuple[str, ...]] = None) -> str:
+        """Lista de columnas del SELECT (fecha ya formateada)"""
+        columnas = campos if campos is not None else self.store.columnas
+        return ", ".join(
+            f"{EXPR_FECHA} AS fecha_hora" if col == 'fecha_hora' else f'"{col}"' for col in columnas
+        )
+
+    def _where(self, filtros: Optional[Dict[str, Any]] = None) -> Tuple[str, List[Any]]:
+        """Cláusula WHERE equivalente a SismosMemoriaService._mascara_filtros"""
+        condiciones: List[str] = []
+        params: List[Any] = []
+        if not filtros:
+            return "", params
+
+        for col in FILTROS_TEXTO:
+            valor = filtros.get(col)
+            if valor:
+                condiciones.append(f'minusculas("{col}") = ?')
+                params.append(str(valor).lower())
+
+        # Las filas sin fecha (NULL) nunca cumplen una comparación
+        inicio, fin = CatalogStore.rango_fechas(filtros)
+        if inicio is not None:
+            condiciones.append("fecha_hora >= ?")
+            params.append(inicio)
+        if fin is not None:
+            condiciones.append("fecha_hora <= ?")
+            params.append(fin)
+
+        if filtros.get('magnitud_min') is not None:
+            condiciones.append("magnitud >= ?")
+            params.append(float(filtros['magnitud_min']))
+        if filtros.get('magnitud_max') is not None:
+            condiciones.append("magnitud <= ?")
+            params.append(float(filtros['magnitud_max']))
+
+        # El R-tree guarda float32 redondeado hacia afuera: preselecciona y la
+        # comparación exacta sobre latitud/longitud descarta los bordes
+        caja = self._caja(filtros)
+        if caja is not None:
+            lat_min, lat_max, lon_min, lon_max = caja
+            condiciones.append(
+                "id IN (SELECT id FROM sismos_rtree "
+                "WHERE lat_max >= ? AND lat_min <= ? AND lon_max >= ? AND lon_min <= ?)"
+            )
+            condiciones.append("latitud BETWEEN ? AND ? AND longitud BETWEEN ? AND ?")
+            params.extend([lat_min, lat_max, lon_min, lon_max, lat_min, lat_max, lon_min, lon_max])
+
+        # Catálogo desagrupado: los ids viajan como un solo parámetro JSON
+        if filtros.get('desagrupado'):
+            condiciones.append("id IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(self._ids_principales(filtros['desagrupado']).tolist()))
+
+        return ("WHERE " + " AND ".join(condiciones)) if condiciones else "", params
+
+    def _consultar(self, sql: str, params: Any = ()) -> List[Tuple]:
+        with self.store.pool.conexion() as conexion:
+            return conexion.execute(sql, params).fetchall()
+
+    def _registros(self, sql: str, params: Any = ()) -> List[Dict[str, Any]]:
+        """Filas del SELECT como diccionarios, con las columnas booleanas como bool"""
+        with self.store.pool.conexion() as conexion:
+            cursor = conexion.execute(sql, params)
+            nombres = [d[0] for d in cursor.description]
+            filas = cursor.fetchall()
+
+        booleanas = [i for i, n in enumerate(nombres) if n in self.store.columnas_booleanas]
+        if booleanas:
+            filas = [list(fila) for fila in filas]
+            for fila in filas:
+                for i in booleanas:
+                    fila[i] = bool(fila[i])
+        return [dict(zip(nombres, fila)) for fila in filas]
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # CONSULTAS
+    # ═══════════════════════════════════════════════════════════════════════
+
+    def get_arrays(self, columnas: List[str], filtros: Optional[Dict[str, Any]] = None) -> Dict[str, np.ndarray]:
+        """Columnas como arreglos NumPy; el filtrado ocurre en SQL"""
+        if not self.store.columnas:
+            return {col: np.array([]) for col in columnas}
+
+        expresiones = ["fecha_hora / 86400.0" if c == 'tiempo_dias' else f'"{c}"' for c in columnas]
+        where, params = self._where(filtros)
+        filas = self._consultar(f"SELECT {', '.join(expresiones)} FROM sismos {where} ORDER BY _orden", params)
+
+        result = {}
+        for i, col in enumerate(columnas):
+            valores = [fila[i] for fila in filas]
+            tipo = self.store.tipos.get(col, 'REAL')
+            if col == 'tiempo_dias' or tipo == 'REAL':
+                result[col] = np.array(valores, dtype=float)
+            elif tipo == 'BOOLEAN':
+                result[col] = np.array(valores, dtype=bool)
+            elif tipo == 'INTEGER':
+                result[col] = np.array(valores, dtype=np.int64)
+            else:
+                result[col] = np.array(valores, dtype=object)
+        return result
+
+    def get_all(
+        self, campos: Optional[Tuple[str, ...]] = None, filtros: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        if not self.store.columnas:
+            return []
+        where, params = self._where(filtros)
+        return self._registros(f"SELECT {self._select(campos)} FROM sismos {where} ORDER BY _orden", params)
+
+    def iter_ndjson(
+        self, campos: Optional[Tuple[str, ...]] = None, tamano_lote: int = LOTE_STREAM,
+        filtros: Optional[Dict[str, Any]] = None
+    ) -> Iterator[bytes]:
+        """
+        NDJSON por lotes con paginación por clave (_orden): cada lote toma y
+        devuelve una conexión del pool, así un cliente lento no la retiene.
+        """
+        if not self.store.columnas:
+            return
+        select = self._select(campos)
+        where, params = self._where(filtros)
+        condicion = f"{where} AND _orden > ?" if where else "WHERE _orden > ?"
+        ultimo = -1
+        while True:
+            registros = self._registros(
+                f"SELECT {select}, _orden FROM sismos {condicion} ORDER BY _orden LIMIT ?",
+                params + [ultimo, tamano_lote]
+            )
+            if not registros:
+                return
+            ultimo = registros[-1]['_orden']
+            for r in registros:
+                del r['_orden']
+            yield b"".join(render_json(r) + b"\n" for r in registros)
+
+    def get_filtrados(
+        self, filtros: Optional[Dict[str, Any]] = None, limite: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        if not self.store.columnas:
+            return []
+        where, params = self._where(filtros)
+        sql = f"SELECT {self._select()} FROM sismos {where} ORDER BY _orden"
+        if limite is not None:
+            sql += " LIMIT ?"
+            params.append(int(limite))
+        return self._registros(sql, params)
+
+    def get_paginated(
+        self, page: int = 1, per_page: int = 20, campos: Optional[Tuple[str, ...]] = None,
+        filtros: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        if not self.store.columnas:
+            return {"total": 0, "page": page, "per_page": per_page, "total_pages": 0, "data": []}
+
+        where, params = self._where(filtros)
+        total = self._consultar(f"SELECT COUNT(*) FROM sismos {where}", params)[0][0]
+        data = self._registros(
+            f"SELECT {self._select(campos)} FROM sismos {where} ORDER BY _orden LIMIT ? OFFSET ?",
+            params + [per_page, (page - 1) * per_page]
+        )
+        return {
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "total_pages": (total + per_page - 1) // per_page,
+            "data": data
+        }
+
+    def get_by_id(self, sismo_id: int, campos: Optional[Tuple[str, ...]] = None) -> Optional[Dict[str, Any]]:
+        if not self.store.columnas:
+            return None
+        registros = self._registros(f"SELECT {self._select(campos)} FROM sismos WHERE id = ?", (sismo_id,))
+        return registros[0] if registros else None
+
+    def get_estadisticas_generales(self) -> Dict[str, Any]:
+        if not self.store.columnas:
+            return dict(ESTADISTICAS_VACIAS)
+
+        total, mag_prom, mag_max, prof_prom, santander, nido = self._consultar("""
+            SELECT COUNT(*), AVG(magnitud), MAX(magnitud), AVG(profundidad),
+                   COALESCE(SUM(es_santander), 0), COALESCE(SUM(es_nido), 0)
+            FROM sismos
+        """)[0]
+        if total == 0:
+            return dict(ESTADISTICAS_VACIAS)
+
+        ultimo = self._registros(
+            f"SELECT {self._select()} FROM sismos WHERE fecha_hora IS NOT NULL "
+            f"ORDER BY fecha_hora DESC, _orden LIMIT 1"
+        )
+        return {
+            "total_sismos": int(total),
+            "magnitud_promedio": float(mag_prom or 0.0),
+            "magnitud_maxima": float(mag_max or 0.0),
+            "profundidad_promedio": float(prof_prom or 0.0),
+            "sismos_santander": int(santander),
+            "sismos_nido": int(nido),
+            "ultimo_sismo": self._resumen_ultimo(ultimo[0]) if ultimo else None
+        }
+
+    def get_distribucion_mensual(self) -> List[Dict[str, Any]]:
+        if not self.store.columnas:
+            return []
+        filas = self._consultar("""
+            SELECT CAST(strftime('%m', fecha_hora, 'unixepoch') AS INTEGER) AS mes_num,
+                   COUNT(*), AVG(magnitud)
+            FROM sismos WHERE fecha_hora IS NOT NULL
+            GROUP BY mes_num ORDER BY mes_num
+        """)
+        return [
+            {
+                "mes": calendar.month_abbr[mes],
+                "cantidad": int(cantidad),
+                "magnitud_promedio": float(mag) if mag is not None else 0.0
+            }
+            for mes, cantidad, mag in filas
+        ]
+
+    def get_distribucion_profundidad(self) -> List[Dict[str, Any]]:
+        if not self.store.columnas:
+            return []
+        filas = self._consultar(
+            "SELECT tipo_profundidad, COUNT(*) AS n FROM sismos GROUP BY tipo_profundidad ORDER BY n DESC"
+        )
+        return self._distribucion_profundidad(filas, sum(n for _, n in filas))
+
+    def get_para_mapa(
+        self, campos: Optional[Tuple[str, ...]] = None, filtros: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        if campos is None:
+            campos = tuple(c for c in CAMPOS_MAPA if c in self.store.columnas)
+        return self.get_all(campos, filtros)
+
+    def get_cambios(
+        self, desde: int, epoch: Optional[str] = None, campos: Optional[Tuple[str, ...]] = None
+    ) -> Dict[str, Any]:
+        version = self.version
+        completo = desde <= 0 or desde > version or epoch != self.epoch
+
+        respuesta = {
+            'epoch': self.epoch,
+            'version': version,
+            'desde': 0 if completo else desde,
+            'completo': completo,
+            'registros': [],
+            'eliminados': []
+        }
+        if not self.store.columnas:
+            return respuesta
+
+        if completo:
+            respuesta['registros'] = self.get_all(campos)
+        else:
+            respuesta['registros'] = self._registros(
+                f"SELECT {self._select(campos)} FROM sismos WHERE _version > ? ORDER BY _orden", (desde,)
+            )
+            respuesta['eliminados'] = self.store.eliminados_desde(desde)
+        return respuesta
+
+    def get_timeline(self, limite: int = 100, campos: Optional[Tuple[str, ...]] = None) -> List[Dict[str, Any]]:
+        if not self.store.columnas:
+            return []
+        return self._registros(
+            f"SELECT {self._select(campos)} FROM sismos "
+            f"ORDER BY fecha_hora IS NULL, fecha_hora DESC, _orden LIMIT ?", (limite,)
+        )
@@ -0,0 +1,159 @@
+# ═══════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Intensidad en Sitios del Usuario
+# ═══════════════════════════════════════════════════════════════════════════
+
+import numpy as np
+import pandas as pd
+from typing import Iterator, List, BinaryIO
+
+from app.models import SimuladorInput, Sitio
+from app.services.simulador_service import simulador_service, SimuladorService
+from app.utils.json_utils import render_json
+
+
+TAMANO_BLOQUE = 10_000
+MAX_SITIOS = 200_000
+
+FORMATOS = ('ndjson', 'csv')
+MEDIA_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+COLUMNAS_SALIDA = ['id', 'nombre', 'latitud', 'longitud', 'distancia_km', 'intensidad', 'mercalli', 'zona']
+
+# Nombres de columna aceptados en el CSV de entrada
+ALIAS_COLUMNAS = {
+    'lat': 'latitud', 'latitude': 'latitud', 'y': 'latitud',
+    'lon': 'longitud', 'lng': 'longitud', 'long': 'longitud', 'longitude': 'longitud', 'x': 'longitud',
+    'name': 'nombre', 'nombre_sitio': 'nombre',
+}
+
+
+class SitiosService:
+    """
+    Evalúa un escenario sobre listas grandes de sitios (hospitales, colegios,
+    redes) por bloques vectorizados y entrega el resultado como flujo NDJSON o CSV.
+    """
+
+    def __init__(self, simulador: SimuladorService):
+        self.simulador = simulador
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # ENTRADA
+    # ═══════════════════════════════════════════════════════════════════════
+
+    def bloques_desde_json(self, sitios: List[Sitio]) -> Iterator[pd.DataFrame]:
+        """Bloques de sitios a partir de la lista validada por Pydantic"""
+        for inicio in range(0, len(sitios), TAMANO_BLOQUE):
+            bloque = sitios[inicio:inicio + TAMANO_BLOQUE]
+            yield pd.DataFrame({
+                'id': [s.id if s.id is not None else inicio + i + 1 for i, s in enumerate(bloque)],
+                'nombre': [s.nombre or '' for s in bloque],
+                'latitud': np.fromiter((s.latitud for s in bloque), dtype=float, count=len(bloque)),
+                'longitud': np.fromiter((s.longitud for s in bloque), dtype=float, count=len(bloque)),
+            })
+
+    def bloques_desde_csv(self, archivo: BinaryIO) -> Iterator[pd.DataFrame]:
+        """
+        Bloques de sitios leídos del CSV por partes. El primer bloque se lee y
+        valida antes de retornar, para que los errores de formato lleguen como 400
+        y no a mitad del flujo.
+        """
+        lector = pd.read_csv(archivo, chunksize=TAMANO_BLOQUE, encoding='utf-8')
+        primero = next(lector, None)
+        if primero is None or primero.empty:
+            raise ValueError("El archivo CSV no contiene sitios")
+
+        primero = self._normalizar(primero, 0)
+        return self._encadenar(primero, lector)
+
+    def _encadenar(self, primero: pd.DataFrame, lector) -> Iterator[pd.DataFrame]:
+        """Primer bloque ya validado seguido del resto del archivo, hasta MAX_SITIOS"""
+        yield primero
+        leidos = len(primero)
+        for bloque in lector:
+            if leidos >= MAX_SITIOS:
+                break
+            bloque = self._normalizar(bloque.iloc[:MAX_SITIOS - leidos], leidos)
+            leidos += len(bloque)
+            yield bloque
+
+    def _normalizar(self, bloque: pd.DataFrame, desplazamiento: int) -> pd.DataFrame:
+        """Renombra alias, valida columnas y completa id/nombre"""
+        bloque = bloque.rename(columns=lambda c: str(c).strip().lower())
+        bloque = bloque.rename(columns=ALIAS_COLUMNAS)
+
+        faltantes = {'latitud', 'longitud'} - set(bloque.columns)
+        if faltantes:
+            raise ValueError(f"Faltan columnas en el CSV: {', '.join(sorted(faltantes))}")
+
+        return pd.DataFrame({
+            'id': self._ids(bloque, desplazamiento),
+            'nombre': bloque['nombre'].fillna('').astype(str) if 'nombre' in bloque.columns else '',
+            'latitud': pd.to_numeric(bloque['latitud'], errors='coerce'),
+            'longitud': pd.to_numeric(bloque['longitud'], errors='coerce'),
+        })
+
+    @staticmethod
+    def _ids(bloque: pd.DataFrame, desplazamiento: int) -> pd.Series:
+        """
+        Id de cada sitio: el del CSV o, donde falta, el número de fila (como en
+        bloques_desde_json). Una columna numérica queda entera; cualquier otra,
+        como texto.
+        """
+        generados = pd.Series(np.arange(1, len(bloque) + 1) + desplazamiento, index=bloque.index)
+        if 'id' not in bloque.columns:
+            return generados
+
+        ids = bloque['id']
+        if ids.dtype.kind in 'iuf':
+            ids = ids.where(ids.notna(), generados)
+            return ids.astype(np.int64) if (ids % 1 == 0).all() else ids
+
+        texto = ids.astype(object).where(ids.notna(), '').astype(str).str.strip()
+        return texto.where(texto != '', generados.astype(str))
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # EVALUACIÓN Y SALIDA
+    # ═══════════════════════════════════════════════════════════════════════
+
+    def evaluar(self, params: SimuladorInput, bloques: Iterator[pd.DataFrame], formato: str = 'ndjson') -> Iterator[bytes]:
+        """Evalúa cada bloque y lo codifica en el formato pedido"""
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato no soportado: {formato}")
+
+        zones = self.simulador.attenuation_model.calculate_impact_zones(params.magnitud, params.profundidad)
+
+        primero = True
+        for bloque in bloques:
+            resultado = self._evaluar_bloque(params, bloque, zones)
+            if formato == 'csv':
+                yield resultado.to_csv(index=False, header=primero, na_rep='').encode('utf-8')
+            else:
+                yield self._a_ndjson(resultado)
+            primero = False
+
+    def _evaluar_bloque(self, params: SimuladorInput, bloque: pd.DataFrame, zones) -> pd.DataFrame:
+        """Cálculo vectorizado de un bloque; sitios sin coordenadas válidas quedan en N/A"""
+        lat = bloque['latitud'].to_numpy(dtype=float)
+        lon = bloque['longitud'].to_numpy(dtype=float)
+        validos = np.isfinite(lat) & np.isfinite(lon) & (np.abs(lat) <= 90) & (np.abs(lon) <= 180)
+
+        calc = self.simulador.intensidad_en_sitios(params, lat[validos], lon[validos], zones)
+
+        resultado = bloque.copy()
+        resultado['distancia_km'] = np.nan
+        resultado['intensidad'] = np.nan
+        resultado['mercalli'] = 'N/A'
+        resultado['zona'] = 'N/A'
+        resultado.loc[validos, 'distancia_km'] = np.round(calc['distancia_km'], 1)
+        resultado.loc[validos, 'intensidad'] = np.round(calc['intensidad'], 2)
+        resultado.loc[validos, 'mercalli'] = calc['mercalli']
+        resultado.loc[validos, 'zona'] = calc['zona']
+        return resultado[COLUMNAS_SALIDA]
+
+    def _a_ndjson(self, resultado: pd.DataFrame) -> bytes:
+        """Una línea JSON por sitio, codificada con orjson (NaN sale como null)"""
+        return b"".join(render_json(r) + b"\n" for r in resultado.to_dict('records'))
+
+
+# Instancia singleton
+sitios_service = SitiosService(simulador_service)
@@ -0,0 +1,46 @@
+# ═══════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Trabajos del Simulador (ejecutados en workers)
+# ═══════════════════════════════════════════════════════════════════════════
+# Funciones de nivel de módulo para el ejecutor de procesos. Cada trabajo
+# recibe los parámetros Omori-Utsu ajustados del proceso principal, ya que
+# el ajuste corre allí y los workers no lo repiten.
+#
+# ETAS se reparte por lotes: el proceso principal prepara las tareas, envía
+# cada lote al ejecutor como `simular_lote_etas` (un trabajo con varios
+# lotes, ver EjecutorTrabajos.ejecutar_lotes) y resume los resultados.
+
+from typing import Any, Dict, List
+
+from app.models import SimuladorInput, SimuladorOutput
+from app.services.simulador_service import simulador_service
+from app.services.etas_service import simular_lote
+
+
+def parametros_actuales() -> Dict[str, Dict[str, float]]:
+    """Parámetros ajustados vigentes, para enviarlos junto con cada trabajo"""
+    return dict(simulador_service.omori_model.params_ajustados)
+
+
+def _sincronizar(params_ajustados: Dict[str, Dict[str, float]]) -> None:
+    simulador_service.omori_model.params_ajustados = params_ajustados
+
+
+def simular(params: SimuladorInput, params_ajustados: Dict) -> SimuladorOutput:
+    _sincronizar(params_ajustados)
+    return simulador_service.simular(params)
+
+
+def simular_json(params: SimuladorInput, params_ajustados: Dict) -> bytes:
+    """Simulación ya serializada: viaja al proceso principal como bytes y se responde tal cual"""
+    _sincronizar(params_ajustados)
+    return simulador_service.simular(params).model_dump_json().encode("utf-8")
+
+
+def comparar_escenarios(escenarios: List[SimuladorInput], params_ajustados: Dict) -> List[Dict]:
+    _sincronizar(params_ajustados)
+    return simulador_service.comparar_escenarios(escenarios)
+
+
+def simular_lote_etas(*tarea) -> Dict[str, Any]:
+    """Un lote de realizaciones ETAS (ver ETASService.preparar)"""
+    return simular_lote(*tarea)
@@ -0,0 +1,55 @@
+# ═══════════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Utilidades de Caché
+# ═══════════════════════════════════════════════════════════════════════════════
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Caché LRU acotada y segura entre hilos.
+    Las claves deben incluir la versión del dataset cuando el valor depende de él.
+    """
+    
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._datos: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+    
+    def get(self, clave: Hashable) -> Optional[Any]:
+        """Retorna el valor cacheado o None"""
+        with self._lock:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return self._datos[clave]
+            self.fallos += 1
+            return None
+    
+    def set(self, clave: Hashable, valor: Any) -> None:
+        """Guarda un valor, descartando el menos usado si se excede el tamaño"""
+        with self._lock:
+            self._datos[clave] = valor
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.maxsize:
+                self._datos.popitem(last=False)
+    
+    def get_or_compute(self, clave: Hashable, fn: Callable[[], Any]) -> Any:
+        """Retorna el valor cacheado o lo calcula con fn() y lo guarda"""
+        valor = self.get(clave)
+        if valor is None:
+            valor = fn()
+            self.set(clave, valor)
+        return valor
+    
+    def clear(self) -> None:
+        """Vacía la caché"""
+        with self._lock:
+            self._datos.clear()
+    
+    def __len__(self) -> int:
+        return len(self._datos)
@@ -0,0 +1,79 @@
+# ═══════════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Agrupamiento por Densidad (DBSCAN 3-D)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+
+# Elipsoide WGS84
+SEMIEJE_MAYOR_KM = 6378.137
+EXCENTRICIDAD2 = 6.69437999014e-3
+
+RUIDO = -1
+
+
+def ecef_km(latitud: np.ndarray, longitud: np.ndarray, profundidad_km: np.ndarray) -> np.ndarray:
+    """Hipocentros (n, 3) en coordenadas ECEF (km); la profundidad es altura negativa"""
+    phi = np.radians(np.asarray(latitud, dtype=float))
+    lam = np.radians(np.asarray(longitud, dtype=float))
+    altura = -np.asarray(profundidad_km, dtype=float)
+    normal = SEMIEJE_MAYOR_KM / np.sqrt(1.0 - EXCENTRICIDAD2 * np.sin(phi) ** 2)
+    return np.column_stack([
+        (normal + altura) * np.cos(phi) * np.cos(lam),
+        (normal + altura) * np.cos(phi) * np.sin(lam),
+        (normal * (1.0 - EXCENTRICIDAD2) + altura) * np.sin(phi)
+    ])
+
+
+def dbscan(puntos: np.ndarray, eps: float, min_muestras: int) -> np.ndarray:
+    """
+    DBSCAN (Ester et al., 1996) sobre un KD-tree. Un punto es núcleo si tiene
+    al menos `min_muestras` vecinos a distancia ≤ eps (él incluido); los
+    cúmulos son las componentes conexas del grafo núcleo-núcleo y cada punto
+    frontera se une al cúmulo de su núcleo más cercano.
+
+    Los pares a distancia ≤ eps se obtienen en una sola pasada del árbol y
+    sirven para contar vecinos y para el grafo: la memoria es O(pares).
+    Retorna la etiqueta por punto (RUIDO = -1), numerada de mayor a menor
+    cúmulo para que el resultado no dependa del orden de entrada.
+    """
+    n = len(puntos)
+    etiquetas = np.full(n, RUIDO, dtype=np.int64)
+    if n == 0:
+        return etiquetas
+
+    pares = cKDTree(puntos).query_pairs(eps, output_type='ndarray')
+    nucleo = np.bincount(pares.ravel(), minlength=n) + 1 >= min_muestras
+    if not nucleo.any():
+        return etiquetas
+
+    a, b = pares[:, 0], pares[:, 1]
+    entre_nucleos = nucleo[a] & nucleo[b]
+    grafo = coo_matrix(
+        (np.ones(int(entre_nucleos.sum()), dtype=np.int8), (a[entre_nucleos], b[entre_nucleos])), shape=(n, n)
+    )
+    _, componente = connected_components(grafo, directed=False)
+    etiquetas[nucleo] = componente[nucleo]
+
+    # Frontera: pares núcleo-otro; gana el núcleo más cercano
+    mixtos = nucleo[a] != nucleo[b]
+    centro = np.where(nucleo[a[mixtos]], a[mixtos], b[mixtos])
+    frontera = np.where(nucleo[a[mixtos]], b[mixtos], a[mixtos])
+    distancia = np.linalg.norm(puntos[centro] - puntos[frontera], axis=1)
+    orden = np.lexsort((centro, distancia, frontera))
+    primeros = orden[np.r_[True, frontera[orden][1:] != frontera[orden][:-1]]] if len(orden) else orden
+    etiquetas[frontera[primeros]] = componente[centro[primeros]]
+
+    # Renumerar por tamaño (desempate: primera aparición)
+    agrupados = etiquetas >= 0
+    _, etiquetas[agrupados] = np.unique(etiquetas[agrupados], return_inverse=True)
+    tamanos = np.bincount(etiquetas[agrupados])
+    primera = np.full(len(tamanos), n, dtype=np.int64)
+    np.minimum.at(primera, etiquetas[agrupados], np.flatnonzero(agrupados))
+    orden = np.lexsort((primera, -tamanos))
+    nueva = np.empty_like(orden)
+    nueva[orden] = np.arange(len(orden))
+    etiquetas[agrupados] = nueva[etiquetas[agrupados]]
+    return etiquetas
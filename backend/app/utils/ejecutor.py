@@ -0,0 +1,234 @@
+# ═══════════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Ejecutor de Trabajos Pesados
+# ═══════════════════════════════════════════════════════════════════════════════
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.config import settings
+
+
+MUESTRAS_METRICAS = 200
+
+
+class ErrorEjecutor(Exception):
+    """Error base del ejecutor (no es un fallo del trabajo en sí)"""
+
+
+class EjecutorSaturado(ErrorEjecutor):
+    """Todos los workers ocupados y la cola llena"""
+
+
+class TiempoAgotado(ErrorEjecutor):
+    """El trabajo superó el tiempo máximo permitido"""
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# FUNCIONES DEL WORKER (nivel de módulo para poder serializarse)
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _inicializar_worker() -> None:
+    """
+    Precarga solo lo que usan los trabajos (simulador y ETAS, sin el
+    catálogo) para que el primer trabajo no pague la importación
+    """
+    from app.utils.process_pool import marcar_como_worker
+    marcar_como_worker()
+    import app.services.trabajos_simulador  # noqa: F401
+
+
+def _calentar() -> bool:
+    return True
+
+
+def _ejecutar_trabajo(fn: Callable[..., Any], args: Tuple) -> Tuple[Any, float, float]:
+    """Ejecuta el trabajo y retorna también sus marcas de inicio y fin"""
+    inicio = time.time()
+    resultado = fn(*args)
+    return resultado, inicio, time.time()
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# EJECUTOR
+# ═══════════════════════════════════════════════════════════════════════════
+
+class EjecutorTrabajos:
+    """
+    Despacha trabajos de CPU a un pool de procesos precalentado, con cola
+    acotada (EjecutorSaturado cuando no hay cupo), tiempo máximo por trabajo
+    y métricas de ocupación. Con 0 workers usa hilos del mismo proceso.
+
+    Un trabajo que agota el tiempo ya en ejecución no puede interrumpirse:
+    sigue ocupando su cupo hasta terminar, así la contrapresión refleja la
+    carga real de los workers.
+    """
+
+    def __init__(self, workers: int, max_cola: int, timeout_s: float):
+        self.workers = max(0, workers)
+        self.max_cola = max(0, max_cola)
+        self.timeout_s = timeout_s
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+        self._en_vuelo = 0
+        self._contadores = {'completados': 0, 'errores': 0, 'rechazados': 0, 'tiempo_agotado': 0}
+        self._esperas = deque(maxlen=MUESTRAS_METRICAS)
+        self._ejecuciones = deque(maxlen=MUESTRAS_METRICAS)
+
+    @property
+    def capacidad(self) -> int:
+        """Trabajos admitidos a la vez: uno por worker más la cola"""
+        return max(1, self.workers) + self.max_cola
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    if self.workers == 0:
+                        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="simulador")
+                    else:
+                        self._pool = ProcessPoolExecutor(
+                            max_workers=self.workers,
+                            mp_context=multiprocessing.get_context("spawn"),
+                            initializer=_inicializar_worker
+                        )
+        return self._pool
+
+    def iniciar(self) -> None:
+        """Crea el pool y arranca todos los workers sin esperar a que terminen de cargar"""
+        pool = self._get_pool()
+        if self.workers > 0:
+            for _ in range(self.workers):
+                pool.submit(_calentar)
+            print(f"⚙️ Ejecutor del simulador: {self.workers} workers, cola de {self.max_cola}")
+
+    def cerrar(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def _seguir(self, futuros: List[Future]) -> None:
+        """Libera el cupo cuando terminan todos los lotes, aunque la petición ya haya respondido"""
+        pendientes = [len(futuros)]
+
+        def _terminado(_: Future) -> None:
+            with self._lock:
+                pendientes[0] -= 1
+                if pendientes[0] > 0:
+                    return
+                self._en_vuelo -= 1
+                if any(f.cancelled() for f in futuros):
+                    return
+                if any(f.exception() is not None for f in futuros):
+                    self._contadores['errores'] += 1
+                else:
+                    self._contadores['completados'] += 1
+
+        if not futuros:
+            with self._lock:
+                self._en_vuelo -= 1
+        for futuro in futuros:
+            futuro.add_done_callback(_terminado)
+
+    def _enviar(self, fn: Callable[..., Any], args: Tuple) -> Future:
+        try:
+            return self._get_pool().submit(_ejecutar_trabajo, fn, args)
+        except (BrokenProcessPool, RuntimeError):
+            # Un worker murió (o el pool se cerró): se crea uno nuevo
+            self.cerrar()
+            return self._get_pool().submit(_ejecutar_trabajo, fn, args)
+
+    async def ejecutar(self, fn: Callable[..., Any], *args, timeout: Optional[float] = None) -> Any:
+        """Ejecuta fn(*args) en el pool sin bloquear el event loop"""
+        return (await self.ejecutar_lotes(fn, [args], timeout=timeout))[0]
+
+    async def ejecutar_lotes(
+        self, fn: Callable[..., Any], tareas: Sequence[Tuple], timeout: Optional[float] = None
+    ) -> List[Any]:
+        """
+        Ejecuta fn(*args) para cada tupla de `tareas`, repartidas entre los
+        workers, y retorna los resultados en orden. Todos los lotes cuentan
+        como un solo trabajo para el cupo y el tiempo máximo; si el tiempo se
+        agota, los lotes que aún no empezaron se cancelan.
+        """
+        with self._lock:
+            if self._en_vuelo >= self.capacidad:
+                self._contadores['rechazados'] += 1
+                raise EjecutorSaturado(f"Simulador saturado ({self._en_vuelo} trabajos en curso)")
+            self._en_vuelo += 1
+
+        enviado = time.time()
+        futuros: List[Future] = []
+        try:
+            for args in tareas:
+                futuros.append(self._enviar(fn, args))
+        except Exception:
+            for futuro in futuros:
+                futuro.cancel()
+            raise
+        finally:
+            self._seguir(futuros)
+
+        try:
+            resultados = await asyncio.wait_for(
+                asyncio.gather(*(asyncio.wrap_future(f) for f in futuros)), timeout or self.timeout_s
+            )
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._contadores['tiempo_agotado'] += 1
+            raise TiempoAgotado(f"La simulación superó {timeout or self.timeout_s:g} s")
+        except BrokenProcessPool:
+            self.cerrar()
+            raise
+        except Exception:
+            for futuro in futuros:
+                futuro.cancel()
+            raise
+
+        if not resultados:
+            return []
+        inicio = min(r[1] for r in resultados)
+        self._esperas.append(max(0.0, inicio - enviado))
+        self._ejecuciones.append(max(r[2] for r in resultados) - inicio)
+        return [r[0] for r in resultados]
+
+    def metricas(self) -> Dict[str, Any]:
+        """Ocupación actual y tiempos recientes de espera y ejecución"""
+        with self._lock:
+            en_vuelo = self._en_vuelo
+            contadores = dict(self._contadores)
+        esperas = np.array(self._esperas) * 1000
+        ejecuciones = np.array(self._ejecuciones) * 1000
+
+        def _resumen(valores: np.ndarray) -> Dict[str, Optional[float]]:
+            if len(valores) == 0:
+                return {'media': None, 'p95': None}
+            return {'media': round(float(valores.mean()), 1), 'p95': round(float(np.percentile(valores, 95)), 1)}
+
+        return {
+            'modo': 'procesos' if self.workers > 0 else 'hilos',
+            'workers': self.workers,
+            'capacidad': self.capacidad,
+            'en_curso': en_vuelo,
+            'en_cola': max(0, en_vuelo - max(1, self.workers)),
+            'max_cola': self.max_cola,
+            'timeout_s': self.timeout_s,
+            **contadores,
+            'espera_ms': _resumen(esperas),
+            'ejecucion_ms': _resumen(ejecuciones),
+        }
+
+
+# Instancia singleton para las rutas del simulador
+ejecutor_simulador = EjecutorTrabajos(
+    settings.SIMULADOR_WORKERS, settings.SIMULADOR_MAX_COLA, settings.SIMULADOR_TIMEOUT_S
+)
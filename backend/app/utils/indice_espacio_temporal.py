@@ -0,0 +1,268 @@
+# ═══════════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Índice Espacio-Temporal de Eventos
+# ═══════════════════════════════════════════════════════════════════════════════
+
+import math
+import numpy as np
+from typing import Iterator, Tuple
+
+
+RADIO_TIERRA_KM = 6371.0
+KM_POR_GRADO = 111.195
+
+# Pares evento × candidato evaluados a la vez en el modo masivo (acota la memoria)
+MAX_PARES = 2_000_000
+
+
+def distancia_km(lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """Distancia de gran círculo (haversine) vectorizada"""
+    lat1, lon1, lat2, lon2 = (np.radians(v) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * RADIO_TIERRA_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def cuerda2_desde_km(radio_km: float) -> float:
+    """Cuerda al cuadrado en la esfera unitaria equivalente a una distancia de gran círculo"""
+    angulo = min(radio_km / RADIO_TIERRA_KM, np.pi)
+    return float((2.0 * np.sin(angulo / 2.0)) ** 2)
+
+
+def expandir_rangos(desde: np.ndarray, hasta: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Concatena los rangos [desde_i, hasta_i) sin bucles: retorna, por cada
+    elemento, el índice del rango de origen y la posición.
+    """
+    largos = np.maximum(hasta - desde, 0)
+    total = int(largos.sum())
+    origen = np.repeat(np.arange(len(largos)), largos)
+    desplazamiento = np.repeat(desde - (np.cumsum(largos) - largos), largos)
+    return origen, np.arange(total) + desplazamiento
+
+
+class IndiceEspacioTemporal:
+    """
+    Eventos ordenados por tiempo más cubetas espaciales de `celda_grados`.
+
+    Dentro de cada cubeta los eventos conservan el orden temporal, así que la
+    clave compuesta (cubeta, tiempo) queda ordenada y una sola búsqueda
+    binaria da los eventos de una cubeta dentro de una ventana de tiempo.
+    Una consulta elige lo más barato entre la ventana de tiempo global
+    (searchsorted sobre el arreglo temporal) y las cubetas que cubren el
+    radio; luego filtra distancia y tiempo exactos de forma vectorizada.
+    Nunca recorre el catálogo completo.
+
+    Las posiciones se expresan en filas del arreglo original; las filas sin
+    tiempo o sin coordenadas no se indexan.
+    """
+
+    def __init__(
+        self, tiempo_dias: np.ndarray, latitud: np.ndarray, longitud: np.ndarray, celda_grados: float = 0.5
+    ):
+        tiempo_dias = np.asarray(tiempo_dias, dtype=float)
+        latitud = np.asarray(latitud, dtype=float)
+        longitud = np.asarray(longitud, dtype=float)
+        validos = np.isfinite(tiempo_dias) & np.isfinite(latitud) & np.isfinite(longitud)
+
+        # Arreglo temporal: posición → fila original
+        filas = np.flatnonzero(validos)
+        self.filas = filas[np.argsort(tiempo_dias[filas], kind='stable')]
+        self.t = tiempo_dias[self.filas]
+        self.lat = latitud[self.filas]
+        self.lon = longitud[self.filas]
+        # Vectores unitarios: el filtro de distancia compara cuerdas sin trigonometría
+        lat_rad, lon_rad = np.radians(self.lat), np.radians(self.lon)
+        self._xyz = (np.cos(lat_rad) * np.cos(lon_rad), np.cos(lat_rad) * np.sin(lon_rad), np.sin(lat_rad))
+        self._posicion = np.full(len(tiempo_dias), -1, dtype=np.int64)
+        self._posicion[self.filas] = np.arange(len(self.filas))
+
+        # Cubetas: clave fila * columnas + columna de una grilla global en grados
+        self.celda = celda_grados
+        self.columnas = int(np.ceil(360.0 / celda_grados))
+        self.filas_grilla = int(np.ceil(180.0 / celda_grados))
+        claves = self._clave(self._fila_grilla(self.lat), self._columna_grilla(self.lon))
+
+        # El orden estable por cubeta conserva el orden temporal dentro de cada una
+        self._miembros = np.argsort(claves, kind='stable')
+        self._t0 = float(self.t[0]) if len(self.t) else 0.0
+        self._ancho = float(self.t[-1] - self._t0) + 1.0 if len(self.t) else 1.0
+        self._compuesta = claves[self._miembros] * self._ancho + (self.t[self._miembros] - self._t0)
+        self._claves_ocupadas = np.unique(claves)
+
+    def __len__(self) -> int:
+        return len(self.filas)
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # GRILLA
+    # ═══════════════════════════════════════════════════════════════════════
+
+    def _fila_grilla(self, lat: np.ndarray) -> np.ndarray:
+        return np.clip(np.floor((lat + 90.0) / self.celda), 0, self.filas_grilla - 1).astype(np.int64)
+
+    def _columna_grilla(self, lon: np.ndarray) -> np.ndarray:
+        return np.floor((lon + 180.0) / self.celda).astype(np.int64) % self.columnas
+
+    def _clave(self, fila: np.ndarray, columna: np.ndarray) -> np.ndarray:
+        return fila * self.columnas + columna
+
+    def _cubetas_cercanas(self, lat: float, lon: float, radio_km: float) -> np.ndarray:
+        """Claves ocupadas de las cubetas que pueden tener eventos a ≤ radio_km"""
+        # Aritmética escalar de Python: esta función corre una vez por consulta
+        dlat = radio_km / KM_POR_GRADO
+        fila_desde = min(max(math.floor((lat - dlat + 90.0) / self.celda), 0), self.filas_grilla - 1)
+        fila_hasta = min(max(math.floor((lat + dlat + 90.0) / self.celda), 0), self.filas_grilla - 1)
+        filas = np.arange(fila_desde, fila_hasta + 1)
+
+        # Un grado de longitud se acorta con la latitud: se usa la más alejada del ecuador
+        coseno = math.cos(math.radians(min(90.0, abs(lat) + dlat)))
+        dlon = radio_km / (KM_POR_GRADO * coseno) if coseno > 1e-6 else 360.0
+        if 2 * dlon >= 360.0 - self.celda:
+            columnas = np.arange(self.columnas)
+        else:
+            desde = math.floor((lon - dlon + 180.0) / self.celda)
+            hasta = math.floor((lon + dlon + 180.0) / self.celda)
+            columnas = np.arange(desde, hasta + 1) % self.columnas
+
+        claves = (filas[:, None] * self.columnas + columnas[None, :]).ravel()
+        i = np.minimum(np.searchsorted(self._claves_ocupadas, claves), len(self._claves_ocupadas) - 1)
+        return claves[self._claves_ocupadas[i] == claves]
+
+    def _rangos_cubetas(
+        self, claves: np.ndarray, t_desde: np.ndarray, t_hasta: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Rangos [desde, hasta) sobre los miembros ordenados de cada cubeta en su
+        ventana de tiempo. La clave compuesta es float: el margen de un segundo
+        cubre el redondeo y el filtro exacto posterior descarta lo que sobre.
+        """
+        margen = 1.0 / 86400.0
+        base = claves * self._ancho
+        # Ventana recortada al rango indexado: no invade la clave de otra cubeta
+        desde_rel = np.clip(t_desde - self._t0, 0.0, self._ancho - 1.0)
+        hasta_rel = np.clip(t_hasta - self._t0, 0.0, self._ancho - 1.0)
+        desde = np.searchsorted(self._compuesta, base + desde_rel - margen, side='left')
+        hasta = np.searchsorted(self._compuesta, base + hasta_rel + margen, side='right')
+        return desde, hasta
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # CONSULTAS
+    # ═══════════════════════════════════════════════════════════════════════
+
+    def posicion(self, fila: int) -> int:
+        """Posición temporal de una fila original (-1 si no está indexada)"""
+        return int(self._posicion[fila]) if 0 <= fila < len(self._posicion) else -1
+
+    def posiciones(self, filas: np.ndarray) -> np.ndarray:
+        """Posiciones temporales de filas ya indexadas (desempata eventos simultáneos)"""
+        return self._posicion[filas]
+
+    def en_ventana(self, p: int, radio_km: float, antes_dias: float, despues_dias: float) -> np.ndarray:
+        """
+        Posiciones temporales (ordenadas, sin incluir p) a ≤ radio_km de la
+        posición p y entre t - antes_dias y t + despues_dias.
+        """
+        t, lat, lon = self.t[p], self.lat[p], self.lon[p]
+        t_desde, t_hasta = t - antes_dias, t + despues_dias
+
+        # Ventana global de tiempo
+        desde = np.searchsorted(self.t, t_desde, side='left')
+        hasta = np.searchsorted(self.t, t_hasta, side='right')
+
+        # Cubetas del radio dentro de la misma ventana: si son menos candidatos, se usan ellas
+        claves = self._cubetas_cercanas(lat, lon, radio_km)
+        c_desde, c_hasta = self._rangos_cubetas(
+            claves, np.full(len(claves), t_desde), np.full(len(claves), t_hasta)
+        )
+        if int((c_hasta - c_desde).sum()) < hasta - desde:
+            _, indices = expandir_rangos(c_desde, c_hasta)
+            candidatos = np.sort(self._miembros[indices])
+        else:
+            candidatos = np.arange(desde, hasta)
+
+        candidatos = candidatos[candidatos != p]
+        dt = self.t[candidatos] - t
+        cerca = (dt >= -antes_dias) & (dt <= despues_dias) & self._dentro_del_radio(p, candidatos, radio_km)
+        return candidatos[cerca]
+
+    def vecinos(self, fila: int, radio_km: float, ventana_dias: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Eventos a ≤ radio_km y ≤ ventana_dias de la fila dada (sin incluirla).
+        Retorna (filas originales, distancias km, desfase en días), en orden
+        temporal; los desfases negativos son eventos anteriores.
+        """
+        p = self.posicion(fila)
+        if p < 0:
+            return np.array([], dtype=np.int64), np.array([]), np.array([])
+
+        candidatos = self.en_ventana(p, radio_km, ventana_dias, ventana_dias)
+        dist = distancia_km(self.lat[p], self.lon[p], self.lat[candidatos], self.lon[candidatos])
+        return self.filas[candidatos], dist, self.t[candidatos] - self.t[p]
+
+    def _dentro_del_radio(self, origen: np.ndarray, candidatos: np.ndarray, radio_km: float) -> np.ndarray:
+        """Distancia de gran círculo ≤ radio_km, comparando cuerdas al cuadrado"""
+        cuerda2 = np.zeros(len(candidatos))
+        for eje in self._xyz:
+            diferencia = eje[candidatos] - eje[origen]
+            cuerda2 += diferencia * diferencia
+        return cuerda2 <= cuerda2_desde_km(radio_km)
+
+    def contar_vecinos(self, radio_km: float, ventana_dias: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Modo masivo: para cada fila original, cuántos eventos hay a ≤ radio_km
+        y ≤ ventana_dias antes y después de ella (en el orden temporal del
+        índice). Cubeta por cubeta, cada evento se compara solo con los
+        posteriores de las cubetas vecinas dentro de su ventana, por lotes de
+        MAX_PARES pares: cada par se evalúa una vez y cuenta para los dos.
+        """
+        previos = np.zeros(len(self._posicion), dtype=np.int64)
+        posteriores = np.zeros(len(self._posicion), dtype=np.int64)
+        if len(self) == 0:
+            return previos, posteriores
+
+        conteo_previos = np.zeros(len(self), dtype=np.int64)
+        conteo_posteriores = np.zeros(len(self), dtype=np.int64)
+        claves_miembros = self._clave(self._fila_grilla(self.lat), self._columna_grilla(self.lon))[self._miembros]
+        limites = np.searchsorted(claves_miembros, self._claves_ocupadas, side='left').tolist() + [len(self)]
+
+        for k, clave in enumerate(self._claves_ocupadas):
+            miembros = self._miembros[limites[k]:limites[k + 1]]
+            centro_lat = (clave // self.columnas + 0.5) * self.celda - 90.0
+            centro_lon = (clave % self.columnas + 0.5) * self.celda - 180.0
+            # Radio ampliado con la media diagonal de la celda: cubre a todos sus miembros
+            vecinas = self._cubetas_cercanas(centro_lat, centro_lon, radio_km + self._semidiagonal_km(centro_lat))
+
+            for origen, candidatos in self._pares(miembros, vecinas, ventana_dias):
+                p = miembros[origen]
+                adelante = candidatos > p
+                p, candidatos = p[adelante], candidatos[adelante]
+                cerca = (
+                    (self.t[candidatos] - self.t[p] <= ventana_dias)
+                    & self._dentro_del_radio(p, candidatos, radio_km)
+                )
+                conteo_posteriores += np.bincount(p[cerca], minlength=len(self))
+                conteo_previos += np.bincount(candidatos[cerca], minlength=len(self))
+
+        previos[self.filas] = conteo_previos
+        posteriores[self.filas] = conteo_posteriores
+        return previos, posteriores
+
+    def _semidiagonal_km(self, lat: float) -> float:
+        coseno = max(np.cos(np.radians(min(90.0, abs(lat) + self.celda))), 0.0)
+        return 0.5 * self.celda * KM_POR_GRADO * float(np.hypot(1.0, coseno))
+
+    def _pares(
+        self, miembros: np.ndarray, vecinas: np.ndarray, ventana_dias: float
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """(índice en miembros, posición candidata) de cada par hacia adelante en el tiempo, por lotes"""
+        t = self.t[miembros]
+        claves = np.repeat(vecinas, len(miembros))
+        t_pares = np.tile(t, len(vecinas))
+        desde, hasta = self._rangos_cubetas(claves, t_pares, t_pares + ventana_dias)
+        origen_rango = np.tile(np.arange(len(miembros)), len(vecinas))
+
+        # Lotes de rangos consecutivos con unos MAX_PARES pares cada uno
+        lote = np.cumsum(hasta - desde) // MAX_PARES
+        cortes = (np.flatnonzero(np.diff(lote)) + 1).tolist()
+        for inicio, fin in zip([0] + cortes, cortes + [len(desde)]):
+            rango, indices = expandir_rangos(desde[inicio:fin], hasta[inicio:fin])
+            if len(indices):
+                yield origen_rango[inicio:fin][rango], self._miembros[indices]
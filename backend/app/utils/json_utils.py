@@ -2,133 +2,45 @@
 # SIASIC-Santander Backend - Utilidades JSON
 # ═══════════════════════════════════════════════════════════════════════════════
 
-import math
-from typing import Any, Dict, List
+from enum import Enum
+from typing import Any
 
+import numpy as np
+import orjson
+import pandas as pd
+from fastapi.responses import JSONResponse
 
-def clean_for_json(obj: Any) -> Any:
-    """
-    Limpia recursivamente un objeto para que sea serializable a JSON.
-    Reemplaza NaN, Infinity y -Infinity con valores válidos.
-    """
-    if obj is None:
+
+# NumPy nativo (escalares y arreglos) y claves no-string; NaN/Infinity salen como null
+OPCIONES_JSON = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default_json(obj: Any) -> Any:
+    """Tipos que orjson no serializa por sí solo"""
+    if obj is pd.NaT or obj is pd.NA:
         return None
-    
-    if isinstance(obj, float):
-        if math.isnan(obj) or math.isinf(obj):
-            return None
-        return obj
-    
-    if isinstance(obj, dict):
-        return {key: clean_for_json(value) for key, value in obj.items()}
-    
-    if isinstance(obj, list):
-        return [clean_for_json(item) for item in obj]
-    
-    if isinstance(obj, (int, str, bool)):
-        return obj
-    
-    # Para tipos numpy
-    try:
-        import numpy as np
-        if isinstance(obj, (np.integer,)):
-            return int(obj)
-        if isinstance(obj, (np.floating,)):
-            if np.isnan(obj) or np.isinf(obj):
-                return None
-            return float(obj)
-        if isinstance(obj, np.ndarray):
-            return clean_for_json(obj.tolist())
-        if isinstance(obj, np.bool_):
-            return bool(obj)
-    except ImportError:
-        pass
-    
-    # Para timestamps de pandas
-    try:
-        import pandas as pd
-        if isinstance(obj, pd.Timestamp):
-            return obj.isoformat()
-        if pd.isna(obj):
-            return None
-    except ImportError:
-        pass
-    
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    if isinstance(obj, np.ndarray):
+        # Arreglos no contiguos o de objetos
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, Enum):
+        return obj.value
+    if hasattr(obj, 'model_dump'):
+        return obj.model_dump()
     return str(obj)
 
 
-def clean_sismo_record(record: Dict[str, Any]) -> Dict[str, Any]:
-    """Limpia un registro de sismo específicamente"""
-    if record is None:
-        return {}
-    
-    cleaned = {}
-    
-    for key, value in record.items():
-        # Verificar si es NaN
-        is_nan = False
-        try:
-            if value is None:
-                is_nan = True
-            elif isinstance(value, float) and math.isnan(value):
-                is_nan = True
-            else:
-                import pandas as pd
-                if pd.isna(value):
-                    is_nan = True
-        except:
-            pass
-        
-        # Campos de texto
-        if key in ['municipio', 'departamento', 'region', 'tipo_magnitud', 'tipo_profundidad', 'estado', 'ubicacion']:
-            if is_nan or value is None or value == '':
-                cleaned[key] = "N/A"
-            else:
-                cleaned[key] = str(value)
-        
-        # Campos numéricos
-        elif key in ['latitud', 'longitud', 'profundidad', 'magnitud', 'fases', 'rms', 'gap']:
-            if is_nan or value is None:
-                cleaned[key] = 0.0
-            else:
-                try:
-                    cleaned[key] = float(value)
-                except (ValueError, TypeError):
-                    cleaned[key] = 0.0
-        
-        # ID
-        elif key == 'id':
-            if is_nan or value is None:
-                cleaned[key] = 0
-            else:
-                try:
-                    cleaned[key] = int(value)
-                except (ValueError, TypeError):
-                    cleaned[key] = 0
-        
-        # Campos booleanos
-        elif key in ['es_santander', 'es_nido']:
-            if is_nan or value is None:
-                cleaned[key] = False
-            else:
-                cleaned[key] = bool(value)
-        
-        # Campos de fecha
-        elif key in ['fecha_hora']:
-            if is_nan or value is None:
-                cleaned[key] = ""
-            else:
-                try:
-                    import pandas as pd
-                    if isinstance(value, pd.Timestamp):
-                        cleaned[key] = value.isoformat()
-                    else:
-                        cleaned[key] = str(value)
-                except:
-                    cleaned[key] = str(value) if value else ""
-        
-        # Otros campos
-        else:
-            cleaned[key] = clean_for_json(value)
-    
-    return cleaned
+def render_json(contenido: Any) -> bytes:
+    """Serializa en una sola pasada nativa (orjson), sin recorrer antes el objeto"""
+    return orjson.dumps(contenido, default=_default_json, option=OPCIONES_JSON)
+
+
+class FastJSONResponse(JSONResponse):
+    """Respuesta JSON de la aplicación: acepta NumPy, pandas y NaN directamente"""
+
+    def render(self, content: Any) -> bytes:
+        return render_json(content)
+
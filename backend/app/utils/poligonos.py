@@ -0,0 +1,173 @@
+# ═══════════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Utilidades de Polígonos (punto en polígono)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Pares punto × arista evaluados a la vez en el ray casting (acota la memoria)
+MAX_PARES = 2_000_000
+
+# Resolución de la grilla: celdas por lado del polígono típico (mediana)
+CELDAS_POR_LADO = 16
+
+
+def anillos_geojson(geometria: Dict[str, Any]) -> List[np.ndarray]:
+    """
+    Anillos (k, 2) en (lon, lat) de un Polygon o MultiPolygon GeoJSON,
+    exteriores y huecos juntos: la regla par-impar resuelve los huecos.
+    """
+    tipo = geometria.get('type')
+    if tipo == 'Polygon':
+        poligonos = [geometria['coordinates']]
+    elif tipo == 'MultiPolygon':
+        poligonos = geometria['coordinates']
+    else:
+        return []
+    return [
+        np.asarray(anillo, dtype=float)[:, :2]
+        for poligono in poligonos for anillo in poligono if len(anillo) >= 3
+    ]
+
+
+def aristas_de_anillos(anillos: List[np.ndarray]) -> np.ndarray:
+    """Aristas (m, 4) como x1, y1, x2, y2; cada anillo se cierra si no lo está"""
+    aristas = []
+    for anillo in anillos:
+        if not np.array_equal(anillo[0], anillo[-1]):
+            anillo = np.vstack([anillo, anillo[:1]])
+        aristas.append(np.hstack([anillo[:-1], anillo[1:]]))
+    return np.vstack(aristas) if aristas else np.empty((0, 4))
+
+
+def dentro_de_aristas(x: np.ndarray, y: np.ndarray, aristas: np.ndarray) -> np.ndarray:
+    """
+    Ray casting vectorizado (regla par-impar): cuenta las aristas que cruza un
+    rayo horizontal hacia +x desde cada punto. Procesa los puntos por lotes
+    para no pasar de MAX_PARES comparaciones en memoria.
+    """
+    x1, y1, x2, y2 = (aristas[:, i] for i in range(4))
+    # Pendiente inversa; las aristas horizontales nunca cumplen el cruce
+    horizontales = y1 == y2
+    inversa = np.where(horizontales, 0.0, (x2 - x1) / np.where(horizontales, 1.0, y2 - y1))
+
+    dentro = np.zeros(len(x), dtype=bool)
+    lote = max(1, MAX_PARES // max(len(aristas), 1))
+    for inicio in range(0, len(x), lote):
+        px = x[inicio:inicio + lote, None]
+        py = y[inicio:inicio + lote, None]
+        cruza = (y1 > py) != (y2 > py)
+        corte = x1 + (py - y1) * inversa
+        dentro[inicio:inicio + lote] = np.count_nonzero(cruza & (px < corte), axis=1) % 2 == 1
+    return dentro
+
+
+class IndicePoligonos:
+    """
+    Polígonos con prefiltro de grilla. Al construir el índice, cada celda de
+    la caja de un polígono queda como frontera (la toca alguna arista),
+    interior o exterior. En la consulta los puntos se ordenan por celda una
+    vez: los de celdas interiores se asignan directo, los de celdas frontera
+    pasan por el ray casting exacto y los demás se descartan.
+    """
+
+    def __init__(self, anillos: List[List[np.ndarray]], celda_grados: Optional[float] = None):
+        self.aristas = [aristas_de_anillos(a) for a in anillos]
+        self.cajas = np.array([
+            [a[:, [0, 2]].min(), a[:, [1, 3]].min(), a[:, [0, 2]].max(), a[:, [1, 3]].max()]
+            if len(a) else [np.inf, np.inf, -np.inf, -np.inf]
+            for a in self.aristas
+        ]).reshape(-1, 4)
+
+        validas = np.isfinite(self.cajas).all(axis=1)
+        if not validas.any():
+            self.celda, self.x0, self.y0, self.columnas, self.filas = 1.0, 0.0, 0.0, 0, 0
+            self._celdas_poligono = [(np.empty(0, np.int64), np.empty(0, np.int64))] * len(self.aristas)
+            return
+
+        # Por defecto, unas CELDAS_POR_LADO celdas por lado del polígono típico
+        if celda_grados is None:
+            lados = np.maximum(self.cajas[validas, 2] - self.cajas[validas, 0],
+                               self.cajas[validas, 3] - self.cajas[validas, 1])
+            celda_grados = max(float(np.median(lados)) / CELDAS_POR_LADO, 1e-3)
+        self.celda = celda_grados
+        self.x0, self.y0 = self.cajas[validas, 0].min(), self.cajas[validas, 1].min()
+        self.columnas = int((self.cajas[validas, 2].max() - self.x0) // self.celda) + 1
+        self.filas = int((self.cajas[validas, 3].max() - self.y0) // self.celda) + 1
+
+        # (interiores, frontera): claves de celda ordenadas de cada polígono
+        self._celdas_poligono = [self._clasificar_celdas(a) for a in self.aristas]
+
+    def __len__(self) -> int:
+        return len(self.aristas)
+
+    def _celdas(self, x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        return np.floor((x - self.x0) / self.celda), np.floor((y - self.y0) / self.celda)
+
+    def _clasificar_celdas(self, aristas: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        vacio = np.empty(0, dtype=np.int64)
+        if len(aristas) == 0:
+            return vacio, vacio
+
+        # Celdas que toca cada arista (su caja, conservador), relativas a la del polígono
+        ex0, ey0 = self._celdas(np.minimum(aristas[:, 0], aristas[:, 2]), np.minimum(aristas[:, 1], aristas[:, 3]))
+        ex1, ey1 = self._celdas(np.maximum(aristas[:, 0], aristas[:, 2]), np.maximum(aristas[:, 1], aristas[:, 3]))
+        cx0, cy0 = int(ex0.min()), int(ey0.min())
+        ex0, ex1 = (ex0 - cx0).astype(np.int64), (ex1 - cx0).astype(np.int64)
+        ey0, ey1 = (ey0 - cy0).astype(np.int64), (ey1 - cy0).astype(np.int64)
+        frontera = np.zeros((int(ey1.max()) + 1, int(ex1.max()) + 1), dtype=bool)
+
+        # Casi todas las aristas caben en una celda; las largas se marcan una a una
+        cortas = (ex0 == ex1) & (ey0 == ey1)
+        frontera[ey0[cortas], ex0[cortas]] = True
+        for i in np.flatnonzero(~cortas):
+            frontera[ey0[i]:ey1[i] + 1, ex0[i]:ex1[i] + 1] = True
+
+        # Las celdas libres están completas dentro o fuera: decide su centro
+        fy, fx = np.nonzero(~frontera)
+        centro_x = self.x0 + (cx0 + fx + 0.5) * self.celda
+        centro_y = self.y0 + (cy0 + fy + 0.5) * self.celda
+        dentro = dentro_de_aristas(centro_x, centro_y, aristas)
+
+        def claves(filas: np.ndarray, columnas: np.ndarray) -> np.ndarray:
+            return np.sort((cy0 + filas) * self.columnas + (cx0 + columnas)).astype(np.int64)
+
+        by, bx = np.nonzero(frontera)
+        return claves(fy[dentro], fx[dentro]), claves(by, bx)
+
+    def localizar(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Índice del polígono que contiene cada punto (x=lon, y=lat); -1 si ninguno"""
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        resultado = np.full(len(x), -1, dtype=np.int64)
+        if len(x) == 0 or self.columnas == 0:
+            return resultado
+
+        # Clave de celda por punto (fuera de la grilla: sin candidato)
+        cx, cy = self._celdas(x, y)
+        en_grilla = (cx >= 0) & (cx < self.columnas) & (cy >= 0) & (cy < self.filas)
+        indices = np.flatnonzero(en_grilla)
+        claves = (cy[indices] * self.columnas + cx[indices]).astype(np.int64)
+        orden = np.argsort(claves, kind='stable')
+        indices, claves = indices[orden], claves[orden]
+
+        for p, (interiores, frontera) in enumerate(self._celdas_poligono):
+            # Puntos de cada celda: rango contiguo en las claves ordenadas
+            for celdas, exacto in ((interiores, False), (frontera, True)):
+                if len(celdas) == 0:
+                    continue
+                desde = np.searchsorted(claves, celdas, side='left')
+                hasta = np.searchsorted(claves, celdas, side='right')
+                con_puntos = hasta > desde
+                if not con_puntos.any():
+                    continue
+                candidatos = np.concatenate([indices[a:b] for a, b in zip(desde[con_puntos], hasta[con_puntos])])
+
+                # Bordes compartidos: gana el primer polígono que contiene el punto
+                candidatos = candidatos[resultado[candidatos] < 0]
+                if exacto and len(candidatos):
+                    candidatos = candidatos[dentro_de_aristas(x[candidatos], y[candidatos], self.aristas[p])]
+                resultado[candidatos] = p
+
+        return resultado
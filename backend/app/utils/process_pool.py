@@ -0,0 +1,62 @@
+# ═══════════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Pool de Procesos
+# ═══════════════════════════════════════════════════════════════════════════════
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from app.config import settings
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_en_worker = False
+
+
+def marcar_como_worker() -> None:
+    """
+    Indica que este proceso ya es un worker de un pool: map_en_paralelo corre
+    en línea para no crear pools anidados.
+    """
+    global _en_worker
+    _en_worker = True
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Retorna el pool de procesos compartido, creándolo la primera vez.
+    Se usa el contexto "spawn" para no heredar hilos del servidor en los hijos.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=max(1, settings.PROCESS_POOL_WORKERS),
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+    return _pool
+
+
+def map_en_paralelo(fn: Callable[..., Any], tareas: Sequence[Tuple]) -> List[Any]:
+    """
+    Ejecuta fn(*args) para cada tupla de argumentos y retorna los resultados en orden.
+    Con una sola tarea, un solo worker o dentro de un worker se ejecuta en el proceso actual.
+    """
+    if len(tareas) <= 1 or settings.PROCESS_POOL_WORKERS <= 1 or _en_worker:
+        return [fn(*args) for args in tareas]
+    
+    pool = get_process_pool()
+    futuros = [pool.submit(fn, *args) for args in tareas]
+    return [f.result() for f in futuros]
+
+
+def cerrar_process_pool() -> None:
+    """Libera el pool de procesos compartido"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
@@ -0,0 +1,218 @@
+# ═══════════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Utilidades Raster
+# ═══════════════════════════════════════════════════════════════════════════════
+
+import struct
+import zlib
+import numpy as np
+from collections import defaultdict
+from scipy.signal import fftconvolve
+from typing import Dict, List, Optional, Tuple
+
+
+KM_POR_GRADO = 111.195
+SIGMAS_NUCLEO = 3.0         # El núcleo gaussiano se trunca a ±3σ
+MAX_CELDAS = 16_000_000     # Malla extendida máxima (ancho de banda grande frente a la celda)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# CODIFICACIÓN PNG (sin dependencias externas)
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _chunk_png(tipo: bytes, datos: bytes) -> bytes:
+    """Chunk PNG con longitud y CRC"""
+    return struct.pack('>I', len(datos)) + tipo + datos + struct.pack('>I', zlib.crc32(tipo + datos) & 0xFFFFFFFF)
+
+
+def encode_png(imagen: np.ndarray) -> bytes:
+    """
+    Codifica una imagen uint8 como PNG.
+    Acepta (alto, ancho) en escala de grises o (alto, ancho, 4) en RGBA.
+    """
+    imagen = np.ascontiguousarray(imagen, dtype=np.uint8)
+    if imagen.ndim == 2:
+        alto, ancho = imagen.shape
+        tipo_color = 0
+    else:
+        alto, ancho, _ = imagen.shape
+        tipo_color = 6
+
+    # Filtro 0 (None) al inicio de cada fila
+    filas = imagen.reshape(alto, -1)
+    crudo = np.hstack([np.zeros((alto, 1), dtype=np.uint8), filas]).tobytes()
+
+    cabecera = struct.pack('>IIBBBBB', ancho, alto, 8, tipo_color, 0, 0, 0)
+    return (
+        b'\x89PNG\r\n\x1a\n'
+        + _chunk_png(b'IHDR', cabecera)
+        + _chunk_png(b'IDAT', zlib.compress(crudo, 6))
+        + _chunk_png(b'IEND', b'')
+    )
+
+
+def colorear(indices: np.ndarray, paleta: np.ndarray) -> np.ndarray:
+    """Aplica una paleta (n, 4) uint8 a una matriz de índices enteros"""
+    return paleta[np.clip(indices, 0, len(paleta) - 1)]
+
+
+def hex_a_rgba(color: str, alfa: int = 255) -> Tuple[int, int, int, int]:
+    """Convierte '#RRGGBB' a una tupla RGBA"""
+    color = color.lstrip('#')
+    return int(color[0:2], 16), int(color[2:4], 16), int(color[4:6], 16), alfa
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SUAVIZADO GAUSSIANO EN MALLA (KDE POR FFT)
+# ═══════════════════════════════════════════════════════════════════════════
+
+def suavizar_en_malla(
+    latitud: np.ndarray,
+    longitud: np.ndarray,
+    pesos: Optional[np.ndarray],
+    lat_min: float,
+    lon_min: float,
+    alto: int,
+    ancho: int,
+    celda: float,
+    ancho_banda_km: float
+) -> np.ndarray:
+    """
+    Masa por celda (alto, ancho), filas de sur a norte, de los puntos
+    suavizados con un núcleo gaussiano de desviación `ancho_banda_km`.
+    Los puntos se agrupan con np.histogram2d sobre la malla extendida ±3σ y
+    el núcleo se aplica por convolución FFT: O(n + celdas·log celdas). La
+    masa de los puntos cercanos al borde que cae fuera de la malla se pierde.
+    """
+    lat_max, lon_max = lat_min + alto * celda, lon_min + ancho * celda
+
+    # Núcleo separable en celdas (σ en x se estira con la latitud media)
+    coseno = np.cos(np.radians((lat_min + lat_max) / 2))
+    sigma_y = ancho_banda_km / (KM_POR_GRADO * celda)
+    sigma_x = ancho_banda_km / (KM_POR_GRADO * coseno * celda)
+    ry, rx = int(np.ceil(SIGMAS_NUCLEO * sigma_y)), int(np.ceil(SIGMAS_NUCLEO * sigma_x))
+    if (alto + 2 * ry) * (ancho + 2 * rx) > MAX_CELDAS:
+        raise ValueError("El ancho de banda es demasiado grande para la resolución y la caja pedidas")
+    nucleo = np.outer(
+        np.exp(-0.5 * (np.arange(-ry, ry + 1) / sigma_y) ** 2),
+        np.exp(-0.5 * (np.arange(-rx, rx + 1) / sigma_x) ** 2)
+    )
+    nucleo /= nucleo.sum()
+
+    conteos, _, _ = np.histogram2d(
+        latitud, longitud, bins=(alto + 2 * ry, ancho + 2 * rx),
+        range=[[lat_min - ry * celda, lat_max + ry * celda], [lon_min - rx * celda, lon_max + rx * celda]],
+        weights=pesos
+    )
+    # 'valid' recorta el margen: queda exactamente la malla pedida
+    return np.maximum(fftconvolve(conteos, nucleo, mode='valid'), 0.0)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# MARCHING SQUARES
+# ═══════════════════════════════════════════════════════════════════════════
+
+# Aristas de cada celda: T (arriba), R (derecha), B (abajo), L (izquierda)
+_SEGMENTOS = {
+    1: [('L', 'B')], 2: [('B', 'R')], 3: [('L', 'R')], 4: [('T', 'R')],
+    6: [('T', 'B')], 7: [('T', 'L')], 8: [('T', 'L')], 9: [('T', 'B')],
+    11: [('T', 'R')], 12: [('L', 'R')], 13: [('B', 'R')], 14: [('L', 'B')],
+}
+# Casos silla: (centro bajo el nivel, centro sobre el nivel)
+_SILLAS = {
+    5: ([('T', 'R'), ('L', 'B')], [('T', 'L'), ('B', 'R')]),
+    10: ([('T', 'L'), ('B', 'R')], [('T', 'R'), ('L', 'B')]),
+}
+
+
+def marching_squares(grid: np.ndarray, nivel: float) -> List[np.ndarray]:
+    """
+    Isolíneas cerradas de `grid` para `nivel`, como anillos (n, 2) en
+    coordenadas (fila, columna). La malla se rodea de un borde bajo el nivel,
+    así que todas las curvas se cierran (puntos fuera de la malla se recortan).
+    Clasificación de celdas e interpolación son vectorizadas; solo el
+    encadenamiento de segmentos recorre cada segmento una vez.
+    """
+    piso = min(float(np.nanmin(grid)), nivel) - 1.0
+    v = np.pad(np.nan_to_num(grid, nan=piso), 1, constant_values=piso)
+    ny, nx = v.shape
+
+    a, b = v[:-1, :-1], v[:-1, 1:]   # arriba-izquierda, arriba-derecha
+    c, d = v[1:, 1:], v[1:, :-1]     # abajo-derecha, abajo-izquierda
+    caso = (a >= nivel) * 8 + (b >= nivel) * 4 + (c >= nivel) * 2 + (d >= nivel) * 1
+    centro_alto = (a + b + c + d) / 4 >= nivel
+
+    # Identificadores de aristas: horizontales (i, j)-(i, j+1) y verticales (i, j)-(i+1, j)
+    n_h = ny * (nx - 1)
+    filas, cols = np.indices(caso.shape)
+    ids = {
+        'T': filas * (nx - 1) + cols,
+        'B': (filas + 1) * (nx - 1) + cols,
+        'L': n_h + filas * nx + cols,
+        'R': n_h + filas * nx + cols + 1,
+    }
+
+    origen, destino = [], []
+    for k, pares in _SEGMENTOS.items():
+        sel = caso == k
+        for e1, e2 in pares:
+            origen.append(ids[e1][sel])
+            destino.append(ids[e2][sel])
+    for k, (bajo, alto) in _SILLAS.items():
+        for pares, cond in ((bajo, ~centro_alto), (alto, centro_alto)):
+            sel = (caso == k) & cond
+            for e1, e2 in pares:
+                origen.append(ids[e1][sel])
+                destino.append(ids[e2][sel])
+
+    origen = np.concatenate(origen) if origen else np.array([], dtype=np.int64)
+    destino = np.concatenate(destino) if destino else np.array([], dtype=np.int64)
+    if len(origen) == 0:
+        return []
+
+    # Punto interpolado de cada arista usada
+    usadas = np.unique(np.concatenate([origen, destino]))
+    es_h = usadas < n_h
+    i = np.where(es_h, usadas // (nx - 1), (usadas - n_h) // nx)
+    j = np.where(es_h, usadas % (nx - 1), (usadas - n_h) % nx)
+    v0 = v[i, j]
+    v1 = np.where(es_h, v[i, np.minimum(j + 1, nx - 1)], v[np.minimum(i + 1, ny - 1), j])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.clip(np.nan_to_num((nivel - v0) / (v1 - v0), nan=0.5), 0, 1)
+    puntos_fila = np.where(es_h, i, i + t) - 1     # -1 deshace el borde
+    puntos_col = np.where(es_h, j + t, j) - 1
+    punto = dict(zip(usadas.tolist(), zip(puntos_fila.tolist(), puntos_col.tolist())))
+
+    # Encadenar segmentos en anillos (cada arista toca exactamente dos segmentos)
+    vecinos: Dict[int, List[int]] = defaultdict(list)
+    for o, dd in zip(origen.tolist(), destino.tolist()):
+        vecinos[o].append(dd)
+        vecinos[dd].append(o)
+
+    anillos = []
+    visitadas = set()
+    for inicio in vecinos:
+        if inicio in visitadas:
+            continue
+        anillo = [inicio]
+        visitadas.add(inicio)
+        previo, actual = None, inicio
+        while True:
+            siguientes = [n for n in vecinos[actual] if n != previo]
+            if not siguientes:
+                break
+            siguiente = siguientes[0]
+            if siguiente == inicio:
+                break
+            if siguiente in visitadas:
+                break
+            anillo.append(siguiente)
+            visitadas.add(siguiente)
+            previo, actual = actual, siguiente
+
+        if len(anillo) >= 3:
+            coords = np.array([punto[e] for e in anillo + [anillo[0]]])
+            coords[:, 0] = np.clip(coords[:, 0], 0, grid.shape[0] - 1)
+            coords[:, 1] = np.clip(coords[:, 1], 0, grid.shape[1] - 1)
+            anillos.append(coords)
+
+    return anillos
@@ -0,0 +1,72 @@
+# ═══════════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Single-Flight (coalescencia de peticiones)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from app.config import settings
+
+
+class SingleFlight:
+    """
+    Peticiones concurrentes con la misma clave comparten un único cálculo,
+    que corre en un pool de hilos para no bloquear el event loop. No es una
+    caché: en cuanto el cálculo termina, la siguiente petición calcula de nuevo.
+    """
+
+    def __init__(self, max_workers: int = 4, nombre: str = "lecturas"):
+        self.max_workers = max_workers
+        self.nombre = nombre
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._en_vuelo: Dict[Hashable, asyncio.Future] = {}
+        self.llamadas = 0
+        self.ejecuciones = 0
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.nombre)
+        return self._pool
+
+    async def ejecutar(self, clave: Hashable, fn: Callable[[], Any]) -> Any:
+        """Resultado de fn(); si ya hay un cálculo en curso para `clave`, se espera ese"""
+        self.llamadas += 1
+        futuro = self._en_vuelo.get(clave)
+
+        if futuro is None:
+            self.ejecuciones += 1
+            loop = asyncio.get_running_loop()
+            futuro = loop.run_in_executor(self._get_pool(), fn)
+            self._en_vuelo[clave] = futuro
+            futuro.add_done_callback(lambda f: self._terminar(clave, f))
+
+        # shield: si un cliente se desconecta, el cálculo sigue para los demás
+        return await asyncio.shield(futuro)
+
+    def _terminar(self, clave: Hashable, futuro: asyncio.Future) -> None:
+        if self._en_vuelo.get(clave) is futuro:
+            del self._en_vuelo[clave]
+
+    def metricas(self) -> Dict[str, Any]:
+        return {
+            'llamadas': self.llamadas,
+            'ejecuciones': self.ejecuciones,
+            'compartidas': self.llamadas - self.ejecuciones,
+            'en_vuelo': len(self._en_vuelo)
+        }
+
+    def cerrar(self) -> None:
+        """Libera el pool; la siguiente lectura crea uno nuevo"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+# Instancia singleton para las lecturas del catálogo
+lecturas_sismos = SingleFlight(max_workers=settings.LECTURAS_WORKERS, nombre="lecturas-sismos")
@@ -0,0 +1,66 @@
+# ═══════════════════════════════════════════════════════════════════════════════
+# SIASIC-Santander Backend - Pool de Conexiones SQLite
+# ═══════════════════════════════════════════════════════════════════════════════
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List
+
+
+def _minusculas(valor):
+    """lower() de SQLite solo conoce ASCII; esta versión respeta tildes y eñes"""
+    return valor.lower() if isinstance(valor, str) else valor
+
+
+def abrir_conexion(ruta: str, solo_lectura: bool = False) -> sqlite3.Connection:
+    """Conexión configurada para el catálogo (WAL: lecturas concurrentes con una escritura)"""
+    conexion = sqlite3.connect(ruta, check_same_thread=False, isolation_level=None)
+    conexion.execute("PRAGMA journal_mode=WAL")
+    conexion.execute("PRAGMA synchronous=NORMAL")
+    conexion.execute("PRAGMA temp_store=MEMORY")
+    conexion.execute("PRAGMA cache_size=-32000")   # ~32 MB de caché por conexión
+    if solo_lectura:
+        conexion.execute("PRAGMA query_only=1")
+    conexion.create_function("minusculas", 1, _minusculas, deterministic=True)
+    return conexion
+
+
+class PoolConexiones:
+    """
+    Conexiones de solo lectura reutilizables, una por hilo lector. Con WAL los
+    lectores ven la última transacción confirmada aunque haya una carga en curso.
+    """
+
+    def __init__(self, ruta: str, tamano: int):
+        self.ruta = ruta
+        self.tamano = max(1, tamano)
+        self._libres: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._todas: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def conexion(self) -> Iterator[sqlite3.Connection]:
+        """Toma una conexión del pool (la crea si aún no se llegó al tamaño) y la devuelve al salir"""
+        try:
+            conexion = self._libres.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                crear = len(self._todas) < self.tamano
+                if crear:
+                    conexion = abrir_conexion(self.ruta, solo_lectura=True)
+                    self._todas.append(conexion)
+            if not crear:
+                conexion = self._libres.get()
+        try:
+            yield conexion
+        finally:
+            self._libres.put(conexion)
+
+    def cerrar(self) -> None:
+        with self._lock:
+            for conexion in self._todas:
+                conexion.close()
+            self._todas.clear()
+            self._libres = queue.LifoQueue()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark del simulador: latencia por peticion separada en computo y
+sobrecosto de modelos (construccion + validacion + serializacion).
+
+Uso:  python bench_simulador.py [repeticiones]
+"""
+
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Trabajos en hilos del mismo proceso: se mide el simulador, no el pool
+os.environ.setdefault("SIMULADOR_WORKERS", "0")
+
+ESCENARIOS = [
+    {"latitud": 6.78, "longitud": -73.18, "magnitud": 5.0, "profundidad": 147},
+    {"latitud": 6.78, "longitud": -73.18, "magnitud": 6.5, "profundidad": 147},
+    {"latitud": 7.10, "longitud": -73.10, "magnitud": 7.0, "profundidad": 20},
+]
+
+
+def medir(fn, repeticiones):
+    """Mediana y p95 en milisegundos"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        fn()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return float(np.median(tiempos)), float(np.percentile(tiempos, 95))
+
+
+def main():
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.models import SimuladorInput, SimuladorOutput
+    from app.services.simulador_service import simulador_service
+
+    sim = simulador_service
+    cliente = TestClient(app)
+
+    print("=" * 70)
+    print("SIASIC-SANTANDER - BENCHMARK DEL SIMULADOR")
+    print(f"Repeticiones por medicion: {repeticiones} (mediana / p95 en ms)")
+    print("=" * 70)
+
+    for esc in ESCENARIOS:
+        params = SimuladorInput(**esc)
+        depth_type = sim.clasificar_profundidad(params.profundidad)
+        resultado = sim.simular(params)
+        print(f"\n>>> M{params.magnitud} a {params.profundidad} km "
+              f"({len(resultado.ciudades_afectadas)} municipios, {len(resultado.replicas_prediccion)} dias)")
+
+        # Computo numerico: zonas, municipios y replicas
+        def computo():
+            zonas = sim.attenuation_model.calculate_impact_zones(params.magnitud, params.profundidad)
+            sim._calcular_ciudades_afectadas(params.latitud, params.longitud, params.magnitud, params.profundidad, zonas)
+            sim.omori_model.predict_aftershocks(params.magnitud, depth_type, 14, 3.0)
+
+        # Ruta rapida: construccion sin validar + model_dump_json
+        def rapido():
+            sim.simular(params).model_dump_json()
+
+        # Ruta anterior: construccion validada + response_model de FastAPI + json.dumps
+        volcado = resultado.model_dump()
+
+        def validado():
+            salida = SimuladorOutput.model_validate(volcado)
+            contenido = jsonable_encoder(SimuladorOutput.model_validate(salida.model_dump()))
+            json.dumps(contenido, ensure_ascii=False, separators=(",", ":"))
+
+        def peticion():
+            cliente.post("/api/simulador", json=esc)
+
+        t_comp = medir(computo, repeticiones)
+        t_rap = medir(rapido, repeticiones)
+        t_val = medir(validado, repeticiones)
+        t_http = medir(peticion, max(20, repeticiones // 4))
+
+        print(f"  Computo numerico              {t_comp[0]:8.2f} / {t_comp[1]:8.2f}")
+        print(f"  Simulacion + JSON (rapida)    {t_rap[0]:8.2f} / {t_rap[1]:8.2f}")
+        print(f"    -> sobrecosto de modelos    {t_rap[0] - t_comp[0]:8.2f}")
+        print(f"  Modelos con validacion        {t_val[0]:8.2f} / {t_val[1]:8.2f}  (solo modelos, ruta anterior)")
+        print(f"  Peticion HTTP completa        {t_http[0]:8.2f} / {t_http[1]:8.2f}")
+
+    print("\n" + "=" * 70)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
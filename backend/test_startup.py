@@ -58,7 +58,7 @@ def test_data_loading():
     print(">>> Probando carga de datos...")
 
     try:
-        from app.services import sismos_service
+        from app.services.sismos_service import sismos_service
 
         stats = sismos_service.obtener_estadisticas_generales()
         print(f"  [OK] Total sismos: {stats.get('total_sismos', 0)}")
@@ -0,0 +1,127 @@
+"""
+Unión espacial punto en polígono (IndicePoligonos y LimitesService) sobre
+un GeoJSON mínimo: un cuadrado con hueco, un MultiPolygon y una L cóncava
+con el anillo sin cerrar.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.services.limites_service import LimitesService, SIN_MUNICIPIO
+from app.utils.poligonos import IndicePoligonos, anillos_geojson, aristas_de_anillos, dentro_de_aristas
+
+
+FIXTURE = Path(__file__).parent / "fixtures" / "limites.geojson"
+
+
+def _anillos():
+    datos = json.loads(FIXTURE.read_text(encoding='utf-8'))
+    return [anillos_geojson(f['geometry']) for f in datos['features']]
+
+
+def _par_impar(px: float, py: float, aristas: np.ndarray) -> bool:
+    """Referencia escalar del ray casting: cruces de un rayo hacia +x"""
+    cruces = 0
+    for x1, y1, x2, y2 in aristas:
+        if (y1 > py) != (y2 > py) and px < x1 + (py - y1) * (x2 - x1) / (y2 - y1):
+            cruces += 1
+    return cruces % 2 == 1
+
+
+def _fuerza_bruta(x: np.ndarray, y: np.ndarray, anillos) -> np.ndarray:
+    """Primer polígono que contiene cada punto, probando todos"""
+    aristas = [aristas_de_anillos(a) for a in anillos]
+    resultado = np.full(len(x), -1)
+    for i, (px, py) in enumerate(zip(x, y)):
+        for p, a in enumerate(aristas):
+            if _par_impar(px, py, a):
+                resultado[i] = p
+                break
+    return resultado
+
+
+@pytest.fixture(scope="module")
+def limites() -> LimitesService:
+    return LimitesService(str(FIXTURE))
+
+
+def test_anillo_sin_cerrar_se_cierra():
+    ele = _anillos()[2]
+    aristas = aristas_de_anillos(ele)
+    assert len(aristas) == 6
+    assert tuple(aristas[-1]) == (0.0, 30.0, 0.0, 20.0)
+
+
+def test_dentro_de_aristas_coincide_con_referencia_escalar():
+    rng = np.random.default_rng(7)
+    x, y = rng.uniform(-2, 12, 2000), rng.uniform(18, 32, 2000)
+    aristas = aristas_de_anillos(_anillos()[2])
+    esperado = np.array([_par_impar(px, py, aristas) for px, py in zip(x, y)])
+    np.testing.assert_array_equal(dentro_de_aristas(x, y, aristas), esperado)
+
+
+def test_celdas_interiores_estan_dentro_y_sin_aristas():
+    indice = IndicePoligonos(_anillos(), celda_grados=1.0)
+    interiores, frontera = indice._celdas_poligono[0]
+    assert len(interiores) > 0
+    assert not np.intersect1d(interiores, frontera).size
+
+    # Todo punto de una celda interior está dentro del polígono
+    fila, columna = np.divmod(interiores, indice.columnas)
+    rng = np.random.default_rng(1)
+    x = indice.x0 + (columna + rng.uniform(0.01, 0.99, len(columna))) * indice.celda
+    y = indice.y0 + (fila + rng.uniform(0.01, 0.99, len(fila))) * indice.celda
+    assert dentro_de_aristas(x, y, indice.aristas[0]).all()
+    assert (indice.localizar(x, y) == 0).all()
+
+
+def test_celdas_frontera_resuelven_con_ray_casting():
+    anillos = _anillos()
+    indice = IndicePoligonos(anillos, celda_grados=1.0)
+    # Cerca de la diagonal del triángulo y del borde del hueco, ambos lados
+    x = np.array([22.4, 22.6, 27.4, 27.6, 3.9, 4.1, 5.0, 5.0, 1.9, 2.1])
+    y = np.array([5.0, 5.0, 5.0, 5.0, 5.0, 5.0, 3.9, 4.1, 25.0, 25.0])
+    esperado = np.array([-1, 1, 1, -1, 0, -1, 0, -1, 2, -1])
+    np.testing.assert_array_equal(indice.localizar(x, y), esperado)
+    np.testing.assert_array_equal(_fuerza_bruta(x, y, anillos), esperado)
+
+
+@pytest.mark.parametrize("celda", [None, 0.37, 1.0, 3.0])
+def test_localizar_coincide_con_fuerza_bruta(celda):
+    anillos = _anillos()
+    rng = np.random.default_rng(11)
+    x, y = rng.uniform(-5, 35, 3000), rng.uniform(-5, 35, 3000)
+    indice = IndicePoligonos(anillos, celda_grados=celda)
+    np.testing.assert_array_equal(indice.localizar(x, y), _fuerza_bruta(x, y, anillos))
+
+
+def test_hueco_queda_fuera(limites):
+    municipios, departamentos = limites.asignar(np.array([5.0, 2.0]), np.array([5.0, 2.0]))
+    assert list(municipios) == [SIN_MUNICIPIO, "Cuadrado"]
+    assert list(departamentos) == [SIN_MUNICIPIO, "Uno"]
+
+
+def test_multipolygon_y_claves_dane(limites):
+    # (lat, lon): una parte del MultiPolygon y la otra
+    municipios, departamentos = limites.asignar(np.array([2.0, 21.0]), np.array([25.0, 21.0]))
+    assert list(municipios) == ["Islas", "Islas"]
+    assert list(departamentos) == ["Dos", "Dos"]
+
+
+def test_puntos_fuera_de_todo_poligono(limites):
+    # Fuera de la grilla, dentro de la grilla entre polígonos y en la concavidad de la L
+    latitudes = np.array([-50.0, 50.0, 5.0, 15.0, 26.0])
+    longitudes = np.array([-50.0, 50.0, 15.0, 5.0, 6.0])
+    municipios, departamentos = limites.asignar(latitudes, longitudes)
+    assert list(municipios) == [SIN_MUNICIPIO] * 5
+    assert list(departamentos) == [SIN_MUNICIPIO] * 5
+
+
+def test_sin_archivo_todo_queda_sin_municipio(tmp_path):
+    servicio = LimitesService(str(tmp_path / "no_existe.geojson"))
+    assert not servicio.disponible
+    municipios, departamentos = servicio.asignar(np.array([5.0]), np.array([5.0]))
+    assert list(municipios) == [SIN_MUNICIPIO] and list(departamentos) == [SIN_MUNICIPIO]
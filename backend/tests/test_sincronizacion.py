@@ -0,0 +1,178 @@
+"""
+Sincronización incremental (`?since=`) sobre los dos backends del catálogo:
+tras recargar un CSV modificado, la respuesta trae exactamente los eventos
+nuevos y modificados y los tombstones de los eliminados, y ambos backends
+coinciden.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.routers.sismos as router_sismos
+from app.services.catalog_store import CatalogStore
+from app.services.catalog_sqlite import SQLiteCatalogStore
+from app.services.sismos_service import SismosMemoriaService
+from app.services.sismos_sqlite_service import SismosSQLiteService
+
+
+CABECERA = "FechaHora,Lat,Lon,ProfKm,Mag,TipoMag,Fases,RMS,GAP,Ubicacion,Estado"
+
+# Clave natural (fecha, lat, lon) -> resto de la fila
+EVENTOS = {
+    'A': '2024-01-01 01:24:35,6.554,-73.47,119.41,2.0,MLr_vmm,55,0.4,107,"El Carmen - Santander, Colombia",manual',
+    'B': '2024-01-02 02:31:56,6.778,-73.149,143.71,2.0,MLr_3,25,1.1,120,"Los Santos - Santander, Colombia",manual',
+    'C': '2024-01-03 10:00:00,7.119,-73.122,150.2,3.1,MLr_3,40,0.5,90,"Bucaramanga - Santander, Colombia",manual',
+    'D': '2024-01-04 11:30:00,6.8,-73.2,12.5,2.4,MLr_3,30,0.6,100,"Zapatoca - Santander, Colombia",revisado',
+}
+B_MODIFICADO = EVENTOS['B'].replace(",2.0,MLr_3,", ",2.6,MLr_3,")
+D_MODIFICADO = EVENTOS['D'].replace(",revisado", ",manual")
+E_NUEVO = '2024-01-05 08:00:00,6.9,-73.0,160.0,4.0,MLr_3,60,0.3,80,"Piedecuesta - Santander, Colombia",manual'
+
+
+def _escribir(ruta: Path, filas: List[str]) -> None:
+    """Escribe el CSV y adelanta su fecha de modificación: la recarga lo ve como cambiado"""
+    anterior = ruta.stat().st_mtime_ns if ruta.exists() else 0
+    ruta.write_text("\n".join([CABECERA] + filas) + "\n", encoding='utf-8')
+    os.utime(ruta, ns=(anterior + 10 ** 9, anterior + 10 ** 9))
+
+
+@pytest.fixture(params=["memoria", "sqlite"])
+def catalogo(request, tmp_path):
+    """(store, servicio, ruta del CSV) del backend pedido, con A, B, C y D cargados"""
+    csv = tmp_path / "sismos.csv"
+    _escribir(csv, list(EVENTOS.values()))
+    if request.param == "memoria":
+        store = CatalogStore(str(csv))
+        servicio = SismosMemoriaService(store)
+    else:
+        store = SQLiteCatalogStore(str(csv), str(tmp_path / "catalogo.sqlite3"), 2)
+        servicio = SismosSQLiteService(store)
+    yield store, servicio, csv
+    store.cerrar()
+
+
+@pytest.fixture
+def cliente(catalogo, monkeypatch):
+    """Cliente del router de sismos servido con el catálogo de prueba"""
+    monkeypatch.setattr(router_sismos, "sismos_service", catalogo[1])
+    app = FastAPI()
+    app.include_router(router_sismos.router, prefix="/api")
+    return TestClient(app)
+
+
+def _por_fecha(registros: List[Dict]) -> Dict[str, Dict]:
+    return {r['fecha_hora']: r for r in registros}
+
+
+def _cambios(cliente: TestClient, desde: int, epoch: str) -> Dict:
+    respuesta = cliente.get("/api/sismos/todos", params={'since': desde, 'epoch': epoch})
+    assert respuesta.status_code == 200
+    return respuesta.json()
+
+
+def test_since_trae_nuevos_modificados_y_tombstones(catalogo, cliente):
+    store, servicio, csv = catalogo
+    assert store.version == 1
+    inicial = _por_fecha(servicio.get_all())
+    ids = {k: inicial[v.split(',')[0].replace(' ', 'T')]['id'] for k, v in EVENTOS.items()}
+    assert len(set(ids.values())) == 4
+
+    # B cambia de magnitud, C desaparece, E es nuevo; A y D quedan igual
+    _escribir(csv, [EVENTOS['A'], B_MODIFICADO, EVENTOS['D'], E_NUEVO])
+    resumen = store.recargar()
+    assert (resumen['version'], resumen['nuevos'], resumen['modificados'], resumen['eliminados']) == (2, 1, 1, 1)
+
+    cambios = _cambios(cliente, 1, store.epoch)
+    assert not cambios['completo']
+    assert (cambios['desde'], cambios['version']) == (1, 2)
+    registros = _por_fecha(cambios['registros'])
+    assert set(registros) == {'2024-01-02T02:31:56', '2024-01-05T08:00:00'}
+    assert registros['2024-01-02T02:31:56']['id'] == ids['B']
+    assert registros['2024-01-02T02:31:56']['magnitud'] == 2.6
+    assert registros['2024-01-05T08:00:00']['id'] not in ids.values()
+    assert cambios['eliminados'] == [ids['C']]
+
+    # Los eventos sin cambios conservan su id
+    actual = _por_fecha(servicio.get_all())
+    assert actual['2024-01-01T01:24:35']['id'] == ids['A']
+    assert actual['2024-01-04T11:30:00']['id'] == ids['D']
+
+    # Al día: nada que enviar
+    vacio = _cambios(cliente, 2, store.epoch)
+    assert not vacio['completo'] and vacio['registros'] == [] and vacio['eliminados'] == []
+
+
+def test_since_acumula_varias_recargas(catalogo, cliente):
+    store, servicio, csv = catalogo
+    _escribir(csv, [EVENTOS['A'], B_MODIFICADO, EVENTOS['D'], E_NUEVO])
+    store.recargar()
+    id_e = _por_fecha(servicio.get_all())['2024-01-05T08:00:00']['id']
+
+    # v3: D se modifica y E desaparece
+    _escribir(csv, [EVENTOS['A'], B_MODIFICADO, D_MODIFICADO])
+    assert store.recargar()['version'] == 3
+
+    desde_1 = _cambios(cliente, 1, store.epoch)
+    assert set(_por_fecha(desde_1['registros'])) == {'2024-01-02T02:31:56', '2024-01-04T11:30:00'}
+    assert id_e in desde_1['eliminados'] and len(desde_1['eliminados']) == 2
+
+    desde_2 = _cambios(cliente, 2, store.epoch)
+    assert set(_por_fecha(desde_2['registros'])) == {'2024-01-04T11:30:00'}
+    assert desde_2['eliminados'] == [id_e]
+
+
+def test_recarga_sin_cambios_no_envia_registros(catalogo, cliente):
+    store, _, csv = catalogo
+    # Archivo intacto: no se relee ni cambia la versión
+    resumen = store.recargar()
+    assert (resumen['version'], resumen['nuevos'], resumen['modificados'], resumen['eliminados']) == (1, 0, 0, 0)
+
+    # Archivo tocado con el mismo contenido: se relee, pero ningún evento cambia de versión
+    os.utime(csv, ns=(csv.stat().st_mtime_ns + 10 ** 9,) * 2)
+    resumen = store.recargar()
+    assert (resumen['nuevos'], resumen['modificados'], resumen['eliminados']) == (0, 0, 0)
+    cambios = _cambios(cliente, 1, store.epoch)
+    assert not cambios['completo']
+    assert cambios['registros'] == [] and cambios['eliminados'] == []
+
+
+@pytest.mark.parametrize("desde,epoch", [(0, None), (1, "otro-epoch"), (99, None)])
+def test_version_o_epoch_desconocidos_responden_completo(catalogo, cliente, desde, epoch):
+    store, _, _ = catalogo
+    cambios = _cambios(cliente, desde, epoch or store.epoch)
+    assert cambios['completo'] and cambios['desde'] == 0
+    assert len(cambios['registros']) == 4 and cambios['eliminados'] == []
+
+
+def test_backends_coinciden(tmp_path):
+    """Misma secuencia de recargas: mismos ids, versiones, registros y tombstones"""
+    resultados = []
+    for backend in ("memoria", "sqlite"):
+        csv = tmp_path / backend / "sismos.csv"
+        csv.parent.mkdir()
+        _escribir(csv, list(EVENTOS.values()))
+        if backend == "memoria":
+            store = CatalogStore(str(csv))
+            servicio = SismosMemoriaService(store)
+        else:
+            store = SQLiteCatalogStore(str(csv), str(tmp_path / "catalogo.sqlite3"), 2)
+            servicio = SismosSQLiteService(store)
+
+        pasos = []
+        for filas in ([EVENTOS['A'], B_MODIFICADO, EVENTOS['D'], E_NUEVO], [EVENTOS['A'], B_MODIFICADO, D_MODIFICADO]):
+            _escribir(csv, filas)
+            resumen = store.recargar()
+            pasos.append({k: v for k, v in resumen.items() if k != 'epoch'})
+        for desde in (1, 2):
+            cambios = servicio.get_cambios(desde, store.epoch)
+            pasos.append((sorted(cambios['registros'], key=lambda r: r['id']), cambios['eliminados']))
+        pasos.append(servicio.get_all())
+        resultados.append(pasos)
+        store.cerrar()
+
+    assert resultados[0] == resultados[1]
@@ -18,6 +18,7 @@ import {
   Map
 } from "lucide-react";
 import { sismosApi } from "@/lib/api";
+import { sincronizarCatalogo } from "@/lib/catalogo-cache";
 import { 
   EstadisticasGenerales, 
   DistribucionMensual, 
@@ -49,7 +50,7 @@ export default function DashboardPage() {
           sismosApi.getEstadisticas(),
           sismosApi.getDistribucionMensual(),
           sismosApi.getDistribucionProfundidad(),
-          sismosApi.getParaMapa(),
+          sincronizarCatalogo("mapa"),
         ]);
         setStats(statsData);
         setMensual(mensualData);
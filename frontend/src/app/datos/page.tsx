@@ -61,8 +61,11 @@ export default function DatosPage() {
     const fetchData = async () => {
       try {
         setLoading(true);
-        const data = await sismosApi.getTodos();
-        setSismos(data);
+        // La tabla se muestra con el primer lote y se completa mientras llegan los demás
+        await sismosApi.streamTodos((lote) => {
+          setSismos((prev) => prev.concat(lote));
+          setLoading(false);
+        });
       } catch (err) {
         setError("Error al cargar los datos.");
         console.error(err);
@@ -8,13 +8,22 @@ import {
   DistribucionMensual,
   DistribucionProfundidad,
   Sismo,
+  CambiosCatalogo,
   SimuladorInput,
   SimuladorOutput,
+  Sitio,
+  ETASInput,
+  ETASOutput,
+  GutenbergRichterFiltros,
+  GutenbergRichterOutput,
   PaginatedResponse,
 } from "@/types";
 
 const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://127.0.0.1:8001";
 
+// Proyección de columnas del catálogo (?fields=id,latitud,...)
+const camposParam = (campos?: (keyof Sismo)[]) => (campos?.length ? { fields: campos.join(",") } : {});
+
 const api = axios.create({
   baseURL: API_URL,
   headers: { "Content-Type": "application/json" },
@@ -36,11 +45,37 @@ export const sismosApi = {
     return data;
   },
 
-  getTodos: async (): Promise<Sismo[]> => {
-    const { data } = await api.get("/api/sismos/todos");
+  getTodos: async (campos?: (keyof Sismo)[]): Promise<Sismo[]> => {
+    const { data } = await api.get("/api/sismos/todos", { params: camposParam(campos) });
     return data;
   },
 
+  // Catálogo completo como NDJSON: onLote recibe los sismos a medida que llegan
+  streamTodos: async (onLote: (lote: Sismo[]) => void): Promise<void> => {
+    const response = await fetch(`${API_URL}/api/sismos/todos?stream=1`, {
+      headers: { Accept: "application/x-ndjson" },
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`Error ${response.status} al obtener sismos`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let pendiente = "";
+
+    while (true) {
+      const { done, value } = await reader.read();
+      pendiente += decoder.decode(value, { stream: !done });
+
+      const lineas = pendiente.split("\n");
+      pendiente = done ? "" : lineas.pop() ?? "";
+      const lote = lineas.filter((l) => l.trim() !== "").map((l) => JSON.parse(l) as Sismo);
+      if (lote.length > 0) onLote(lote);
+
+      if (done) break;
+    }
+  },
+
   getList: async (page: number = 1, perPage: number = 20): Promise<PaginatedResponse<Sismo>> => {
     const { data } = await api.get("/api/sismos", { params: { page, per_page: perPage } });
     return data;
@@ -51,13 +86,25 @@ export const sismosApi = {
     return data;
   },
 
-  getParaMapa: async (): Promise<Sismo[]> => {
-    const { data } = await api.get("/api/sismos/viz/mapa");
+  getParaMapa: async (campos?: (keyof Sismo)[]): Promise<Sismo[]> => {
+    const { data } = await api.get("/api/sismos/viz/mapa", { params: camposParam(campos) });
+    return data;
+  },
+
+  // Sincronización incremental: cambios desde `version` (0 = catálogo completo)
+  getCambios: async (
+    vista: "todos" | "mapa",
+    version: number,
+    epoch?: string,
+    campos?: (keyof Sismo)[]
+  ): Promise<CambiosCatalogo> => {
+    const ruta = vista === "mapa" ? "/api/sismos/viz/mapa" : "/api/sismos/todos";
+    const { data } = await api.get(ruta, { params: { since: version, epoch, ...camposParam(campos) } });
     return data;
   },
 
-  getTimeline: async (): Promise<Sismo[]> => {
-    const { data } = await api.get("/api/sismos/viz/timeline");
+  getTimeline: async (campos?: (keyof Sismo)[]): Promise<Sismo[]> => {
+    const { data } = await api.get("/api/sismos/viz/timeline", { params: camposParam(campos) });
     return data;
   },
 };
@@ -73,6 +120,51 @@ export const simuladorApi = {
     return data;
   },
 
+  simularEtas: async (params: ETASInput): Promise<ETASOutput> => {
+    const { data } = await api.post("/api/simulador/etas", params);
+    return data;
+  },
+
+  getShakemapRasterUrl: (params: SimuladorInput, resolucion: number = 200): string => {
+    const query = new URLSearchParams({
+      latitud: String(params.latitud),
+      longitud: String(params.longitud),
+      magnitud: String(params.magnitud),
+      profundidad: String(params.profundidad),
+      resolucion: String(resolucion),
+      formato: "png",
+    });
+    return `${API_URL}/api/simulador/shakemap/raster?${query.toString()}`;
+  },
+
+  getIsosistas: async (params: SimuladorInput, resolucion: number = 200) => {
+    const { latitud, longitud, magnitud, profundidad } = params;
+    const { data } = await api.get("/api/simulador/shakemap/isosistas", {
+      params: { latitud, longitud, magnitud, profundidad, resolucion },
+    });
+    return data;
+  },
+
+  evaluarSitios: async (escenario: SimuladorInput, sitios: Sitio[], formato: "ndjson" | "csv" = "csv") => {
+    const { data } = await api.post(
+      "/api/simulador/sitios",
+      { escenario, sitios },
+      { params: { formato }, responseType: "blob" }
+    );
+    return data as Blob;
+  },
+
+  evaluarSitiosCsv: async (escenario: SimuladorInput, archivo: File) => {
+    const form = new FormData();
+    form.append("archivo", archivo);
+    form.append("latitud", String(escenario.latitud));
+    form.append("longitud", String(escenario.longitud));
+    form.append("magnitud", String(escenario.magnitud));
+    form.append("profundidad", String(escenario.profundidad));
+    const { data } = await api.post("/api/simulador/sitios/csv", form, { responseType: "blob" });
+    return data as Blob;
+  },
+
   getCiudades: async () => {
     const { data } = await api.get("/api/simulador/ciudades");
     return data;
@@ -89,6 +181,13 @@ export const simuladorApi = {
   },
 };
 
+export const analiticaApi = {
+  getGutenbergRichter: async (filtros: GutenbergRichterFiltros = {}): Promise<GutenbergRichterOutput> => {
+    const { data } = await api.get("/api/analitica/gutenberg-richter", { params: filtros });
+    return data;
+  },
+};
+
 export const configApi = {
   getColores: async () => {
     const { data } = await api.get("/api/config/colores");
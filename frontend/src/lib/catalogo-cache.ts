@@ -0,0 +1,78 @@
+// ═══════════════════════════════════════════════════════════════════════════
+// SIASIC-Santander Frontend - Copia local del catálogo (IndexedDB)
+// ═══════════════════════════════════════════════════════════════════════════
+// Guarda el catálogo en el navegador y en cada visita solo descarga los
+// sismos nuevos o modificados y los ids eliminados (?since=<version>).
+
+import { sismosApi } from "@/lib/api";
+import { Sismo } from "@/types";
+
+type Vista = "todos" | "mapa";
+
+interface CopiaLocal {
+  vista: Vista;
+  epoch: string;
+  version: number;
+  registros: Sismo[];
+}
+
+const DB_NOMBRE = "siasic-catalogo";
+const STORE = "copias";
+
+function abrirDB(): Promise<IDBDatabase> {
+  return new Promise((resolve, reject) => {
+    const solicitud = indexedDB.open(DB_NOMBRE, 1);
+    solicitud.onupgradeneeded = () => solicitud.result.createObjectStore(STORE, { keyPath: "vista" });
+    solicitud.onsuccess = () => resolve(solicitud.result);
+    solicitud.onerror = () => reject(solicitud.error);
+  });
+}
+
+async function leerCopia(vista: Vista): Promise<CopiaLocal | undefined> {
+  const db = await abrirDB();
+  return new Promise((resolve, reject) => {
+    const solicitud = db.transaction(STORE, "readonly").objectStore(STORE).get(vista);
+    solicitud.onsuccess = () => resolve(solicitud.result);
+    solicitud.onerror = () => reject(solicitud.error);
+  });
+}
+
+async function guardarCopia(copia: CopiaLocal): Promise<void> {
+  const db = await abrirDB();
+  return new Promise((resolve, reject) => {
+    const tx = db.transaction(STORE, "readwrite");
+    tx.objectStore(STORE).put(copia);
+    tx.oncomplete = () => resolve();
+    tx.onerror = () => reject(tx.error);
+  });
+}
+
+/**
+ * Catálogo sincronizado con el servidor. Sin IndexedDB (SSR, modo privado)
+ * se descarga completo como antes.
+ */
+export async function sincronizarCatalogo(vista: Vista = "mapa"): Promise<Sismo[]> {
+  if (typeof indexedDB === "undefined") {
+    return vista === "mapa" ? sismosApi.getParaMapa() : sismosApi.getTodos();
+  }
+
+  const copia = await leerCopia(vista).catch(() => undefined);
+  const cambios = await sismosApi.getCambios(vista, copia?.version ?? 0, copia?.epoch);
+
+  let registros: Sismo[];
+  if (cambios.completo || !copia) {
+    registros = cambios.registros;
+  } else {
+    const porId = new Map(copia.registros.map((s) => [s.id, s]));
+    cambios.eliminados.forEach((id) => porId.delete(id));
+    cambios.registros.forEach((s) => porId.set(s.id, s));
+    registros = Array.from(porId.values());
+  }
+
+  if (cambios.completo || cambios.registros.length > 0 || cambios.eliminados.length > 0 || !copia) {
+    await guardarCopia({ vista, epoch: cambios.epoch, version: cambios.version, registros }).catch(
+      (err) => console.error("No se pudo guardar la copia local del catálogo", err)
+    );
+  }
+  return registros;
+}
@@ -19,6 +19,16 @@ export interface Sismo {
   es_santander: boolean;
 }
 
+// Respuesta de ?since=<version>: cambios del catálogo desde esa versión
+export interface CambiosCatalogo<T = Sismo> {
+  epoch: string;
+  version: number;
+  desde: number;
+  completo: boolean; // true: reemplazar la copia local por `registros`
+  registros: T[];
+  eliminados: number[];
+}
+
 export interface SismoResumen {
   id: number;
   fecha_hora: string;
@@ -56,6 +66,7 @@ export interface SimuladorInput {
   longitud: number;
   magnitud: number;
   profundidad: number;
+  usar_parametros_ajustados?: boolean;
 }
 
 export interface ZonaImpacto {
@@ -97,6 +108,100 @@ export interface SimuladorOutput {
   replicas_prediccion: PrediccionReplica[];
   max_replica_magnitud: number;
   total_replicas_14_dias: number;
+  parametros_ajustados?: boolean;
+}
+
+export interface Sitio {
+  id?: number | string;
+  nombre?: string;
+  latitud: number;
+  longitud: number;
+}
+
+export interface ETASInput extends SimuladorInput {
+  dias?: number;
+  realizaciones?: number;
+  magnitud_minima?: number;
+  semilla?: number | null;
+}
+
+export interface BandaPronostico {
+  dia: number;
+  media: number;
+  p05: number;
+  p50: number;
+  p95: number;
+  acumulado_media: number;
+  acumulado_p05: number;
+  acumulado_p50: number;
+  acumulado_p95: number;
+}
+
+export interface ReplicaSintetica {
+  tiempo_dias: number;
+  latitud: number;
+  longitud: number;
+  profundidad: number;
+  magnitud: number;
+  generacion: number;
+}
+
+export interface ETASOutput {
+  epicentro: { lat: number; lon: number };
+  magnitud: number;
+  profundidad: number;
+  tipo_profundidad: TipoProfundidad;
+  dias: number;
+  realizaciones: number;
+  semilla: number;
+  magnitud_minima: number;
+  parametros: Record<string, number>;
+  razon_ramificacion: number;
+  parametros_ajustados: boolean;
+  total_media: number;
+  total_p05: number;
+  total_p50: number;
+  total_p95: number;
+  bandas: BandaPronostico[];
+  probabilidades: { magnitud: number; probabilidad_pct: number }[];
+  catalogo_ejemplo: ReplicaSintetica[];
+  truncado: boolean;
+  tiempo_calculo_ms: number;
+}
+
+export interface GutenbergRichterFiltros {
+  tipo_profundidad?: TipoProfundidad;
+  departamento?: string;
+  municipio?: string;
+  fecha_inicio?: string;
+  fecha_fin?: string;
+  metodo?: "maxc" | "gft";
+  bootstrap?: number;
+  semilla?: number;
+}
+
+export interface GutenbergRichterOutput {
+  version_dataset: number;
+  filtros: Record<string, string>;
+  metodo: "maxc" | "gft";
+  n_eventos: number;
+  n_sobre_mc: number;
+  mc: number;
+  mc_maxc: number;
+  gft_r: number | null;
+  b: number;
+  b_error_shi_bolt: number;
+  a: number;
+  bootstrap: {
+    replicas: number;
+    semilla: number;
+    mc_ic95: [number, number];
+    mc_std: number;
+    b_ic95: [number, number];
+    b_std: number;
+  } | null;
+  distribucion: { magnitud: number; cantidad: number; acumulado: number; acumulado_gr: number | null }[];
+  tiempo_calculo_ms: number;
 }
 
 export interface PaginatedResponse<T> {